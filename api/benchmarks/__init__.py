@@ -0,0 +1 @@
+"""Performance benchmarks. Run modules from the ``api`` directory, e.g. ``python -m benchmarks.tool_queries``."""
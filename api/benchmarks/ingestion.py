@@ -0,0 +1,225 @@
+"""
+End-to-end ingestion benchmark on a synthetic repository.
+
+Generates a seeded repository under REPO_DIRS (where the pipeline reads files
+from), times each GitRepoParser walk over several runs and, with
+``--pipeline``, ingests it through ``ingest_repo`` using the deterministic
+stub embedding model, into the configured Neo4j or, with ``--backend memory``,
+the in-memory graph store (no database needed). Prints (and optionally saves) a
+JSON report with throughput, peak RSS and per-stage timings; ``--baseline``
+adds the relative change of every timing against an earlier report.
+
+    python -m benchmarks.ingestion --files 2000 --commits 200 --branches 5 --pipeline --output report.json
+    python -m benchmarks.ingestion --files 2000 --commits 200 --branches 5 --pipeline --baseline report.json
+    python -m benchmarks.ingestion --files 2000 --pipeline --backend memory
+
+The settings in ``src.core.config`` must be resolvable (``.env`` or the
+environment), as when starting the API. The benchmark graph is deleted after
+the run unless ``--keep-graph`` is given.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import resource
+import statistics
+from dataclasses import asdict
+from typing import Callable, Dict, Optional
+
+import pygit2
+
+from benchmarks.synthetic_repo import SyntheticRepoSpec, generate_repo
+from src.core.config import config
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def timed(call: Callable):
+    start = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - start
+
+
+def bench_parser(repo_path: str, runs: int) -> Dict:
+    """Median time of each GitRepoParser walk, in the order get_nodes runs them."""
+    from src.service.ingest.git_repo_parser import GitRepoParser
+
+    stage_times: Dict[str, list] = {"metadata": [], "tree": [], "branches": [], "commits": [], "total": []}
+    nodes = {}
+    for _ in range(runs):
+        parser = GitRepoParser(repo_path)
+        _, metadata_s = timed(parser.get_metadata)
+        head_commit = parser.repo[parser.repo.head.target]
+        (folders, files), tree_s = timed(lambda: parser.get_tree_dicts(head_commit))
+        parser.nodes["folders"], parser.nodes["files"] = folders, files
+        _, branches_s = timed(parser.get_branches)
+        _, commits_s = timed(parser.collect_all_commits)
+        for stage, seconds in zip(stage_times, (metadata_s, tree_s, branches_s, commits_s)):
+            stage_times[stage].append(seconds)
+        stage_times["total"].append(metadata_s + tree_s + branches_s + commits_s)
+        nodes = parser.nodes
+
+    medians = {stage: round(statistics.median(times), 4) for stage, times in stage_times.items()}
+    total = medians["total"] or float("nan")
+    return {
+        "runs": runs,
+        "stage_seconds": medians,
+        "nodes": {key: len(nodes[key]) for key in ("folders", "files", "branches", "commits")},
+        "files_per_s": round(len(nodes["files"]) / total, 1),
+        "commits_per_s": round(len(nodes["commits"]) / total, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def _delete_graph(repo_name: str):
+    from src.core.graph.store import get_graph_store
+    store = get_graph_store()
+    try:
+        await store.delete_repository(repo_name)
+    finally:
+        await store.close()
+
+
+async def bench_pipeline(repo_path: str, repo_bytes: int, embed_dim: int, embed_latency_ms: float, keep_graph: bool) -> Dict:
+    """Run ingest_repo end to end with the stub embedding model and read back its job metrics."""
+    from llama_index.core.settings import Settings
+    from benchmarks.stub_embedding import StubEmbedding
+    from src.core.metrics import load_job_metrics
+    from src.service.ingest.checkpoint import clear_checkpoint
+    from src.service.ingest.main_ingest import ingest_repo
+
+    Settings.embed_model = StubEmbedding(dim=embed_dim, latency_ms=embed_latency_ms)
+    config.EMBED_DIM = embed_dim
+    repo_name = os.path.basename(os.path.normpath(repo_path))
+
+    # The synthetic repository has the same HEAD on every run, so a checkpoint
+    # left by a failed run would resume it and time only part of the pipeline
+    clear_checkpoint(repo_name)
+    start = time.perf_counter()
+    succeeded = await ingest_repo(pygit2.Repository(repo_path))
+    wall_s = time.perf_counter() - start
+    metrics = load_job_metrics(repo_name) or {"counters": {}, "histograms": {}}
+
+    if not keep_graph:
+        await _delete_graph(repo_name)
+
+    def by_label(name: str) -> Dict[str, dict]:
+        """Histogram totals of one metric keyed by label value, e.g. stage=parse -> parse."""
+        prefix = f"{name}{{"
+        return {
+            key[len(prefix):-1].split("=", 1)[-1]: value
+            for key, value in metrics["histograms"].items() if key.startswith(prefix)
+        }
+
+    files = metrics["counters"].get("ingest_files_read_total", 0)
+    return {
+        "succeeded": succeeded,
+        "wall_s": round(wall_s, 3),
+        "stage_seconds": {stage: round(v["sum"], 4) for stage, v in by_label("ingest_stage_seconds").items()},
+        "files_per_s": round(files / wall_s, 1) if wall_s else None,
+        "bytes_per_s": round(repo_bytes / wall_s, 1) if wall_s else None,
+        "backend": config.GRAPH_BACKEND,
+        "neo4j": {mode: {"count": v["count"], "avg_ms": round(1000 * v["avg"], 3)} for mode, v in by_label("neo4j_transaction_seconds").items()},
+        "embedding_calls": metrics["counters"].get("embedding_calls_total", 0),
+        "counters": metrics["counters"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _timings(report: Dict, prefix: str = "") -> Dict[str, float]:
+    """Flatten the numeric *_s / *_seconds / *_per_s / *_ms / peak_rss_mb leaves of a report."""
+    found = {}
+    for key, value in report.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and key not in ("counters", "spec", "vs_baseline"):
+            found.update(_timings(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and (
+            prefix.endswith("stage_seconds.") or key.endswith(("_s", "_per_s", "_ms", "_mb"))
+        ):
+            found[path] = value
+    return found
+
+
+def compare(report: Dict, baseline: Dict) -> Dict[str, dict]:
+    """
+    Relative change of every timing, throughput and RSS figure present in
+    both reports, plus whether each pipeline run succeeded: timings of a
+    failed run are not comparable.
+    """
+    current, previous = _timings(report), _timings(baseline)
+    comparison = {
+        key: {"baseline": previous[key], "current": value, "change": round(value / previous[key] - 1, 4)}
+        for key, value in current.items() if previous.get(key)
+    }
+    if "pipeline" in report and "pipeline" in baseline:
+        comparison["pipeline.succeeded"] = {
+            "baseline": baseline["pipeline"].get("succeeded"),
+            "current": report["pipeline"].get("succeeded"),
+        }
+    return comparison
+
+
+def run(spec: SyntheticRepoSpec, name: str, runs: int, pipeline: bool, embed_dim: int,
+        embed_latency_ms: float, keep_graph: bool, baseline: Optional[Dict] = None) -> Dict:
+    repo_path = os.path.join(config.REPO_DIRS, name)
+    repo_stats, generate_s = timed(lambda: generate_repo(repo_path, spec))
+
+    report = {
+        "spec": asdict(spec),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pygit2": pygit2.__version__,
+            "cpus": os.cpu_count(),
+        },
+        "repository": {**repo_stats, "generate_s": round(generate_s, 3)},
+        "parse": bench_parser(repo_path, runs),
+    }
+    if pipeline:
+        report["pipeline"] = asyncio.run(bench_pipeline(repo_path, repo_stats["bytes"], embed_dim, embed_latency_ms, keep_graph))
+    report["peak_rss_mb"] = peak_rss_mb()
+    if baseline is not None:
+        report["vs_baseline"] = compare(report, baseline)
+    return report
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    defaults = SyntheticRepoSpec()
+    for field, value in asdict(defaults).items():
+        arg_parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=value)
+    arg_parser.add_argument("--name", default="bench-synthetic", help="Repository directory name under REPO_DIRS")
+    arg_parser.add_argument("--runs", type=int, default=3, help="Parser runs; the median is reported")
+    arg_parser.add_argument("--pipeline", action="store_true", help="Also ingest into the graph store")
+    arg_parser.add_argument("--backend", choices=["neo4j", "memory"], help="Graph store to ingest into (default: GRAPH_BACKEND)")
+    arg_parser.add_argument("--embed-dim", type=int, default=384)
+    arg_parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="Simulated latency per embedding call")
+    arg_parser.add_argument("--keep-graph", action="store_true", help="Leave the ingested graph in the store")
+    arg_parser.add_argument("--output", help="Also write the report to this file")
+    arg_parser.add_argument("--baseline", help="Earlier report to compare against")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.backend:
+        config.GRAPH_BACKEND = args.backend
+    spec = SyntheticRepoSpec(**{field: getattr(args, field) for field in asdict(defaults)})
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    report = run(spec, args.name, args.runs, args.pipeline, args.embed_dim, args.embed_latency_ms, args.keep_graph, baseline)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
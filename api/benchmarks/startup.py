@@ -0,0 +1,81 @@
+"""
+Cold-start import profile of the API.
+
+Imports a module in a fresh interpreter under ``python -X importtime`` and
+prints a JSON report: wall time, total import time and the slowest imports
+by cumulative and self time. Run it before and after a startup change to see
+what the first request no longer pays for.
+
+    python -m benchmarks.startup --module src.main --top 25 --raw importtime.log
+
+The settings in ``src.core.config`` must be resolvable (``.env`` or the
+environment), as when starting the API.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+from typing import List
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+
+def parse_importtime(stderr: str) -> List[dict]:
+    """Parse `import time: self [us] | cumulative | imported package` lines."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, package = line[len("import time:"):].split("|", 2)
+            entries.append({
+                "module": package.strip(),
+                "depth": (len(package) - len(package.lstrip())) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            })
+        except ValueError:
+            continue
+    return entries
+
+
+def importtime_report(module: str, top: int, raw_path: str = None) -> dict:
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=API_DIR,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+    )
+    wall_s = time.perf_counter() - start
+    if raw_path:
+        Path(raw_path).write_text(process.stderr)
+    if process.returncode != 0:
+        errors = [line for line in process.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"Importing {module} failed:\n" + "\n".join(errors[-20:]))
+
+    entries = parse_importtime(process.stderr)
+    # Top-level entries (depth 0) add up to the whole import
+    total_ms = sum(e["cumulative_ms"] for e in entries if e["depth"] == 0)
+    return {
+        "module": module,
+        "python": sys.version.split()[0],
+        "wall_s": round(wall_s, 3),
+        "import_total_ms": round(total_ms, 1),
+        "modules_imported": len(entries),
+        "top_cumulative": sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)[:top],
+        "top_self": sorted(entries, key=lambda e: e["self_ms"], reverse=True)[:top],
+    }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--module", default="src.main", help="Module to import")
+    arg_parser.add_argument("--top", type=int, default=25, help="Number of slowest imports to list")
+    arg_parser.add_argument("--raw", help="Also save the raw -X importtime output to this file")
+    args = arg_parser.parse_args()
+    print(json.dumps(importtime_report(args.module, args.top, args.raw), indent=2))
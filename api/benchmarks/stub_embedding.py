@@ -0,0 +1,33 @@
+"""Deterministic embedding model for benchmarks: no network, same text -> same vector."""
+import time
+import hashlib
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+
+
+class StubEmbedding(BaseEmbedding):
+    """
+    Unit vectors drawn from a generator seeded with the SHA-256 of the text.
+    `latency_ms` adds a fixed delay per call to stand in for a remote model.
+    """
+
+    model_name: str = "benchmark-stub"
+    dim: int = 384
+    latency_ms: float = 0.0
+
+    def _vector(self, text: str) -> list:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dim)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def _get_text_embedding(self, text: str) -> list:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self._vector(text)
+
+    def _get_query_embedding(self, query: str) -> list:
+        return self._get_text_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> list:
+        return self._get_query_embedding(query)
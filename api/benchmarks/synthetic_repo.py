@@ -0,0 +1,166 @@
+"""
+Synthetic git repositories for benchmarks.
+
+Builds a repository with pygit2 from a seeded spec: a folder tree of a given
+depth and fan-out, files of random sizes spread over it, a linear history on
+``main`` that modifies some files per commit, and extra branches forked from
+that history with commits of their own. Every branch also gets an
+``origin/<branch>`` remote-tracking ref, so the parser's branch diffing runs
+too. The same spec and seed always produce the same trees and commit
+messages.
+
+    python -m benchmarks.synthetic_repo /tmp/bench-repo --files 2000 --depth 4 --commits 200 --branches 5
+"""
+import os
+import json
+import random
+import shutil
+import argparse
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+import pygit2
+from pygit2.enums import CheckoutStrategy
+
+EXTENSIONS = ("py", "py", "py", "js", "md", "txt")
+EPOCH = 1_700_000_000  # fixed commit times keep the history reproducible
+
+
+@dataclass
+class SyntheticRepoSpec:
+    files: int = 500
+    depth: int = 3
+    folders_per_level: int = 4
+    min_file_bytes: int = 200
+    max_file_bytes: int = 8000
+    commits: int = 50
+    files_per_commit: int = 5
+    branches: int = 3
+    commits_per_branch: int = 3
+    seed: int = 42
+
+
+def _folders(spec: SyntheticRepoSpec) -> List[str]:
+    """Root plus every folder of a tree `depth` levels deep with `folders_per_level` children each."""
+    folders, level = [""], [""]
+    for depth in range(spec.depth):
+        level = [
+            os.path.join(parent, f"pkg_{depth}_{i}")
+            for parent in level for i in range(spec.folders_per_level)
+        ]
+        folders.extend(level)
+    return folders
+
+
+def _tracked_folders(paths: List[str]) -> set:
+    """Folders git records: those holding a file and their parents (empty folders are dropped)."""
+    tracked = set()
+    for file_path in paths:
+        folder = os.path.dirname(file_path)
+        while folder and folder not in tracked:
+            tracked.add(folder)
+            folder = os.path.dirname(folder)
+    return tracked
+
+
+def _content(rng: random.Random, extension: str, size: int, revision: int = 0) -> bytes:
+    """Source-like text of about `size` bytes."""
+    lines, total, i = [], 0, 0
+    while total < size:
+        if extension == "py":
+            line = f"def handler_{revision}_{i}(value):\n    return value * {rng.randint(1, 999)} + {rng.random():.6f}\n\n"
+        elif extension == "js":
+            line = f"export function handler{revision}_{i}(value) {{ return value * {rng.randint(1, 999)}; }}\n"
+        else:
+            line = f"Section {revision}.{i}: " + " ".join(f"word{rng.randint(0, 5000)}" for _ in range(10)) + "\n"
+        lines.append(line)
+        total += len(line)
+        i += 1
+    return "".join(lines).encode("utf-8")[:size]
+
+
+def _signature(timestamp: int) -> pygit2.Signature:
+    return pygit2.Signature("Benchmark", "bench@example.com", timestamp, 0)
+
+
+def _commit(repo: pygit2.Repository, ref: str, index: pygit2.Index, message: str, parents: list, timestamp: int):
+    tree = index.write_tree(repo)
+    signature = _signature(timestamp)
+    return repo.create_commit(ref, signature, signature, message, tree, parents)
+
+
+def _modify(repo: pygit2.Repository, index: pygit2.Index, rng: random.Random, paths: List[str], count: int, revision: int):
+    for path in rng.sample(paths, min(count, len(paths))):
+        extension = path.rsplit(".", 1)[-1]
+        size = rng.randint(64, 2048)
+        blob = repo.create_blob(_content(rng, extension, size, revision))
+        index.add(pygit2.IndexEntry(path, blob, pygit2.GIT_FILEMODE_BLOB))
+
+
+def generate_repo(path: str, spec: SyntheticRepoSpec, overwrite: bool = True) -> Dict:
+    """Create the repository at `path` (replacing it when `overwrite`) and return its statistics."""
+    if os.path.exists(path):
+        if not overwrite:
+            raise FileExistsError(path)
+        shutil.rmtree(path)
+
+    rng = random.Random(spec.seed)
+    repo = pygit2.init_repository(path)
+    repo.remotes.create("origin", f"https://example.com/benchmarks/{os.path.basename(os.path.normpath(path))}.git")
+    folders = _folders(spec)
+
+    # Initial commit with every file, built in memory and checked out at the end
+    index = pygit2.Index()
+    paths, total_bytes = [], 0
+    for i in range(spec.files):
+        extension = EXTENSIONS[i % len(EXTENSIONS)]
+        file_path = os.path.join(folders[i % len(folders)], f"module_{i}.{extension}")
+        content = _content(rng, extension, rng.randint(spec.min_file_bytes, spec.max_file_bytes))
+        index.add(pygit2.IndexEntry(file_path, repo.create_blob(content), pygit2.GIT_FILEMODE_BLOB))
+        paths.append(file_path)
+        total_bytes += len(content)
+
+    history = [_commit(repo, "refs/heads/main", index, "Initial import", [], EPOCH)]
+    for n in range(1, spec.commits):
+        _modify(repo, index, rng, paths, spec.files_per_commit, n)
+        history.append(_commit(repo, "refs/heads/main", index, f"Update handlers, revision {n}", [history[-1]], EPOCH + n * 60))
+
+    branch_names = ["main"]
+    for b in range(spec.branches):
+        name = f"feature-{b}"
+        fork = history[rng.randrange(len(history))]
+        branch_index = pygit2.Index()
+        branch_index.read_tree(repo[fork].tree)
+        head = fork
+        for n in range(spec.commits_per_branch):
+            _modify(repo, branch_index, rng, paths, spec.files_per_commit, 10_000 + b * 1000 + n)
+            head = _commit(repo, f"refs/heads/{name}", branch_index, f"{name}: change {n}", [head], EPOCH + (spec.commits + b * 100 + n) * 60)
+        if spec.commits_per_branch == 0:
+            repo.branches.local.create(name, repo[fork])
+        branch_names.append(name)
+
+    for name in branch_names:
+        repo.references.create(f"refs/remotes/origin/{name}", repo.branches.local[name].target, force=True)
+
+    repo.set_head("refs/heads/main")
+    repo.checkout_head(strategy=CheckoutStrategy.FORCE)
+
+    return {
+        "path": path,
+        "files": spec.files,
+        "folders": len(_tracked_folders(paths)),
+        "bytes": total_bytes,
+        "commits": spec.commits + spec.branches * spec.commits_per_branch,
+        "branches": len(branch_names),
+    }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("path", help="Where to create the repository (replaced if it exists)")
+    defaults = SyntheticRepoSpec()
+    for field, value in asdict(defaults).items():
+        arg_parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=value)
+    args = arg_parser.parse_args()
+    spec = SyntheticRepoSpec(**{field: getattr(args, field) for field in asdict(defaults)})
+    print(json.dumps(generate_repo(args.path, spec), indent=2))
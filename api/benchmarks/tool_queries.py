@@ -0,0 +1,100 @@
+"""
+Bytes transferred and latency per RelationResolverAgent tool call.
+
+Compares the projection-only tools in ``agent/insight/tools/neo4j_utils.py``
+with the previous whole-node queries against a live Neo4j and prints a JSON
+report. Bytes are the size of the decoded result serialised as JSON, which
+tracks the Bolt payload closely for these string/float-heavy records.
+
+    python -m benchmarks.tool_queries --file main.py --folder src --runs 20
+"""
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from src.core.db import get_session, close_driver
+from src.agent.insight.tools.neo4j_utils import (
+    get_depend,
+    get_node_relationships_by_label,
+    find_path_between_nodes_by_label,
+)
+
+LEGACY_QUERIES = {
+    "get_depend": """
+        MATCH (f:File {name: $filename})-[:RELATED_TO]->(dep:File)
+        RETURN dep AS node
+    """,
+    "get_node_relationships_by_label": """
+        MATCH (n:Folder {name: $folder})-[r:CONTAINS]->(m)
+        RETURN type(r) AS rel_type, labels(m) AS target_labels, m AS target_node
+        LIMIT 25
+    """,
+    "find_path_between_nodes_by_label": """
+        MATCH path = shortestPath(
+            (start:Folder {name: $folder})-[:CONTAINS*..5]-(end:File {name: $filename})
+        )
+        RETURN nodes(path) AS nodes, relationships(path) AS relationships
+    """,
+}
+
+
+def payload_size(value) -> int:
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+async def run_legacy(query: str, params: dict):
+    async with get_session() as session:
+        result = await session.run(query, params)
+        records = [record async for record in result]
+    # Materialise nodes the way the old tools did before stripping embeddings
+    return [{key: (dict(value) if hasattr(value, "items") else value) for key, value in record.items()} for record in records]
+
+
+async def measure(call, runs: int) -> dict:
+    latencies = []
+    size = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = await call()
+        latencies.append((time.perf_counter() - start) * 1000)
+        size = payload_size(result)
+    latencies.sort()
+    return {
+        "bytes": size,
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+    }
+
+
+async def main(filename: str, folder: str, runs: int):
+    params = {"filename": filename, "folder": folder}
+    projected = {
+        "get_depend": lambda: get_depend(filename, "out"),
+        "get_node_relationships_by_label": lambda: get_node_relationships_by_label("Folder", folder, "out", "CONTAINS"),
+        "find_path_between_nodes_by_label": lambda: find_path_between_nodes_by_label("Folder", folder, "File", filename, "CONTAINS"),
+    }
+
+    report = {}
+    try:
+        for tool, call in projected.items():
+            legacy = await measure(lambda: run_legacy(LEGACY_QUERIES[tool], params), runs)
+            current = await measure(call, runs)
+            report[tool] = {
+                "legacy": legacy,
+                "projected": current,
+                "bytes_saved_ratio": round(1 - current["bytes"] / legacy["bytes"], 3) if legacy["bytes"] else None,
+            }
+    finally:
+        await close_driver()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--file", required=True, help="File name used by the tools")
+    arg_parser.add_argument("--folder", required=True, help="Folder name containing the file")
+    arg_parser.add_argument("--runs", type=int, default=20)
+    args = arg_parser.parse_args()
+    asyncio.run(main(args.file, args.folder, args.runs))
@@ -13,9 +13,22 @@ from src.agent.ingest.utils import should_analyze, detect_language
 # Initialize the workflow with an initial state.
 logger=logging.getLogger(__name__)
 
+async def _run_agent(name: str, agent, user_input: str):
+    """Run one ingestion agent, recording call count, latency and estimated tokens."""
+    from src.core.metrics import LLM_CALLS, LLM_SECONDS, LLM_TOKENS
+    from src.agent.insight.tools.context import estimate_tokens
+
+    LLM_CALLS.inc(agent=name)
+    LLM_TOKENS.inc(estimate_tokens(user_input), agent=name, direction="prompt")
+    with LLM_SECONDS.time(agent=name):
+        result = await agent.run(user_input)
+    LLM_TOKENS.inc(estimate_tokens(str(result.response.content or "")), agent=name, direction="completion")
+    return result
+
+
 async def run_filter_agent(repo_content:str): 
     """Runs the filter agent to classify files in the repository based on the provided content."""
-    results  = await build_filter_agent().run(repo_content)
+    results  = await _run_agent("filter", build_filter_agent(), repo_content)
     filter_result =  json_repair.loads(results.response.content)
     return filter_result
 
@@ -36,7 +49,7 @@ async def run_code_analysis_agent(file_path: str, repo_base: str):
         }
 
         if not file_content or file_content.strip() == "":
-            logger.info(f"File {file_path} is empty. Skipping all analysis.")
+            logger.info(f"File {file_path} is empty. Skipping all analysis.", extra={"entity": "file_analysis"})
             state.update({
                 "analysis_skipped": True,
                 "skip_code_parser": True,
@@ -45,9 +58,9 @@ async def run_code_analysis_agent(file_path: str, repo_base: str):
             })
             return state
 
-        logger.info(f"File {file_path} is not empty. Proceeding with analysis.")
+        logger.debug(f"File {file_path} is not empty. Proceeding with analysis.")
 
-        description_result = await build_description_agent().run(file_content)
+        description_result = await _run_agent("description", build_description_agent(), file_content)
         state["file_description"] = description_result.response.content
 
         should_analyze_result = should_analyze(file_content, language)
@@ -56,7 +69,7 @@ async def run_code_analysis_agent(file_path: str, repo_base: str):
 
         # If both are skipped
         if skip_code and skip_deps:
-            logger.info(f"File {file_path} has no relevant structure.")
+            logger.info(f"File {file_path} has no relevant structure.", extra={"entity": "file_analysis"})
             state.update({
                 "analysis_skipped": True,
                 "skip_code_parser": True,
@@ -81,13 +94,13 @@ async def run_code_analysis_agent(file_path: str, repo_base: str):
         )
 
         if not skip_deps:
-            logger.info(f"Running dependency analysis for {file_path}...")
-            dependency_result = await build_dependency_agent().run(combined_content)
+            logger.debug(f"Running dependency analysis for {file_path}...")
+            dependency_result = await _run_agent("dependency", build_dependency_agent(), combined_content)
             state["dependency_analysis"] = json_repair.loads(dependency_result.response.content)
 
         if not skip_code:
-            logger.info(f"Running class/method parser for {file_path}...")
-            parser_code_result = await build_parser_code_agent().run(file_content)
+            logger.debug(f"Running class/method parser for {file_path}...")
+            parser_code_result = await _run_agent("parser_code", build_parser_code_agent(), file_content)
             state["code_analysis"] = extract_tool_output_structures(parser_code_result)
 
         return state
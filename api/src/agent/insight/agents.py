@@ -4,8 +4,10 @@ from src.agent.insight.tools.utils import extract_node
 from src.agent.insight.tools.neo4j_utils import (
    get_node_relationships_by_label,
    get_depend,
+   get_impact,
    find_path_between_nodes_by_label,
    get_full_path_to_node,
+   traverse_node,
 )
 from src.agent.insight.tools.search import (
    search_graph,
@@ -15,6 +17,12 @@ from src.agent.insight.tools.search import (
 from src.agent.insight.prompt import (
    DISCOVERY_PROMPT, RELATION_PROMPT, RESEARCH_PROMPT, PLANNER_PROMPT,
 )
+from src.agent.insight.tools.context import with_context_budget
+
+
+def _budgeted(agent_name: str, tools: list) -> list:
+   """Bind each tool to the agent's context token budget (CONTEXT_BUDGETS)."""
+   return [with_context_budget(tool, agent_name) for tool in tools]
 
 
 
@@ -22,7 +30,7 @@ def build_discovery_agent() -> FunctionAgent:
     return FunctionAgent(
         name="DiscoveryAgent",
         description="DiscoveryAgent is an autonomous retrieval agent that identifies, extracts, and searches exactly one code entity (File, Folder, Class, or Method) from a query using a graph database. It reports its findings in a specific format *only* to the PlannerAgent.",
-        tools=[extract_node, search_graph],
+        tools=_budgeted("DiscoveryAgent", [extract_node, search_graph, traverse_node]),
         llm=get_llm_gemini(),
         system_prompt=DISCOVERY_PROMPT,
         can_handoff_to=["PlannerAgent"]
@@ -32,7 +40,7 @@ def build_relre_agent() -> FunctionAgent:
     return FunctionAgent(
         name="RelationResolverAgent",
         description="Resolves dependencies, relationships, and structural paths between entities in the codebase graph, and hands the results back to the PlannerAgent.",
-        tools=[find_path_between_nodes_by_label, get_node_relationships_by_label, get_depend, get_full_path_to_node],
+        tools=_budgeted("RelationResolverAgent", [find_path_between_nodes_by_label, get_node_relationships_by_label, get_depend, get_impact, get_full_path_to_node]),
         llm=get_llm_gemini(),
         system_prompt=RELATION_PROMPT,
         can_handoff_to=["PlannerAgent"]
@@ -43,7 +51,7 @@ def build_research_agent() -> FunctionAgent:
     return FunctionAgent(
         name="ResearcherAgent",
         description="Performs semantic search based on user queries. Returns relevant files, descriptions, and snippets back to the PlannerAgent.",
-        tools=[similarity_search],
+        tools=_budgeted("ResearcherAgent", [similarity_search]),
         llm=get_llm_gemini(),
         system_prompt=RESEARCH_PROMPT,
         can_handoff_to=["PlannerAgent"]
@@ -1,5 +1,7 @@
+import asyncio
 import logging
 from typing import Optional
+from src.core.config import config
 
 logger = logging.getLogger(__name__)
 
@@ -26,22 +28,38 @@ def build_insight_agent():
     )
 
 
-async def stream_agent_response_to_websocket(websocket, user_query: str, target_agent: Optional[str] = None):
-    """Streams LLM agent responses to a WebSocket, optionally filtering by agent name."""
+async def stream_agent_response_to_websocket(websocket, user_query: str, target_agent: Optional[str] = None) -> str:
+    """Streams LLM agent responses to a WebSocket, optionally filtering by agent name.
+
+    Returns the full streamed answer so it can be cached.
+    """
+    if config.PLANNER_MODE == "fanout":
+        from src.agent.insight.fanout import stream_fanout_response
+        return await stream_fanout_response(websocket, user_query)
+
     from llama_index.core.agent.workflow import AgentStream
+    from src.service.stream_writer import StreamWriter
     handler = build_insight_agent().run(user_msg=user_query)
     current_agent = None
+    answer_parts = []
+
+    # Deltas are often a few characters; the writer coalesces them into frames
+    try:
+        async with StreamWriter(websocket) as writer:
+            async for event in handler.stream_events():
+                if hasattr(event, "current_agent_name") and event.current_agent_name != current_agent:
+                    current_agent = event.current_agent_name
+                    logger.info(f"\n{'='*50}")
+                    logger.info(f"🤖 Agent: {current_agent}")
+                    logger.info(f"{'='*50}\n")
+
+                if isinstance(event, AgentStream):
+                    if target_agent is None or current_agent == target_agent:
+                        answer_parts.append(event.delta)
+                        await writer.write(event.delta)
+    except asyncio.CancelledError:
+        # Cancelled or timed out: stop the workflow, not just our reader
+        await handler.cancel_run()
+        raise
 
-    async for event in handler.stream_events():
-        if hasattr(event, "current_agent_name") and event.current_agent_name != current_agent:
-            current_agent = event.current_agent_name
-            logger.info(f"\n{'='*50}")
-            logger.info(f"🤖 Agent: {current_agent}")
-            logger.info(f"{'='*50}\n")
-
-        if isinstance(event, AgentStream):
-            if target_agent is None or current_agent == target_agent:
-                await websocket.send_json({
-                    "type": "stream",
-                    "payload": event.delta
-                })
+    return "".join(answer_parts)
@@ -0,0 +1,143 @@
+import re
+import json
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+BRANCH_AGENTS = ("DiscoveryAgent", "RelationResolverAgent", "ResearcherAgent")
+
+
+@dataclass
+class BranchTask:
+    agent: str
+    task: str
+
+
+@dataclass
+class BranchResult:
+    agent: str
+    task: str
+    output: Optional[str]
+    error: Optional[str]
+    seconds: float
+
+
+def _build_branch_agent(name: str):
+    from src.agent.insight.agents import (
+        build_discovery_agent,
+        build_research_agent,
+        build_relre_agent,
+    )
+    builders = {
+        "DiscoveryAgent": build_discovery_agent,
+        "RelationResolverAgent": build_relre_agent,
+        "ResearcherAgent": build_research_agent,
+    }
+    return builders[name]()
+
+
+def parse_plan(text: str, max_branches: int) -> List[BranchTask]:
+    """Read the planner's JSON task list, dropping unknown agents and duplicate tasks."""
+    match = re.search(r"\[.*\]", text or "", re.DOTALL)
+    if not match:
+        return []
+    try:
+        items = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return []
+
+    tasks, seen = [], set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        agent, task = item.get("agent"), str(item.get("task") or "").strip()
+        if agent in BRANCH_AGENTS and task and (agent, task) not in seen:
+            seen.add((agent, task))
+            tasks.append(BranchTask(agent, task))
+    return tasks[:max_branches]
+
+
+async def plan_branches(user_query: str) -> List[BranchTask]:
+    """One planning call that splits the query into independent sub-agent tasks."""
+    from src.agent.llm import get_llm_gemini
+    from src.agent.insight.prompt import FANOUT_PLAN_PROMPT
+
+    prompt = FANOUT_PLAN_PROMPT.format(query=user_query, max_branches=config.FANOUT_MAX_BRANCHES)
+    try:
+        response = await get_llm_gemini().acomplete(prompt)
+        tasks = parse_plan(response.text, config.FANOUT_MAX_BRANCHES)
+    except Exception as e:
+        logger.warning(f"Fan-out planning failed, falling back to research: {e}")
+        tasks = []
+    return tasks or [BranchTask("ResearcherAgent", user_query)]
+
+
+async def run_branch(task: BranchTask, timeout: float) -> BranchResult:
+    """Run one sub-agent on its task; a failure or timeout only loses this branch."""
+    start = time.perf_counter()
+    handler = None
+    try:
+        handler = _build_branch_agent(task.agent).run(user_msg=task.task)
+        output = await asyncio.wait_for(handler, timeout)
+        return BranchResult(task.agent, task.task, str(output), None, time.perf_counter() - start)
+    except asyncio.TimeoutError:
+        await _cancel_quietly(handler)
+        error = f"timed out after {timeout:.0f}s"
+    except asyncio.CancelledError:
+        await _cancel_quietly(handler)
+        raise
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    return BranchResult(task.agent, task.task, None, error, time.perf_counter() - start)
+
+
+async def _cancel_quietly(handler):
+    if handler is not None:
+        try:
+            await handler.cancel_run()
+        except Exception:
+            pass
+
+
+def format_findings(results: List[BranchResult]) -> str:
+    parts = []
+    for i, result in enumerate(results, start=1):
+        body = result.output if result.output is not None else f"(no result: {result.error})"
+        parts.append(f"### Finding {i}: {result.task}\n{body}")
+    return "\n\n".join(parts)
+
+
+async def stream_fanout_response(websocket, user_query: str) -> str:
+    """
+    Planner mode that dispatches independent sub-agent tasks concurrently and
+    synthesizes their results in one streamed call, instead of handing off
+    to one sub-agent at a time. Returns the full streamed answer.
+    """
+    from src.agent.llm import get_llm_gemini
+    from src.agent.insight.prompt import SYNTHESIS_PROMPT
+    from src.service.stream_writer import StreamWriter
+
+    start = time.perf_counter()
+    tasks = await plan_branches(user_query)
+    logger.info(f"Fan-out plan: {[(t.agent, t.task) for t in tasks]}")
+
+    results = await asyncio.gather(*(run_branch(task, config.FANOUT_BRANCH_TIMEOUT) for task in tasks))
+    for result in results:
+        status = "ok" if result.error is None else result.error
+        logger.info(f"🤖 {result.agent} finished in {result.seconds:.2f}s ({status})")
+
+    prompt = SYNTHESIS_PROMPT.format(query=user_query, findings=format_findings(results))
+    answer_parts = []
+    async with StreamWriter(websocket) as writer:
+        async for chunk in await get_llm_gemini(pro=True).astream_complete(prompt):
+            if chunk.delta:
+                answer_parts.append(chunk.delta)
+                await writer.write(chunk.delta)
+
+    logger.info(f"Fan-out answer for '{user_query}' took {time.perf_counter() - start:.2f}s")
+    return "".join(answer_parts)
@@ -0,0 +1,203 @@
+import re
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+PLANNER_ROUTE = "planner"
+
+_LABEL_WORDS = {
+    "file": "File",
+    "folder": "Folder",
+    "directory": "Folder",
+    "dir": "Folder",
+    "class": "Class",
+    "method": "Method",
+    "function": "Method",
+}
+_LABEL = r"(?:(?P<{name}>file|folder|directory|dir|class|method|function) )?"
+_ENTITY = r"`?(?P<{name}>[\w./-]+?)(?:\(\))?`?"
+_ARTICLE = r"(?:the )?"
+
+
+def _pattern(template: str) -> re.Pattern:
+    return re.compile(template, re.IGNORECASE)
+
+
+PATH_BETWEEN = _pattern(
+    rf"^(?:find |show(?: me)? |what is |get )?{_ARTICLE}(?:shortest )?(?P<kind>dependency |import )?path "
+    rf"(?:between|from) {_ARTICLE}{_LABEL.format(name='start_label')}{_ENTITY.format(name='start')} "
+    rf"(?:and|to) {_ARTICLE}{_LABEL.format(name='end_label')}{_ENTITY.format(name='end')}$"
+)
+FULL_PATH = _pattern(
+    rf"^(?:where is|locate|(?:what is |show(?: me)? |get )?{_ARTICLE}(?:full )?path (?:of|to)) "
+    rf"{_ARTICLE}{_LABEL.format(name='label')}{_ENTITY.format(name='name')}(?: located)?$"
+)
+DEPENDS_ON = _pattern(
+    rf"^(?:what (?:does|do) {_ARTICLE}(?:file )?{_ENTITY.format(name='name')} (?:depend on|import)"
+    rf"|(?:list |show(?: me)? |get )?{_ARTICLE}(?:dependencies|imports) of {_ARTICLE}(?:file )?{_ENTITY.format(name='name2')})$"
+)
+DEPENDED_ON_BY = _pattern(
+    rf"^(?:(?:what|which files|who) (?:depends? on|imports?|uses?) {_ARTICLE}(?:file )?{_ENTITY.format(name='name')}"
+    rf"|(?:list |show(?: me)? |get )?{_ARTICLE}(?:dependents|importers) of {_ARTICLE}(?:file )?{_ENTITY.format(name='name2')})$"
+)
+ENTITY = _pattern(
+    rf"^(?:show|find|get|open|display|give)(?: me)? {_ARTICLE}{_LABEL.format(name='label')}"
+    rf"{_ENTITY.format(name='name')}(?: (?P<label_after>file|folder|directory|dir|class|method|function))?$"
+)
+
+_HAS_EXTENSION = re.compile(r"\.[A-Za-z0-9]{1,8}$")
+_CAMEL_CASE = re.compile(r"^[A-Z][a-z0-9]+(?:[A-Z][a-z0-9]*)+$")
+
+
+@dataclass
+class RouteDecision:
+    route: str
+    params: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def is_fast_path(self) -> bool:
+        return self.route != PLANNER_ROUTE
+
+
+def infer_label(name: str, label_word: Optional[str] = None) -> Optional[str]:
+    """Label from an explicit word ("class Foo") or from the shape of the name; None when unsure."""
+    if label_word:
+        return _LABEL_WORDS[label_word.lower()]
+    if _HAS_EXTENSION.search(name):
+        return "File"
+    if _CAMEL_CASE.match(name):
+        return "Class"
+    return None
+
+
+def classify_query(query: str) -> RouteDecision:
+    """
+    Recognise lookups the Neo4j tools can answer directly: one named entity,
+    the path to or between entities, or a file's dependency listing. Anything
+    open-ended, or with an entity whose label cannot be told, goes to the planner.
+    """
+    text = " ".join(query.strip().rstrip("?.!").split())
+
+    match = PATH_BETWEEN.match(text)
+    if match:
+        start_label = infer_label(match["start"], match["start_label"])
+        end_label = infer_label(match["end"], match["end_label"])
+        if start_label and end_label:
+            return RouteDecision("path", {
+                "start_label": start_label, "start_name": match["start"],
+                "end_label": end_label, "end_name": match["end"],
+                "relationship": "RELATED_TO" if match["kind"] else "CONTAINS",
+            })
+
+    match = FULL_PATH.match(text)
+    if match:
+        label = infer_label(match["name"], match["label"])
+        if label:
+            return RouteDecision("path", {"target_label": label, "target_name": match["name"]})
+
+    for pattern, direction in ((DEPENDS_ON, "out"), (DEPENDED_ON_BY, "in")):
+        match = pattern.match(text)
+        if match:
+            name = match["name"] or match["name2"]
+            if infer_label(name) == "File":
+                return RouteDecision("dependency", {"filename": name, "direction": direction})
+
+    match = ENTITY.match(text)
+    if match:
+        label = infer_label(match["name"], match["label"] or match["label_after"])
+        if label:
+            return RouteDecision("entity", {"label": label, "name": match["name"]})
+
+    return RouteDecision(PLANNER_ROUTE)
+
+
+async def answer_fast_path(decision: RouteDecision) -> Optional[str]:
+    """Answer a fast-path route with the Neo4j tools; None when nothing matched (use the planner)."""
+    from src.agent.insight.tools.hybrid import exact_lookup
+    from src.agent.insight.tools.utils import format_search_results
+    from src.agent.insight.tools.neo4j_utils import (
+        traverse_node,
+        get_depend,
+        get_full_path_to_node,
+        find_path_between_nodes_by_label,
+    )
+
+    params = decision.params
+    if decision.route == "entity":
+        if params["label"] == "Folder":
+            tree = await traverse_node(params["name"])
+            return None if tree == "No matching node found." else tree
+        records = await exact_lookup(params["label"], params["name"], 5)
+        return format_search_results(records).strip() if records else None
+
+    if decision.route == "path" and "target_name" in params:
+        paths = await get_full_path_to_node(params["target_label"], params["target_name"])
+        if not paths:
+            return None
+        return "\n".join([f"**{params['target_name']}** is located at:"] + [f"- `{path}`" for path in paths])
+
+    if decision.route == "path":
+        paths = await find_path_between_nodes_by_label(
+            params["start_label"], params["start_name"],
+            params["end_label"], params["end_name"],
+            params["relationship"],
+        )
+        if not paths:
+            return None
+        lines = []
+        for path in paths:
+            steps = [f"`{path['nodes'][0].get('name')}`"]
+            for rel, node in zip(path["relationships"], path["nodes"][1:]):
+                steps.append(f"-[{rel}]- `{node.get('name')}`")
+            lines.append(" ".join(steps))
+        return "\n".join(lines)
+
+    if decision.route == "dependency":
+        dependencies = await get_depend(params["filename"], params["direction"])
+        if not dependencies:
+            return None
+        heading = "depends on" if params["direction"] == "out" else "is used by"
+        lines = [f"**{params['filename']}** {heading} {len(dependencies)} file(s):"]
+        for node in dependencies:
+            description = (node.get("description") or "").split("\n")[0]
+            lines.append(f"- `{node.get('path') or node.get('name')}`" + (f" — {description}" if description else ""))
+        return "\n".join(lines)
+
+    return None
+
+
+class RouteLatency:
+    """Rolling per-route latency samples with p50/p95."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, route: str, seconds: float):
+        self._samples.setdefault(route, deque(maxlen=self.window)).append(seconds * 1000)
+
+    def stats(self) -> Dict[str, dict]:
+        report = {}
+        for route, samples in self._samples.items():
+            ordered = sorted(samples)
+            report[route] = {
+                "count": len(ordered),
+                "p50_ms": round(ordered[len(ordered) // 2], 3),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+            }
+        return report
+
+
+_latency: Optional[RouteLatency] = None
+
+
+def get_route_latency() -> RouteLatency:
+    global _latency
+    if _latency is None:
+        _latency = RouteLatency(config.ROUTE_LATENCY_WINDOW)
+    return _latency
+
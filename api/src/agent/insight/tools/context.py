@@ -0,0 +1,118 @@
+import functools
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Set
+from src.core.config import config
+
+# Code and English average close to 4 characters per token on the models we
+# use; good enough for budgeting without loading a tokenizer.
+CHARS_PER_TOKEN = 4
+
+# A snippet whose lines are mostly already in the context adds nothing
+DUPLICATE_OVERLAP = 0.8
+
+# Below this, a truncated snippet is not worth including
+MIN_SNIPPET_TOKENS = 40
+
+_context_budget: ContextVar[Optional[int]] = ContextVar("context_budget", default=None)
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Fast local token estimate, no tokenizer round-trip."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: Optional[str], max_tokens: int) -> str:
+    """Cut text to a token budget on line boundaries, noting how much was left out."""
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text or ""
+    max_chars = max(0, max_tokens * CHARS_PER_TOKEN)
+    lines = text.splitlines()
+    kept, used = [], 0
+    for line in lines:
+        if used + len(line) + 1 > max_chars:
+            break
+        kept.append(line)
+        used += len(line) + 1
+    if not kept and lines:
+        kept = [lines[0][:max_chars]]
+    return "\n".join(kept) + f"\n… ({len(lines) - len(kept)} more lines truncated)"
+
+
+def budget_for(agent_name: Optional[str]) -> int:
+    return config.CONTEXT_BUDGETS.get(agent_name, config.CONTEXT_DEFAULT_BUDGET)
+
+
+def current_budget() -> int:
+    """Token budget for the tool output being built (set per agent by with_context_budget)."""
+    budget = _context_budget.get()
+    return budget if budget is not None else config.CONTEXT_DEFAULT_BUDGET
+
+
+def with_context_budget(tool, agent_name: str):
+    """Wrap an async tool so its output is assembled within the agent's token budget."""
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        token = _context_budget.set(budget_for(agent_name))
+        try:
+            return await tool(*args, **kwargs)
+        finally:
+            _context_budget.reset(token)
+    return wrapper
+
+
+class ContentDeduper:
+    """Remembers the code lines already placed in the context."""
+
+    def __init__(self):
+        self._seen: Set[str] = set()
+
+    @staticmethod
+    def _lines(content: str) -> Set[str]:
+        return {line.strip() for line in content.splitlines() if len(line.strip()) > 2}
+
+    def is_duplicate(self, content: Optional[str]) -> bool:
+        """True when most of content is already in the context; otherwise record it."""
+        lines = self._lines(content or "")
+        if not lines:
+            return False
+        if len(lines & self._seen) / len(lines) >= DUPLICATE_OVERLAP:
+            return True
+        self._seen |= lines
+        return False
+
+
+def assemble_snippets(records: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+    """
+    Rank candidate snippets by score, drop duplicates, and fit their content
+    into a token budget. Higher-ranked snippets get the larger share; snippets
+    that no longer fit keep only their name and description as a summary.
+    """
+    ranked = sorted(records, key=lambda r: r.get("score") or 0.0, reverse=True)
+    deduper = ContentDeduper()
+    seen_ids = set()
+    assembled = []
+    remaining = budget
+
+    for i, record in enumerate(ranked):
+        key = record.get("node_id") or (record.get("path"), record.get("name"))
+        if key in seen_ids:
+            continue
+        seen_ids.add(key)
+
+        snippet = dict(record)
+        remaining -= estimate_tokens(snippet.get("name")) + estimate_tokens(snippet.get("description"))
+        content = snippet.get("content") or ""
+        if deduper.is_duplicate(content):
+            snippet["content"] = ""
+            snippet["duplicate"] = True
+        else:
+            share = remaining // max(1, min(2, len(ranked) - i))
+            snippet["content"] = truncate_to_tokens(content, share) if share >= MIN_SNIPPET_TOKENS else ""
+            remaining -= estimate_tokens(snippet["content"])
+        assembled.append(snippet)
+
+        if remaining <= 0:
+            break
+    return assembled
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Dict, List
+from src.core.graph.store import get_graph_store
+from src.agent.insight.tools.query_embedding import get_query_embedding
+
+# Constant from the original reciprocal rank fusion paper; dampens the
+# advantage of the very first ranks so both retrievers get a say.
+RRF_K = 60
+
+SEARCH_FIELDS = ["node_id", "name", "path", "file_path", "description", "content"]
+
+
+def search_record(node: Dict, score: float) -> Dict:
+    """Shape a store hit like the search results the tools format."""
+    return {
+        "node_id": node.get("node_id"),
+        "name": node.get("name"),
+        "path": node.get("path") or node.get("file_path"),
+        "description": node.get("description"),
+        "content": node.get("content") or "",
+        "score": score,
+    }
+
+
+async def exact_lookup(node_label: str, node_name: str, limit: int) -> List[Dict]:
+    """Match nodes by exact name through the `name` lookup index."""
+    nodes = await get_graph_store().find_nodes(node_label, {"name": node_name.strip()}, fields=SEARCH_FIELDS, limit=limit)
+    return [search_record(node, 1.0) for node in nodes]
+
+
+async def fulltext_lookup(node_label: str, text: str, limit: int) -> List[Dict]:
+    hits = await get_graph_store().fulltext_search(node_label, text, limit, fields=SEARCH_FIELDS)
+    return [search_record(node, score) for node, score in hits]
+
+
+async def vector_lookup(node_label: str, text: str, limit: int) -> List[Dict]:
+    embedding = await get_query_embedding(text)
+    if not embedding:
+        return []
+
+    hits = await get_graph_store().vector_search(node_label, ["name"], embedding, limit, fields=SEARCH_FIELDS)
+    return [search_record(node, score) for node, score in hits]
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict]], top_k: int, k: int = RRF_K) -> List[Dict]:
+    """Merge ranked result lists by summing 1 / (k + rank) per node_id."""
+    scores: Dict[str, float] = {}
+    records: Dict[str, Dict] = {}
+    for results in result_lists:
+        for rank, record in enumerate(results, start=1):
+            key = record.get("node_id") or f"{record.get('path')}:{record.get('name')}"
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            records.setdefault(key, record)
+
+    ranked = sorted(scores, key=scores.get, reverse=True)[:top_k]
+    return [{**records[key], "score": scores[key]} for key in ranked]
+
+
+async def hybrid_search(node_label: str, text: str, top_k: int = 5) -> List[Dict]:
+    """
+    Find nodes by name: exact matches first (one index seek, no embedding),
+    otherwise full-text and vector retrieval in parallel, fused by RRF.
+    """
+    exact = await exact_lookup(node_label, text, top_k)
+    if exact:
+        return exact
+
+    fulltext, vector = await asyncio.gather(
+        fulltext_lookup(node_label, text, top_k * 2),
+        vector_lookup(node_label, text, top_k * 2),
+    )
+    return reciprocal_rank_fusion([fulltext, vector], top_k)
@@ -1,61 +1,176 @@
-from typing import Dict, Literal, List, Any
-from src.core.db import get_session
+from itertools import islice
+from typing import Dict, Literal, List, Any, Optional
+from src.core.config import config
+from src.core.graph.store import get_graph_store
+from src.core.graph_snapshot import STRUCTURAL_RELS, snapshots_with
+from src.agent.insight.tools.context import assemble_snippets, current_budget, estimate_tokens
 from src.agent.insight.tools.utils import (
     build_nested_tree,
-    format_nested_tree,
+    iter_nested_tree,
 )
 
-async def traverse_node(folder_name: str) -> str:
-    """Recursively gather all contents under a folder."""
-    cypher = """
-    MATCH path = (f:Folder {name: $folder_name})-[:CONTAINS|HAS*]->(node)
-    WHERE NOT node:Folder
-    RETURN [n IN nodes(path) | n.name] AS path_names,
-        labels(node)[0] AS label,
-        node.description AS description,
-        node.content AS content
-    ORDER BY path_names
-
+async def traverse_node(
+    folder_name: str,
+    max_depth: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+    include_content: bool = False,
+    cursor: Optional[str] = None,
+) -> str:
+    """
+    Gather the contents under a folder as a tree, bounded in depth and size.
+    Content previews are only included when include_content is True. When more
+    entries remain, the output ends with a cursor to pass back for the next page.
     """
+    max_depth = max_depth or config.TRAVERSE_MAX_DEPTH
+    max_nodes = max_nodes or config.TRAVERSE_MAX_NODES
+    offset = int(cursor) if cursor and cursor.isdigit() else 0
 
-    async with get_session() as session:
-        result = await session.run(cypher, {"folder_name": folder_name})
-        records = [r async for r in result]
+    # One extra row tells whether another page exists
+    records = await _traverse_from_snapshot(folder_name, max_depth, offset, max_nodes + 1, include_content)
+    if records is None:
+        rows = await get_graph_store().subtree(
+            config.FOLDER_LABEL, {"name": folder_name}, STRUCTURAL_RELS, max_depth,
+            exclude_labels=[config.FOLDER_LABEL],
+            skip=offset,
+            limit=max_nodes + 1,
+            fields=["description", "content"] if include_content else ["description"],
+            preview_chars=config.TOOL_CONTENT_PREVIEW_CHARS,
+        )
+        records = [
+            {
+                "path_names": row["path_names"],
+                "label": row["label"],
+                "description": row["node"].get("description"),
+                "content": row["node"].get("content"),
+            }
+            for row in rows
+        ]
 
     if not records:
         return "No matching node found."
 
-    nested_tree = build_nested_tree(records)
-    formatted_tree = f"{folder_name}\n" + format_nested_tree(nested_tree)
-    return formatted_tree
+    has_more = len(records) > max_nodes
+    page = records[:max_nodes]
+    nested_tree = build_nested_tree(page)
+
+    # Split the agent's token budget between the nodes that carry content
+    budget = current_budget()
+    with_content = sum(1 for record in page if record.get("content"))
+    content_tokens = budget // with_content if with_content else None
+
+    lines = [folder_name]
+    used = estimate_tokens(folder_name)
+    for line in iter_nested_tree(nested_tree, content_tokens=content_tokens):
+        used += estimate_tokens(line) + 1
+        if used > budget:
+            lines.append("… tree truncated to fit the context budget; traverse a subfolder for more detail")
+            break
+        lines.append(line)
+    if has_more:
+        lines.append(f"… more entries under {folder_name}; call again with cursor=\"{offset + max_nodes}\"")
+    return "\n".join(lines)
+
+
+async def _traverse_from_snapshot(
+    folder_name: str, max_depth: int, offset: int, limit: int, include_content: bool,
+) -> Optional[List[Dict[str, Any]]]:
+    """Walk the folder subtree in the in-memory snapshot; None when no snapshot knows the folder."""
+    matches = await snapshots_with("Folder", folder_name)
+    if not matches:
+        return None
+
+    def rows():
+        for snapshot, roots in matches:
+            for root in roots:
+                for node, path in snapshot.iter_subtree(root, max_depth):
+                    if snapshot.labels[node] != "Folder":
+                        yield snapshot.labels[node], snapshot.node_ids[node], [snapshot.names[i] for i in path]
+
+    page = list(islice(rows(), offset, offset + limit))
+    nodes = await fetch_nodes_by_id([(label, node_id) for label, node_id, _ in page])
+    return [
+        {
+            "path_names": path_names,
+            "label": label,
+            "description": nodes.get(node_id, {}).get("description"),
+            "content": nodes.get(node_id, {}).get("content") if include_content else None,
+        }
+        for label, node_id, path_names in page
+    ]
 
 
+# Node fields exposed to agents; embeddings never leave the store and
+# `content` is cut to TOOL_CONTENT_PREVIEW_CHARS
+NODE_FIELDS = [
+    "node_id", "name", "path", "file_path", "parent_path",
+    "repository", "extension", "description", "content",
+]
+
+
+# Relationships returned per call by the neighbour tools
+NEIGHBOR_LIMIT = 25
+
+
+def fit_to_budget(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Fit the content of the returned nodes into the agent's token budget with
+    assemble_snippets: earlier nodes get the larger share, repeated code is
+    dropped, and nodes past the budget keep their other properties only.
+    """
+    # Positions as ids, so a node listed twice is budgeted twice
+    snippets = assemble_snippets([{**node, "node_id": i} for i, node in enumerate(nodes)], current_budget())
+    contents = {snippet["node_id"]: snippet["content"] for snippet in snippets}
+    fitted = []
+    for i, node in enumerate(nodes):
+        node = dict(node)
+        if contents.get(i):
+            node["content"] = contents[i]
+        else:
+            node.pop("content", None)
+        fitted.append(node)
+    return fitted
+
+
+async def fetch_nodes_by_id(nodes: List[tuple]) -> Dict[str, Dict[str, Any]]:
+    """Fetch projected properties for (label, node_id) pairs in one round-trip, keyed by node_id."""
+    return await get_graph_store().get_nodes(
+        nodes, fields=NODE_FIELDS, preview_chars=config.TOOL_CONTENT_PREVIEW_CHARS,
+    )
+
 
 async def get_depend(filename: str, direction: Literal["out", "in"]) -> List[Dict[str, Any]]:
-    """Get full node objects of dependencies related to a given file."""
-    if direction == "out":
-        cypher = """
-        MATCH (f:File {name: $filename})-[:RELATED_TO]->(dep:File)
-        RETURN dep AS node
-        """
-    else:
-        cypher = """
-        MATCH (f:File {name: $filename})<-[:RELATED_TO]-(dep:File)
-        RETURN dep AS node
-        """
-
-    async with get_session() as session:
-        result = await session.run(cypher, {"filename": filename.strip()})
-        records = [r async for r in result]
-
-    cleaned_nodes = []
-    for record in records:
-        node = record.values()[0]
-        if hasattr(node, "items"):
-            cleaned = {k: v for k, v in dict(node).items() if not k.startswith("embedding")}
-            cleaned_nodes.append(cleaned)
-
-    return cleaned_nodes
+    """Get full node objects of dependencies related to a given file, fitted to the context budget."""
+    relationships = await get_graph_store().neighbors(
+        config.FILE_LABEL, {"name": filename.strip()}, ["RELATED_TO"], direction,
+        target_label=config.FILE_LABEL,
+        limit=NEIGHBOR_LIMIT,
+        fields=NODE_FIELDS,
+        preview_chars=config.TOOL_CONTENT_PREVIEW_CHARS,
+    )
+    return fit_to_budget([relationship["target_node"] for relationship in relationships])
+
+# Analytics properties of File nodes -> keys reported by get_impact
+IMPACT_FIELDS = {
+    "path": "path",
+    "downstream": "depends_on",
+    "downstream_count": "depends_on_count",
+    "upstream": "depended_on_by",
+    "upstream_count": "depended_on_by_count",
+    "in_cycle": "in_import_cycle",
+    "scc_size": "cycle_size",
+    "pagerank": "pagerank",
+    "in_degree": "direct_dependents",
+    "out_degree": "direct_dependencies",
+}
+
+async def get_impact(filename: str) -> List[Dict[str, Any]]:
+    """
+    Get precomputed dependency analytics for a file in one lookup: every file it
+    transitively depends on (downstream), every file that transitively depends on
+    it (upstream), import-cycle membership and centrality.
+    """
+    files = await get_graph_store().find_nodes(config.FILE_LABEL, {"name": filename.strip()}, fields=list(IMPACT_FIELDS))
+    return [{IMPACT_FIELDS[key]: value for key, value in node.items()} for node in files]
 
 async def get_node_relationships_by_label(
     label: Literal["File", "Folder", "Class", "Method"],
@@ -64,67 +179,18 @@ async def get_node_relationships_by_label(
     relationship_type: Literal["CONTAINS", "RELATED_TO"],           
 ):
     """Fetch relationships of a node with the given label and name.
-    Excludes any node properties that start with 'embedding'.
+    Only projected node properties are returned (no embeddings, content fitted to the context budget).
     """
-    limit = 25
-    rel_filter = f":{relationship_type}" if relationship_type else ""
-
-    if direction == "out":
-        cypher = f"""
-        MATCH (n:{label} {{name: $name}})-[r{rel_filter}]->(m)
-        RETURN type(r) AS rel_type, labels(m) AS target_labels, m AS target_node
-        LIMIT $limit
-        """
-    elif direction == "in":
-        cypher = f"""
-        MATCH (m)-[r{rel_filter}]->(n:{label} {{name: $name}})
-        RETURN type(r) AS rel_type, labels(m) AS target_labels, m AS target_node
-        LIMIT $limit
-        """
-    else:  # both
-        cypher = f"""
-        MATCH (n:{label} {{name: $name}})
-        OPTIONAL MATCH (n)-[r1{rel_filter}]->(m1)
-        OPTIONAL MATCH (m2)-[r2{rel_filter}]->(n)
-        RETURN 
-            type(r1) AS out_rel, labels(m1) AS out_labels, m1 AS out_node,
-            type(r2) AS in_rel, labels(m2) AS in_labels, m2 AS in_node
-        LIMIT $limit
-        """
-
-    async with get_session() as session:
-        result = await session.run(cypher, {"name": name, "limit": limit})
-        records = [record async for record in result] 
-
-    relationships = []
-
-    for record in records:
-        if direction in ("out", "both") and record.get("out_rel") and record.get("out_node"):
-            node = {k: v for k, v in dict(record["out_node"]).items() if not k.startswith("embedding")}
-            relationships.append({
-                "direction": "out",
-                "relationship_type": record["out_rel"],
-                "target_labels": record["out_labels"],
-                "target_node": node,
-            })
-        if direction in ("in", "both") and record.get("in_rel") and record.get("in_node"):
-            node = {k: v for k, v in dict(record["in_node"]).items() if not k.startswith("embedding")}
-            relationships.append({
-                "direction": "in",
-                "relationship_type": record["in_rel"],
-                "target_labels": record["in_labels"],
-                "target_node": node,
-            })
-        if direction in ("out", "in") and record.get("rel_type") and record.get("target_node"):
-            node = {k: v for k, v in dict(record["target_node"]).items() if not k.startswith("embedding")}
-            relationships.append({
-                "direction": direction,
-                "relationship_type": record["rel_type"],
-                "target_labels": record["target_labels"],
-                "target_node": node,
-            })
-
-    return relationships
+    relationships = await get_graph_store().neighbors(
+        label, {"name": name},
+        [relationship_type] if relationship_type else None,
+        direction,
+        limit=NEIGHBOR_LIMIT,
+        fields=NODE_FIELDS,
+        preview_chars=config.TOOL_CONTENT_PREVIEW_CHARS,
+    )
+    nodes = fit_to_budget([relationship["target_node"] for relationship in relationships])
+    return [{**relationship, "target_node": node} for relationship, node in zip(relationships, nodes)]
 
 async def find_path_between_nodes_by_label(
     start_label: Literal["File", "Folder", "Class", "Method"],
@@ -133,37 +199,49 @@ async def find_path_between_nodes_by_label(
     end_name: str,
     relationship_filter: Literal["CONTAINS", "RELATED_TO"],
 ):
-    """Finds the shortest path between two nodes via a specific relationship type and label."""
+    """
+    Finds the shortest path between two nodes via a specific relationship type and label.
+    Node content along the paths is fitted to the context budget.
+    """
     max_depth = 5
 
-    # Relationship filter must be injected directly into the Cypher query
-    cypher = f"""
-    MATCH path = shortestPath(
-        (start:{start_label} {{name: $start_name}})-[:{relationship_filter}*..{max_depth}]-(end:{end_label} {{name: $end_name}})
+    paths = await _shortest_path_from_snapshot(
+        start_label, start_name, end_label, end_name, relationship_filter, max_depth
     )
-    RETURN nodes(path) AS nodes, relationships(path) AS relationships
-    """
+    if paths is None:
+        paths = await get_graph_store().shortest_paths(
+            start_label, {"name": start_name},
+            end_label, {"name": end_name},
+            [relationship_filter], max_depth,
+            fields=NODE_FIELDS,
+            preview_chars=config.TOOL_CONTENT_PREVIEW_CHARS,
+        )
 
-    async with get_session() as session:
-        result = await session.run(cypher, {
-            "start_name": start_name,
-            "end_name": end_name
-        })
-        records = [record async for record in result]
-
-    paths = []
-    for record in records:
-        node_path = [
-            {k: v for k, v in dict(n).items() if not k.startswith("embedding")}
-            for n in record["nodes"]
-        ]
-        rel_path = [r.type for r in record["relationships"]]
-        paths.append({
-            "nodes": node_path,
-            "relationships": rel_path
-        })
+    nodes = iter(fit_to_budget([node for path in paths for node in path["nodes"]]))
+    return [{**path, "nodes": [next(nodes) for _ in path["nodes"]]} for path in paths]
+
+async def _shortest_path_from_snapshot(start_label, start_name, end_label, end_name, relationship_filter, max_depth):
+    """
+    Shortest path of every start/end pair over the in-memory snapshots, like
+    GraphStore.shortest_paths; None when no snapshot holds both endpoints.
+    """
+    found, holds_both = [], False
+    for snapshot, starts in await snapshots_with(start_label, start_name):
+        ends = snapshot.find(end_label, end_name)
+        if not ends:
+            continue
+        holds_both = True
+        for start in starts:
+            for path, rel_path in snapshot.shortest_paths(start, ends, [relationship_filter], max_depth):
+                found.append(([(snapshot.labels[i], snapshot.node_ids[i], snapshot.names[i]) for i in path], rel_path))
+    if not holds_both:
+        return None
 
-    return paths
+    nodes = await fetch_nodes_by_id([(label, node_id) for path, _ in found for label, node_id, _ in path])
+    return [{
+        "nodes": [nodes.get(node_id, {"name": name}) for _, node_id, name in path],
+        "relationships": rel_path,
+    } for path, rel_path in found]
 
 async def get_full_path_to_node(
     target_label: Literal["File", "Folder", "Class", "Method"],
@@ -173,20 +251,16 @@ async def get_full_path_to_node(
     Finds the full hierarchical path (using :CONTAINS relationships)
     from the root node labeled 'Repository' down to the specified target node.
     """
-    cypher = f"""
-    MATCH (root:Repository)
-    MATCH path = (root)-[:CONTAINS*]->(target:{target_label} {{name: $target_name}})
-    RETURN [n in nodes(path) | n.name] AS path_names // Return the list of node names in order
-    """
-
-    async with get_session() as session:
-        result = await session.run(cypher, {"target_name": target_name})
-        records = await result.data()
+    paths = await get_graph_store().shortest_paths(
+        config.REPO_LABEL, {},
+        target_label, {"name": target_name},
+        ["CONTAINS"], direction="out", fields=["name"],
+    )
 
     paths_as_strings = []
-    for record in records:
-        path_names = record.get("path_names")
+    for path in paths:
+        path_names = [node.get("name") for node in path["nodes"]]
         if path_names:
             paths_as_strings.append("/".join(path_names))
 
-    return paths_as_strings
\ No newline at end of file
+    return paths_as_strings
@@ -0,0 +1,116 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from src.core.config import config
+from src.core.metrics import CACHE_REQUESTS
+from src.core.tracing import set_attributes
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingService:
+    """Embeds agent queries off the event loop with an LRU+TTL cache.
+
+    Concurrent requests for the same text share one model call: the first
+    caller starts a task and everyone else awaits it.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return " ".join(text.split())
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, embedding = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return embedding
+
+    def _store(self, key: str, embedding: List[float]):
+        self._cache[key] = (time.monotonic() + self.ttl, embedding)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    async def _compute(self, key: str) -> List[float]:
+        from src.utils.helper import get_embedding
+        try:
+            embedding = await asyncio.to_thread(get_embedding, key)
+            if embedding:
+                self._store(key, embedding)
+            return embedding
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def embed(self, text: str) -> List[float]:
+        key = self._key(text)
+        if not key:
+            return []
+
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache="query_embedding", result="hit")
+            set_attributes({"cache.query_embedding": "hit"})
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            CACHE_REQUESTS.inc(cache="query_embedding", result="miss")
+            set_attributes({"cache.query_embedding": "miss"})
+            task = asyncio.create_task(self._compute(key))
+            self._in_flight[key] = task
+        else:
+            self.coalesced += 1
+            CACHE_REQUESTS.inc(cache="query_embedding", result="coalesced")
+            set_attributes({"cache.query_embedding": "coalesced"})
+
+        # Shield so one cancelled caller does not cancel the shared model call
+        return await asyncio.shield(task)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+_service: Optional[QueryEmbeddingService] = None
+
+
+def get_query_embedding_service() -> QueryEmbeddingService:
+    global _service
+    if _service is None:
+        _service = QueryEmbeddingService(
+            max_size=config.QUERY_EMBED_CACHE_SIZE,
+            ttl=config.QUERY_EMBED_CACHE_TTL,
+        )
+    return _service
+
+
+async def get_query_embedding(text: str) -> List[float]:
+    """Cached, non-blocking replacement for get_embedding on the query path."""
+    return await get_query_embedding_service().embed(text)
@@ -1,6 +1,11 @@
 import re
-from typing import Dict, Literal, List, Optional, Any
-from collections import defaultdict
+from typing import Dict, Iterator, Literal, List, Optional, Any
+from src.agent.insight.tools.context import (
+    ContentDeduper,
+    assemble_snippets,
+    current_budget,
+    truncate_to_tokens,
+)
 
 
 async def extract_node(node_name: str, node_label: Literal["File", "Folder", "Class", "Method"]) -> Dict[str, str]:
@@ -9,54 +14,84 @@ async def extract_node(node_name: str, node_label: Literal["File", "Folder", "Cl
 
 def build_nested_tree(records: List[dict]) -> dict:
     """Build nested dict from path lists."""
-    tree = lambda: defaultdict(tree)
-    root = tree()
+    root: Dict[str, Any] = {}
     for record in records:
         current = root
         for part in record["path_names"]:
-            current = current[part]
+            current = current.setdefault(part, {})
         current["_meta"] = {
             "label": record["label"],
             "description": record.get("description"),
+            "content": record.get("content"),
         }
     return root
 
-def format_nested_tree(tree: Dict[str, Any], prefix: str = "") -> str:
-    """Convert nested tree to formatted text with brief descriptions."""
-    lines = []
-    entries = sorted((k, v) for k, v in tree.items() if k != "_meta")
-    total_entries = len(entries)
+def iter_nested_tree(tree: Dict[str, Any], prefix: str = "", content_tokens: Optional[int] = None) -> Iterator[str]:
+    """Yield the formatted lines of a nested tree, depth-first, using an explicit stack.
 
-    for idx, (name, subtree) in enumerate(entries):
-        connector = "└── " if idx == total_entries - 1 else "├── "
-        lines.append(f"{prefix}{connector}{name}")
+    With content_tokens, each node's content is cut to that many tokens and
+    content already shown by an enclosing node (a class inside its file) is skipped.
+    """
+    deduper = ContentDeduper()
+    stack = [(_tree_entries(tree), prefix)]
+    while stack:
+        entries, prefix = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+
+        name, subtree, is_last = entry
+        connector = "└── " if is_last else "├── "
+        extension = "    " if is_last else "│   "
+        yield f"{prefix}{connector}{name}"
 
         meta = subtree.get("_meta", {})
         description = meta.get("description")
         if description:
-            brief_desc = (description[:250] + "…") if len(description) > 100 else description
-            desc_prefix = "    " if idx == total_entries - 1 else "│   "
-            lines.append(f"{prefix}{desc_prefix}📌 {brief_desc}")
+            brief_desc = (description[:250] + "…") if len(description) > 250 else description
+            yield f"{prefix}{extension}📌 {brief_desc}"
+        content = meta.get("content")
+        if content and content_tokens is not None:
+            content = "" if deduper.is_duplicate(content) else truncate_to_tokens(content, content_tokens)
+        if content:
+            for line in content.rstrip().splitlines():
+                yield f"{prefix}{extension}    {line}"
 
-        # Recursive call for nested children
-        extension = "    " if idx == total_entries - 1 else "│   "
-        subtree_str = format_nested_tree(subtree, prefix + extension)
-        if subtree_str:
-            lines.append(subtree_str)
+        stack.append((_tree_entries(subtree), prefix + extension))
 
-    return "\n".join(lines)
+def _tree_entries(tree: Dict[str, Any]) -> Iterator[tuple]:
+    entries = sorted((k, v) for k, v in tree.items() if k != "_meta")
+    for idx, (name, subtree) in enumerate(entries):
+        yield name, subtree, idx == len(entries) - 1
+
+def format_nested_tree(tree: Dict[str, Any], prefix: str = "") -> str:
+    """Convert nested tree to formatted text with brief descriptions."""
+    return "\n".join(iter_nested_tree(tree, prefix))
 
 
-def format_search_results(records: List) -> str:
-    """Formats list of nodes for LLM input."""
+def format_search_results(records: List, budget: Optional[int] = None) -> str:
+    """Formats list of nodes for LLM input, ranked, deduplicated and fitted to the token budget."""
+    budget = budget if budget is not None else current_budget()
+    snippets = assemble_snippets(records, budget)
     parts: List[str] = []
-    for r in records:
+    for r in snippets:
         name = r["name"]
+        score = f" (score: {r['score']:.3f})" if isinstance(r.get("score"), float) else ""
         desc = f": {r['description']}" if r.get("description") else ""
-        content = r.get("content", "").rstrip()
+        content = (r.get("content") or "").rstrip()
+        if r.get("duplicate"):
+            code = "_Same code as a result above._"
+        elif content:
+            code = f"```\n{content}\n```"
+        else:
+            code = "_Omitted to fit the context budget._"
         parts.append(
-            f"\n\n**Name:** {name}\n"
+            f"\n\n**Name:** {name}{score}\n"
             f"**Description**{desc}\n\n"
-            f"**Code:**\n```\n{content}\n```\n"
+            f"**Code:**\n{code}\n"
         )
+    omitted = len(records) - len(snippets)
+    if omitted > 0:
+        parts.append(f"\n_{omitted} lower-ranked result(s) omitted to fit the context budget._")
     return "\n".join(parts)
\ No newline at end of file
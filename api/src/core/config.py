@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, Optional
 from pydantic import Field
 
 load_dotenv(verbose=True)
@@ -10,6 +11,11 @@ class Config(BaseSettings):
     NEO4J_URI:str = Field(default="bolt://neo4j:7687", env="NEO4J_USERNAME")
     NEO4J_USERNAME: str = Field(default="neo4j", env="NEO4J_USERNAME")
     NEO4J_PASSWORD: str = Field(default="password", env="NEO4J_PASSWORD")
+    NEO4J_MAX_POOL_SIZE: int = Field(default=100, env="NEO4J_MAX_POOL_SIZE")
+    NEO4J_ACQUISITION_TIMEOUT: float = Field(default=60.0, env="NEO4J_ACQUISITION_TIMEOUT")
+    NEO4J_FETCH_SIZE: int = Field(default=1000, env="NEO4J_FETCH_SIZE")
+    NEO4J_MAX_RETRY_TIME: float = Field(default=30.0, env="NEO4J_MAX_RETRY_TIME")  # transient-error retries per transaction
+    GRAPH_BACKEND: str = Field(default="neo4j", env="GRAPH_BACKEND")  # "neo4j" or "memory" (per process, not persisted)
     REPO_LABEL:str = Field(default="Repository", env="REPO_LABEL")
     BRANCH_LABEL:str = Field(default="Branch", env="Branch_LABEL")
     COMMIT_LABEL:str = Field(default="Commit", env="Commit_LABEL")
@@ -21,6 +27,79 @@ class Config(BaseSettings):
     GOOGLE_API_KEY:str = Field(env="GOOGLE_API_KEY")
     OPENAI_API_KEY:str = Field(env="OPENAI_API_KEY")
     EMBED_MODL:str = Field(default="models/embedding-001", env="EMBED_MODL")
+    EMBED_DIM: Optional[int] = Field(default=None, env="EMBED_DIM")  # probed from the model when unset
+    VECTOR_HNSW_M: int = Field(default=16, env="VECTOR_HNSW_M")
+    VECTOR_HNSW_EF_CONSTRUCTION: int = Field(default=100, env="VECTOR_HNSW_EF_CONSTRUCTION")
+    VECTOR_QUANTIZATION: bool = Field(default=True, env="VECTOR_QUANTIZATION")
+
+    INGEST_CHECKPOINT_BATCH: int = Field(default=50, env="INGEST_CHECKPOINT_BATCH")
+    INGEST_RESUME_ON_STARTUP: bool = Field(default=True, env="INGEST_RESUME_ON_STARTUP")
+    INGEST_MODE: str = Field(default="inline", env="INGEST_MODE")  # "inline" or "worker"
+    INGEST_WORKERS: int = Field(default=2, env="INGEST_WORKERS")
+    INGEST_POLL_INTERVAL: float = Field(default=2.0, env="INGEST_POLL_INTERVAL")
+    INGEST_METRICS_EXPORT_INTERVAL: float = Field(default=15.0, env="INGEST_METRICS_EXPORT_INTERVAL")  # worker processes -> /metrics of the API
+    INGEST_HEARTBEAT_TIMEOUT: float = Field(default=60.0, env="INGEST_HEARTBEAT_TIMEOUT")  # running jobs without a heartbeat this long are requeued
+
+    SCHED_MAX_JOBS: int = Field(default=4, env="SCHED_MAX_JOBS")
+    SCHED_NEO4J_SLOTS: int = Field(default=16, env="SCHED_NEO4J_SLOTS")
+    SCHED_EMBEDDING_SLOTS: int = Field(default=4, env="SCHED_EMBEDDING_SLOTS")
+    SCHED_LLM_SLOTS: int = Field(default=8, env="SCHED_LLM_SLOTS")
+
+    QUERY_EMBED_CACHE_SIZE: int = Field(default=2048, env="QUERY_EMBED_CACHE_SIZE")
+    QUERY_EMBED_CACHE_TTL: float = Field(default=3600.0, env="QUERY_EMBED_CACHE_TTL")
+    TOOL_CONTENT_PREVIEW_CHARS: int = Field(default=1500, env="TOOL_CONTENT_PREVIEW_CHARS")
+    TRAVERSE_MAX_DEPTH: int = Field(default=6, env="TRAVERSE_MAX_DEPTH")
+    TRAVERSE_MAX_NODES: int = Field(default=200, env="TRAVERSE_MAX_NODES")
+
+    GRAPH_SNAPSHOT_ENABLED: bool = Field(default=True, env="GRAPH_SNAPSHOT_ENABLED")
+    GRAPH_SNAPSHOT_REFRESH_INTERVAL: float = Field(default=30.0, env="GRAPH_SNAPSHOT_REFRESH_INTERVAL")
+    ANALYTICS_ENABLED: bool = Field(default=True, env="ANALYTICS_ENABLED")
+    ANALYTICS_MAX_CLOSURE: int = Field(default=200, env="ANALYTICS_MAX_CLOSURE")
+
+    RESPONSE_CACHE_ENABLED: bool = Field(default=True, env="RESPONSE_CACHE_ENABLED")
+    RESPONSE_CACHE_THRESHOLD: float = Field(default=0.95, env="RESPONSE_CACHE_THRESHOLD")
+    RESPONSE_CACHE_TTL: float = Field(default=86400.0, env="RESPONSE_CACHE_TTL")
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=500, env="RESPONSE_CACHE_MAX_ENTRIES")
+    RESPONSE_CACHE_REPLAY_CHUNK: int = Field(default=256, env="RESPONSE_CACHE_REPLAY_CHUNK")
+
+    FAST_PATH_ENABLED: bool = Field(default=True, env="FAST_PATH_ENABLED")
+    ROUTE_LATENCY_WINDOW: int = Field(default=1000, env="ROUTE_LATENCY_WINDOW")
+    PLANNER_MODE: str = Field(default="handoff", env="PLANNER_MODE")  # "handoff" or "fanout"
+    FANOUT_MAX_BRANCHES: int = Field(default=4, env="FANOUT_MAX_BRANCHES")
+    FANOUT_BRANCH_TIMEOUT: float = Field(default=45.0, env="FANOUT_BRANCH_TIMEOUT")
+
+    # Token budget per tool output, keyed by agent name (JSON in the environment)
+    CONTEXT_DEFAULT_BUDGET: int = Field(default=3000, env="CONTEXT_DEFAULT_BUDGET")
+    CONTEXT_BUDGETS: Dict[str, int] = Field(
+        default={"DiscoveryAgent": 4000, "RelationResolverAgent": 2500, "ResearcherAgent": 4000},
+        env="CONTEXT_BUDGETS",
+    )
+
+    WS_FLUSH_INTERVAL: float = Field(default=0.02, env="WS_FLUSH_INTERVAL")
+    WS_MAX_FRAME_BYTES: int = Field(default=1024, env="WS_MAX_FRAME_BYTES")
+    WS_MAX_QUEUED_FRAMES: int = Field(default=64, env="WS_MAX_QUEUED_FRAMES")
+    WS_MAX_QUERIES_PER_USER: int = Field(default=3, env="WS_MAX_QUERIES_PER_USER")
+    WS_QUERY_TIMEOUT: float = Field(default=180.0, env="WS_QUERY_TIMEOUT")
+
+    TRACE_EXPORTER: str = Field(default="jaeger", env="TRACE_EXPORTER")  # "jaeger", "otlp", "console" or "none"
+    TRACE_SAMPLE_RATIO: float = Field(default=1.0, env="TRACE_SAMPLE_RATIO")  # share of root traces kept
+    TRACE_SLOW_SPAN_MS: float = Field(default=2000.0, env="TRACE_SLOW_SPAN_MS")  # log sampled spans slower than this; 0 disables
+    JAEGER_HOST: str = Field(default="jaeger", env="JAEGER_HOST")
+    JAEGER_PORT: int = Field(default=6831, env="JAEGER_PORT")
+    OTLP_ENDPOINT: str = Field(default="http://localhost:4318/v1/traces", env="OTLP_ENDPOINT")
+
+    # Opt-in profiling of single ingestion jobs and queries (?profile= / "profile" in the message)
+    PROFILING_ENABLED: bool = Field(default=False, env="PROFILING_ENABLED")
+    PROFILE_SAMPLE_INTERVAL: float = Field(default=0.005, env="PROFILE_SAMPLE_INTERVAL")
+    PROFILE_TRACEMALLOC_FRAMES: int = Field(default=1, env="PROFILE_TRACEMALLOC_FRAMES")
+    PROFILE_TOP_N: int = Field(default=25, env="PROFILE_TOP_N")
+    PROFILE_KEEP: int = Field(default=20, env="PROFILE_KEEP")
+    ADMIN_TOKEN: Optional[str] = Field(default=None, env="ADMIN_TOKEN")  # X-Admin-Token for /api/admin and profiling; both are disabled while unset
+
+    LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
+    LOG_FILE: str = Field(default="app.log", env="LOG_FILE")
+    LOG_ENTITY_RATE: float = Field(default=5.0, env="LOG_ENTITY_RATE")  # per-entity records per second and kind; 0 disables the limit
+    LOG_ENTITY_BURST: int = Field(default=20, env="LOG_ENTITY_BURST")
 
     APP_ENV: str = Field(default="dev", env="APP_ENV")
 
@@ -1,22 +1,206 @@
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
 from src.core.config import config
+from src.core.metrics import NEO4J_BATCH_ROWS, NEO4J_SECONDS, NEO4J_STATEMENTS, gauge
+from src.core.tracing import STATEMENT_CHARS, set_attributes, span
+
+logger = logging.getLogger(__name__)
+
+READ = "READ"
+WRITE = "WRITE"
 
 _driver = None
 
+# Session and transaction counters behind pool_stats()
+_stats: Dict[str, Any] = {
+    "sessions_opened": 0,
+    "sessions_in_use": 0,
+    "peak_sessions_in_use": 0,
+    "transactions": {READ: 0, WRITE: 0},
+    "retries": 0,
+    "failures": 0,
+    "transaction_seconds": 0.0,
+}
+
+gauge(
+    "neo4j_sessions_in_use", "Open Neo4j sessions (each holds at most one pooled connection).",
+    lambda: {(): _stats["sessions_in_use"]},
+)
+
 def get_driver():
     global _driver
     if _driver is None:
         from neo4j import AsyncGraphDatabase
         _driver = AsyncGraphDatabase.driver(
             config.NEO4J_URI,
-            auth=(config.NEO4J_USERNAME, config.NEO4J_PASSWORD)
+            auth=(config.NEO4J_USERNAME, config.NEO4J_PASSWORD),
+            max_connection_pool_size=config.NEO4J_MAX_POOL_SIZE,
+            connection_acquisition_timeout=config.NEO4J_ACQUISITION_TIMEOUT,
+            max_transaction_retry_time=config.NEO4J_MAX_RETRY_TIME,
         )
     return _driver
 
-def get_session():
-    return get_driver().session()
+@asynccontextmanager
+async def get_session(access_mode: str = WRITE):
+    """
+    Raw driver session. On a cluster (neo4j:// URI) READ sessions are routed
+    to followers/read replicas and WRITE sessions to the leader.
+    """
+    session = get_driver().session(default_access_mode=access_mode, fetch_size=config.NEO4J_FETCH_SIZE)
+    _stats["sessions_opened"] += 1
+    _stats["sessions_in_use"] += 1
+    _stats["peak_sessions_in_use"] = max(_stats["peak_sessions_in_use"], _stats["sessions_in_use"])
+    try:
+        async with session:
+            yield session
+    finally:
+        _stats["sessions_in_use"] -= 1
 
 async def close_driver():
     global _driver
     if _driver:
         await _driver.close()
         _driver = None
+
+
+class BufferedResult:
+    """Records and summary of a statement that ran in a managed transaction."""
+
+    def __init__(self, records: list, summary=None):
+        self.records = records
+        self.summary = summary
+
+    async def single(self):
+        return self.records[0] if self.records else None
+
+    async def data(self) -> List[Dict[str, Any]]:
+        return [record.data() for record in self.records]
+
+    async def values(self) -> list:
+        return [record.values() for record in self.records]
+
+    async def consume(self):
+        return self.summary
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self.records:
+            yield record
+
+
+def _statement_attributes(access_mode: str, query: str, batch_rows: int) -> Dict[str, Any]:
+    statement = " ".join(query.split())
+    return {
+        "db.system": "neo4j",
+        "db.operation": statement.split(" ", 1)[0].upper() if statement else None,
+        "db.statement": statement[:STATEMENT_CHARS],
+        "neo4j.access_mode": access_mode,
+        "neo4j.batch_rows": batch_rows or None,
+    }
+
+
+async def _run_in_transaction(session, access_mode: str, query: str, parameters: Optional[dict]) -> BufferedResult:
+    attempts = 0
+
+    async def work(tx):
+        nonlocal attempts
+        attempts += 1
+        result = await tx.run(query, parameters)
+        records = [record async for record in result]
+        return BufferedResult(records, await result.consume())
+
+    # UNWIND statements carry their batch as a list parameter
+    batch_rows = 0
+    if parameters and "UNWIND" in query:
+        batch_rows = max((len(v) for v in parameters.values() if isinstance(v, list)), default=0)
+        if batch_rows:
+            NEO4J_BATCH_ROWS.observe(batch_rows)
+
+    with span(f"neo4j.{access_mode.lower()}") as current:
+        if current.is_recording():
+            set_attributes(_statement_attributes(access_mode, query, batch_rows))
+        start = time.perf_counter()
+        try:
+            if access_mode == READ:
+                result = await session.execute_read(work)
+            else:
+                result = await session.execute_write(work)
+        except Exception:
+            _stats["failures"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _stats["transactions"][access_mode] += 1
+            _stats["retries"] += max(0, attempts - 1)
+            _stats["transaction_seconds"] += elapsed
+            NEO4J_STATEMENTS.inc(mode=access_mode)
+            NEO4J_SECONDS.observe(elapsed, mode=access_mode)
+            current.set_attribute("neo4j.attempts", attempts)
+            if attempts > 1:
+                logger.warning(f"{access_mode} transaction needed {attempts} attempts")
+
+        if current.is_recording():
+            counters = result.summary.counters if result.summary is not None else None
+            set_attributes({
+                "neo4j.rows": len(result.records),
+                "neo4j.nodes_created": counters.nodes_created if counters else None,
+                "neo4j.relationships_created": counters.relationships_created if counters else None,
+                "neo4j.properties_set": counters.properties_set if counters else None,
+            })
+        return result
+
+
+class TransactionalSession:
+    """
+    Session whose `run` executes each statement as a managed transaction, so
+    transient errors (deadlocks, lock timeouts, leader switches) are retried
+    for up to NEO4J_MAX_RETRY_TIME instead of failing the statement.
+    Drop-in for the `session.run(...)` calls of the ingestion helpers.
+    """
+
+    def __init__(self, session, access_mode: str):
+        self._session = session
+        self.access_mode = access_mode
+
+    async def run(self, query: str, parameters: Optional[dict] = None, **kwargs) -> BufferedResult:
+        return await _run_in_transaction(self._session, self.access_mode, query, {**(parameters or {}), **kwargs})
+
+@asynccontextmanager
+async def write_session():
+    async with get_session(WRITE) as session:
+        yield TransactionalSession(session, WRITE)
+
+@asynccontextmanager
+async def read_session():
+    async with get_session(READ) as session:
+        yield TransactionalSession(session, READ)
+
+async def execute_write(query: str, parameters: Optional[dict] = None, **kwargs) -> BufferedResult:
+    """Run one write statement in a retried transaction on its own session."""
+    async with write_session() as session:
+        return await session.run(query, parameters, **kwargs)
+
+async def execute_read(query: str, parameters: Optional[dict] = None, **kwargs) -> BufferedResult:
+    """Run one read statement in a retried transaction on its own session."""
+    async with read_session() as session:
+        return await session.run(query, parameters, **kwargs)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Pool utilisation as seen from this process. Each open session holds at
+    most one connection, so sessions in use bound the connections in use.
+    """
+    transactions = sum(_stats["transactions"].values())
+    return {
+        **_stats,
+        "transactions": dict(_stats["transactions"]),
+        "max_pool_size": config.NEO4J_MAX_POOL_SIZE,
+        "utilization": _stats["sessions_in_use"] / config.NEO4J_MAX_POOL_SIZE,
+        "peak_utilization": _stats["peak_sessions_in_use"] / config.NEO4J_MAX_POOL_SIZE,
+        "avg_transaction_ms": round(1000 * _stats["transaction_seconds"] / transactions, 3) if transactions else 0.0,
+    }
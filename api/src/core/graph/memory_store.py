@@ -0,0 +1,411 @@
+import re
+import math
+from collections import Counter, defaultdict, deque
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from src.core.config import config
+from src.core.graph.store import (
+    EMBEDDING_PREFIX, EdgeRow, GraphStore, NodeRef, NodeRow, check_identifier, project,
+)
+
+_TOKEN = re.compile(r"\w+")
+
+# Edge key in the adjacency maps: (relationship type, (label, node_id) of the other end)
+EdgeKey = Tuple[str, NodeRef]
+
+
+class VectorIndex:
+    """
+    Embeddings of one (label, property) as a normalised float32 matrix.
+    Writes only touch a dict; the matrix is rebuilt on the first search after
+    them, so ingestion does not pay for it.
+    """
+
+    def __init__(self):
+        self.vectors: Dict[NodeRef, np.ndarray] = {}
+        self._refs: List[NodeRef] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def put(self, ref: NodeRef, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        self.vectors[ref] = vector / norm if norm else vector
+        self._matrix = None
+
+    def remove(self, ref: NodeRef):
+        if self.vectors.pop(ref, None) is not None:
+            self._matrix = None
+
+    def search(self, embedding: List[float], top_k: int) -> List[Tuple[NodeRef, float]]:
+        if not self.vectors or top_k <= 0:
+            return []
+        if self._matrix is None:
+            self._refs = list(self.vectors)
+            self._matrix = np.vstack([self.vectors[ref] for ref in self._refs])
+        query = np.asarray(embedding, dtype=np.float32)
+        if query.shape[0] != self._matrix.shape[1]:
+            raise ValueError(f"Embedding has {query.shape[0]} dimensions, the index {self._matrix.shape[1]}")
+        norm = float(np.linalg.norm(query))
+        similarities = self._matrix @ (query / norm if norm else query)
+
+        k = min(top_k, len(similarities))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        # Same [0, 1] scale as Neo4j's cosine vector indexes
+        return [(self._refs[i], float((1 + similarities[i]) / 2)) for i in top]
+
+
+class MemoryGraphStore(GraphStore):
+    """
+    GraphStore held in process memory, for tests, benchmarks and single-process
+    runs without Neo4j. Nodes live in per-label dicts; equality lookups use
+    per-(label, property) value indexes built on first use and maintained on
+    every write after that; relationships are forward and backward adjacency
+    dicts; vector search is a NumPy matrix product per (label, property).
+    Nothing is persisted and every process has its own graph.
+    """
+
+    backend = "memory"
+    persistent = False
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self.out_edges: Dict[NodeRef, Dict[EdgeKey, Dict[str, Any]]] = defaultdict(dict)
+        self.in_edges: Dict[NodeRef, Dict[EdgeKey, Dict[str, Any]]] = defaultdict(dict)
+        self._value_index: Dict[Tuple[str, str], Dict[Any, Set[str]]] = {}
+        self._vectors: Dict[Tuple[str, str], VectorIndex] = defaultdict(VectorIndex)
+        self._tokens: Dict[NodeRef, Counter] = {}
+
+    # ---------------------------------#
+    #   Indexes                        #
+    # ---------------------------------#
+
+    def _index(self, label: str, key: str) -> Dict[Any, Set[str]]:
+        index = self._value_index.get((label, key))
+        if index is None:
+            index = defaultdict(set)
+            for node_id, properties in self.nodes[label].items():
+                value = properties.get(key)
+                if value is not None and _hashable(value):
+                    index[value].add(node_id)
+            self._value_index[(label, key)] = index
+        return index
+
+    def _reindex(self, label: str, node_id: str, old: Dict[str, Any], new: Dict[str, Any]):
+        for (index_label, key), index in self._value_index.items():
+            if index_label != label or old.get(key) == new.get(key):
+                continue
+            if old.get(key) is not None and _hashable(old[key]):
+                index[old[key]].discard(node_id)
+            if new.get(key) is not None and _hashable(new[key]):
+                index[new[key]].add(node_id)
+        for key in set(old) | set(new):
+            value = new.get(key)
+            if key.startswith(EMBEDDING_PREFIX) and value is not old.get(key):
+                vectors = self._vectors[(label, key)]
+                if value is None:
+                    vectors.remove((label, node_id))
+                else:
+                    vectors.put((label, node_id), value)
+        self._tokens.pop((label, node_id), None)
+
+    def _match(self, label: str, where: Optional[Dict[str, Any]]) -> List[str]:
+        """Ids of the `label` nodes whose properties equal `where`, seeking the first key's index."""
+        nodes = self.nodes.get(label, {})
+        if not where:
+            return list(nodes)
+        (first_key, first_value), *rest = where.items()
+        if not _hashable(first_value):
+            return [i for i, p in nodes.items() if all(p.get(k) == v for k, v in where.items())]
+        candidates = self._index(label, first_key).get(first_value, ())
+        return sorted(i for i in candidates if all(nodes[i].get(k) == v for k, v in rest))
+
+    def _set(self, label: str, node_id: str, properties: Dict[str, Any]):
+        current = self.nodes[label][node_id]
+        old = dict(current)
+        for key, value in properties.items():
+            if value is None:
+                current.pop(key, None)
+            else:
+                current[key] = value
+        self._reindex(label, node_id, old, current)
+
+    # ---------------------------------#
+    #   Writes                         #
+    # ---------------------------------#
+
+    async def upsert_node(self, label: str, node_id: str, properties: Dict[str, Any]) -> NodeRow:
+        check_identifier(label)
+        self.nodes[label].setdefault(node_id, {})
+        self._set(label, node_id, {**properties, "node_id": node_id})
+        return project(self.nodes[label][node_id])
+
+    async def update_nodes(self, label: str, rows: List[Dict[str, Any]], key: str = "node_id") -> int:
+        updated = 0
+        for row in rows:
+            properties = {k: v for k, v in row.items() if k != key}
+            for node_id in self._match(label, {key: row[key]}):
+                self._set(label, node_id, properties)
+                updated += 1
+        return updated
+
+    def _merge_edge(self, source: NodeRef, rel_type: str, target: NodeRef, properties: Optional[Dict[str, Any]]):
+        edge = self.out_edges[source].get((rel_type, target))
+        if edge is None:
+            edge = {}
+            self.out_edges[source][(rel_type, target)] = edge
+            self.in_edges[target][(rel_type, source)] = edge
+        for key, value in (properties or {}).items():
+            if value is None:
+                edge.pop(key, None)
+            else:
+                edge[key] = value
+
+    async def upsert_edges(
+        self, rel_type: str, source_label: str, target_label: str, rows: List[EdgeRow],
+        source_key: str = "node_id", target_key: str = "node_id",
+    ) -> int:
+        check_identifier(rel_type)
+        merged = 0
+        for source_value, target_value, properties in rows:
+            sources = self._match(source_label, {source_key: source_value})
+            targets = self._match(target_label, {target_key: target_value})
+            for source in sources:
+                for target in targets:
+                    self._merge_edge((source_label, source), rel_type, (target_label, target), properties)
+                    merged += 1
+        return merged
+
+    async def link_matching(self, rel_type: str, source_label: str, source_key: str, target_label: str, target_key: str) -> int:
+        check_identifier(rel_type)
+        targets_by_value = self._index(target_label, target_key)
+        merged = 0
+        for source_id, properties in list(self.nodes.get(source_label, {}).items()):
+            value = properties.get(source_key)
+            if value is None or not _hashable(value):
+                continue
+            for target_id in targets_by_value.get(value, ()):
+                self._merge_edge((source_label, source_id), rel_type, (target_label, target_id), None)
+                merged += 1
+        return merged
+
+    async def delete_repository(self, repo_name: str) -> int:
+        doomed = [ref for ref, properties in self._iter_nodes() if _in_repository(ref[0], properties, repo_name)]
+        for label, node_id in doomed:
+            ref = (label, node_id)
+            for rel_type, target in self.out_edges.pop(ref, {}):
+                self.in_edges.get(target, {}).pop((rel_type, ref), None)
+            for rel_type, source in self.in_edges.pop(ref, {}):
+                self.out_edges.get(source, {}).pop((rel_type, ref), None)
+            properties = self.nodes[label].pop(node_id)
+            self._reindex(label, node_id, properties, {key: None for key in properties})
+        return len(doomed)
+
+    # ---------------------------------#
+    #   Reads                          #
+    # ---------------------------------#
+
+    def _iter_nodes(self) -> Iterator[Tuple[NodeRef, Dict[str, Any]]]:
+        for label, nodes in self.nodes.items():
+            for node_id, properties in nodes.items():
+                yield (label, node_id), properties
+
+    def _project(self, ref: NodeRef, fields, preview_chars) -> NodeRow:
+        return project(self.nodes[ref[0]][ref[1]], fields, preview_chars)
+
+    def _expand(self, ref: NodeRef, rel_types: Optional[Sequence[str]], direction: str) -> Iterator[Tuple[str, str, NodeRef]]:
+        """(direction, relationship type, other end) of every relationship of `ref`."""
+        if direction in ("out", "both"):
+            for rel_type, other in self.out_edges.get(ref, {}):
+                if not rel_types or rel_type in rel_types:
+                    yield "out", rel_type, other
+        if direction in ("in", "both"):
+            for rel_type, other in self.in_edges.get(ref, {}):
+                if not rel_types or rel_type in rel_types:
+                    yield "in", rel_type, other
+
+    async def find_nodes(
+        self, label: str, where: Optional[Dict[str, Any]] = None, fields: Optional[Sequence[str]] = None,
+        preview_chars: Optional[int] = None, limit: Optional[int] = None,
+    ) -> List[NodeRow]:
+        node_ids = self._match(label, where)[:limit]
+        return [self._project((label, node_id), fields, preview_chars) for node_id in node_ids]
+
+    async def get_nodes(
+        self, refs: List[NodeRef], fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> Dict[str, NodeRow]:
+        return {
+            node_id: self._project((label, node_id), fields, preview_chars)
+            for label, node_id in refs if node_id in self.nodes.get(label, {})
+        }
+
+    async def vector_search(
+        self, label: str, properties: Sequence[str], embedding: List[float], top_k: int,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Tuple[NodeRow, float]]:
+        best: Dict[NodeRef, float] = {}
+        for prop in properties:
+            index = self._vectors.get((label, f"{EMBEDDING_PREFIX}{prop}"))
+            for ref, score in index.search(embedding, top_k) if index else []:
+                best[ref] = max(score, best.get(ref, score))
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [(self._project(ref, fields, preview_chars), score) for ref, score in ranked]
+
+    def _node_tokens(self, ref: NodeRef, keys: Sequence[str]) -> Counter:
+        tokens = self._tokens.get(ref)
+        if tokens is None:
+            properties = self.nodes[ref[0]][ref[1]]
+            text = " ".join(str(properties[key]) for key in keys if properties.get(key) is not None)
+            tokens = self._tokens[ref] = Counter(_TOKEN.findall(text.lower()))
+        return tokens
+
+    async def fulltext_search(
+        self, label: str, text: str, limit: int,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Tuple[NodeRow, float]]:
+        """BM25-style term scoring (without length normalisation) over the label's full-text fields."""
+        from src.core.index import fulltext_index_config
+
+        terms = set(_TOKEN.findall(text.lower()))
+        keys = fulltext_index_config().get(label, ["name"])
+        node_ids = list(self.nodes.get(label, {}))
+        if not terms or not node_ids:
+            return []
+
+        counts = {node_id: self._node_tokens((label, node_id), keys) for node_id in node_ids}
+        frequency = {term: sum(1 for c in counts.values() if term in c) for term in terms}
+        scores = {}
+        for node_id, tokens in counts.items():
+            score = 0.0
+            for term in terms:
+                tf = tokens.get(term, 0)
+                if tf:
+                    idf = math.log(1 + (len(node_ids) - frequency[term] + 0.5) / (frequency[term] + 0.5))
+                    score += idf * tf * 2.2 / (tf + 1.2)
+            if score:
+                scores[node_id] = score
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(self._project((label, node_id), fields, preview_chars), score) for node_id, score in ranked]
+
+    async def neighbors(
+        self, label: str, where: Dict[str, Any], rel_types: Optional[Sequence[str]] = None,
+        direction: str = "out", target_label: Optional[str] = None, limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        relationships = []
+        for node_id in self._match(label, where):
+            for edge_direction, rel_type, other in self._expand((label, node_id), rel_types, direction):
+                if target_label and other[0] != target_label:
+                    continue
+                relationships.append({
+                    "direction": edge_direction,
+                    "relationship_type": rel_type,
+                    "target_labels": [other[0]],
+                    "target_node": self._project(other, fields, preview_chars),
+                })
+                if limit is not None and len(relationships) >= limit:
+                    return relationships
+        return relationships
+
+    async def shortest_paths(
+        self, start_label: str, start_where: Dict[str, Any], end_label: str, end_where: Dict[str, Any],
+        rel_types: Sequence[str], max_depth: Optional[int] = None, direction: str = "both",
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        ends = {(end_label, node_id) for node_id in self._match(end_label, end_where)}
+        paths = []
+        for start_id in self._match(start_label, start_where):
+            start = (start_label, start_id)
+            remaining = ends - {start}
+            # Breadth-first from this start until every end is reached or the depth runs out
+            parents: Dict[NodeRef, Tuple[Optional[NodeRef], Optional[str]]] = {start: (None, None)}
+            frontier = deque([(start, 0)])
+            while frontier and remaining:
+                node, depth = frontier.popleft()
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                for _, rel_type, other in self._expand(node, rel_types, direction):
+                    if other in parents:
+                        continue
+                    parents[other] = (node, rel_type)
+                    frontier.append((other, depth + 1))
+                    if other in remaining:
+                        remaining.discard(other)
+                        paths.append(self._path(parents, other, fields, preview_chars))
+        return paths
+
+    def _path(self, parents, end: NodeRef, fields, preview_chars) -> Dict[str, Any]:
+        nodes, relationships = [end], []
+        while parents[nodes[-1]][0] is not None:
+            parent, rel_type = parents[nodes[-1]]
+            relationships.append(rel_type)
+            nodes.append(parent)
+        return {
+            "nodes": [self._project(ref, fields, preview_chars) for ref in reversed(nodes)],
+            "relationships": relationships[::-1],
+        }
+
+    async def subtree(
+        self, label: str, where: Dict[str, Any], rel_types: Sequence[str], max_depth: int,
+        exclude_labels: Sequence[str] = (), skip: int = 0, limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        def name(ref: NodeRef) -> str:
+            return self.nodes[ref[0]][ref[1]].get("name")
+
+        found = []
+        for root_id in self._match(label, where):
+            stack = [((label, root_id), [(label, root_id)])]
+            while stack:
+                node, path = stack.pop()
+                if len(path) - 1 >= max_depth:
+                    continue
+                for _, _, child in self._expand(node, rel_types, "out"):
+                    if child in path:
+                        continue
+                    child_path = path + [child]
+                    if child[0] not in exclude_labels:
+                        found.append(([name(ref) for ref in child_path], child))
+                    stack.append((child, child_path))
+
+        found.sort(key=lambda item: [n or "" for n in item[0]])
+        end = skip + limit if limit is not None else None
+        return [
+            {"path_names": path_names, "label": ref[0], "node": self._project(ref, fields, preview_chars)}
+            for path_names, ref in found[skip:end]
+        ]
+
+    async def repository_graph(
+        self, repo_name: str, structure_rels: Sequence[str], rel_types: Sequence[str],
+    ) -> Tuple[List[Tuple[str, str, str]], List[Tuple[str, str, str]]]:
+        refs = [(config.REPO_LABEL, node_id) for node_id in self._match(config.REPO_LABEL, {"name": repo_name})]
+        seen = set(refs)
+        nodes, edges = [], []
+        while refs:
+            ref = refs.pop()
+            nodes.append((ref[1], ref[0], self.nodes[ref[0]][ref[1]].get("name")))
+            for _, rel_type, target in self._expand(ref, None, "out"):
+                if rel_type in rel_types:
+                    edges.append((ref[1], rel_type, target[1]))
+                if rel_type in structure_rels and target not in seen:
+                    seen.add(target)
+                    refs.append(target)
+        return nodes, edges
+
+    async def graph_versions(self) -> Dict[str, Optional[str]]:
+        return {
+            properties.get("name"): properties.get("graph_version")
+            for properties in self.nodes.get(config.REPO_LABEL, {}).values()
+        }
+
+
+def _hashable(value: Any) -> bool:
+    return isinstance(value, (str, int, float, bool, tuple))
+
+
+def _in_repository(label: str, properties: Dict[str, Any], repo_name: str) -> bool:
+    return (
+        (label == config.REPO_LABEL and properties.get("name") == repo_name)
+        or properties.get("repository") == repo_name
+        or str(properties.get("file_path") or "").startswith(f"{repo_name}/")
+    )
@@ -0,0 +1,333 @@
+import re
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from src.core.db import close_driver, get_driver, read_session, write_session
+from src.core.graph.store import (
+    EMBEDDING_PREFIX, EdgeRow, GraphStore, NodeRef, NodeRow, check_identifier,
+)
+
+_LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+
+
+def escape_lucene(text: str) -> str:
+    """Escape Lucene query syntax so user text is matched literally."""
+    return _LUCENE_SPECIAL.sub(r"\\\1", text)
+
+
+def projection(var: str) -> str:
+    """
+    Cypher list of [key, value] pairs with the $fields of `var` (every key when
+    $fields is null), leaving out embeddings and nulls and cutting `content` to
+    $preview_chars server-side, so neither crosses the wire.
+    """
+    return (
+        f"[k IN coalesce($fields, keys({var})) WHERE NOT k STARTS WITH '{EMBEDDING_PREFIX}' AND {var}[k] IS NOT NULL | "
+        f"[k, CASE WHEN k = 'content' AND $preview_chars IS NOT NULL THEN left({var}[k], $preview_chars) ELSE {var}[k] END]]"
+    )
+
+
+def _fields(fields: Optional[Sequence[str]]) -> Optional[List[str]]:
+    return list(fields) if fields is not None else None
+
+
+def _row(pairs: Optional[list]) -> NodeRow:
+    return dict(pairs or [])
+
+
+def _where(var: str, where: Optional[Dict[str, Any]], param: str) -> str:
+    """`var.key = $param.key AND ...` for each key of `where`."""
+    conditions = [f"{var}.{check_identifier(key)} = ${param}.{key}" for key in (where or {})]
+    return " AND ".join(conditions) or "true"
+
+
+def _rel_filter(rel_types: Optional[Sequence[str]]) -> str:
+    return ":" + "|".join(check_identifier(rel) for rel in rel_types) if rel_types else ""
+
+
+class Neo4jGraphStore(GraphStore):
+    """
+    GraphStore over the shared async driver of `src.core.db`. Every statement
+    runs as a retried managed transaction; outside `session()` each call opens
+    its own session.
+    """
+
+    backend = "neo4j"
+
+    def __init__(self, session=None):
+        self._session = session
+
+    @asynccontextmanager
+    async def session(self):
+        if self._session is not None:
+            yield self
+            return
+        async with write_session() as session:
+            yield Neo4jGraphStore(session)
+
+    async def verify(self):
+        await get_driver().verify_connectivity()
+
+    async def close(self):
+        await close_driver()
+
+    async def _run(self, query: str, parameters: Optional[dict] = None, write: bool = False):
+        if self._session is not None:
+            return await self._session.run(query, parameters)
+        opener = write_session if write else read_session
+        async with opener() as session:
+            return await session.run(query, parameters)
+
+    # ---------------------------------#
+    #   Writes                         #
+    # ---------------------------------#
+
+    async def upsert_node(self, label: str, node_id: str, properties: Dict[str, Any]) -> NodeRow:
+        result = await self._run(f"""
+            MERGE (n:{check_identifier(label)} {{node_id: $node_id}})
+            SET n += $properties
+            RETURN {projection("n")} AS node
+        """, {"node_id": node_id, "properties": properties, "fields": None, "preview_chars": None}, write=True)
+        record = await result.single()
+        return _row(record["node"]) if record else {}
+
+    async def update_nodes(self, label: str, rows: List[Dict[str, Any]], key: str = "node_id") -> int:
+        if not rows:
+            return 0
+        result = await self._run(f"""
+            UNWIND $rows AS row
+            MATCH (n:{check_identifier(label)} {{{check_identifier(key)}: row.key}})
+            SET n += row.properties
+            RETURN count(n) AS updated
+        """, {"rows": [
+            {"key": row[key], "properties": {k: v for k, v in row.items() if k != key}} for row in rows
+        ]}, write=True)
+        record = await result.single()
+        return record["updated"] if record else 0
+
+    async def upsert_edges(
+        self, rel_type: str, source_label: str, target_label: str, rows: List[EdgeRow],
+        source_key: str = "node_id", target_key: str = "node_id",
+    ) -> int:
+        if not rows:
+            return 0
+        result = await self._run(f"""
+            UNWIND $rows AS row
+            MATCH (s:{check_identifier(source_label)} {{{check_identifier(source_key)}: row.source}})
+            MATCH (t:{check_identifier(target_label)} {{{check_identifier(target_key)}: row.target}})
+            MERGE (s)-[r:{check_identifier(rel_type)}]->(t)
+            SET r += row.properties
+            RETURN count(r) AS merged
+        """, {"rows": [
+            {"source": source, "target": target, "properties": properties or {}} for source, target, properties in rows
+        ]}, write=True)
+        record = await result.single()
+        return record["merged"] if record else 0
+
+    async def link_matching(self, rel_type: str, source_label: str, source_key: str, target_label: str, target_key: str) -> int:
+        result = await self._run(f"""
+            MATCH (s:{check_identifier(source_label)}), (t:{check_identifier(target_label)})
+            WHERE t.{check_identifier(target_key)} = s.{check_identifier(source_key)}
+            MERGE (s)-[r:{check_identifier(rel_type)}]->(t)
+            RETURN count(r) AS merged
+        """, write=True)
+        record = await result.single()
+        return record["merged"] if record else 0
+
+    async def delete_repository(self, repo_name: str) -> int:
+        result = await self._run("""
+            MATCH (n)
+            WHERE n.repository = $name
+               OR (n:Repository AND n.name = $name)
+               OR n.file_path STARTS WITH $prefix
+            DETACH DELETE n
+            RETURN count(*) AS deleted
+        """, {"name": repo_name, "prefix": f"{repo_name}/"}, write=True)
+        record = await result.single()
+        return record["deleted"] if record else 0
+
+    # ---------------------------------#
+    #   Reads                          #
+    # ---------------------------------#
+
+    async def find_nodes(
+        self, label: str, where: Optional[Dict[str, Any]] = None, fields: Optional[Sequence[str]] = None,
+        preview_chars: Optional[int] = None, limit: Optional[int] = None,
+    ) -> List[NodeRow]:
+        limit_clause = "LIMIT $limit" if limit is not None else ""
+        result = await self._run(f"""
+            MATCH (n:{check_identifier(label)})
+            WHERE {_where("n", where, "where")}
+            RETURN {projection("n")} AS node
+            {limit_clause}
+        """, {"where": where or {}, "fields": _fields(fields), "preview_chars": preview_chars, "limit": limit})
+        return [_row(record["node"]) async for record in result]
+
+    async def get_nodes(
+        self, refs: List[NodeRef], fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> Dict[str, NodeRow]:
+        ids_by_label: Dict[str, List[str]] = {}
+        for label, node_id in refs:
+            ids_by_label.setdefault(check_identifier(label), []).append(node_id)
+        if not ids_by_label:
+            return {}
+
+        # One round-trip for every label
+        params: Dict[str, Any] = {"fields": _fields(fields), "preview_chars": preview_chars}
+        parts = []
+        for i, (label, ids) in enumerate(ids_by_label.items()):
+            params[f"ids_{i}"] = ids
+            parts.append(f"MATCH (n:{label}) WHERE n.node_id IN $ids_{i} RETURN n.node_id AS node_id, {projection('n')} AS node")
+        result = await self._run("\nUNION ALL\n".join(parts), params)
+        return {record["node_id"]: _row(record["node"]) async for record in result}
+
+    async def vector_search(
+        self, label: str, properties: Sequence[str], embedding: List[float], top_k: int,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Tuple[NodeRow, float]]:
+        # Every index is queried in one round-trip; results are deduplicated
+        # inside Neo4j, keeping each node's best score.
+        params: Dict[str, Any] = {"embedding": embedding, "top_k": top_k, "fields": _fields(fields), "preview_chars": preview_chars}
+        calls = []
+        for i, prop in enumerate(properties):
+            params[f"index_{i}"] = f"{check_identifier(label).lower()}_{EMBEDDING_PREFIX}{check_identifier(prop)}_index"
+            calls.append(f"""
+                CALL db.index.vector.queryNodes($index_{i}, $top_k, $embedding)
+                YIELD node, score
+                RETURN node, score""")
+        if not calls:
+            return []
+        union = "\n                UNION ALL".join(calls)
+        result = await self._run(f"""
+            CALL {{{union}
+            }}
+            WITH node, max(score) AS score
+            RETURN {projection("node")} AS node, score
+            ORDER BY score DESC
+            LIMIT $top_k
+        """, params)
+        return [(_row(record["node"]), record["score"]) async for record in result]
+
+    async def fulltext_search(
+        self, label: str, text: str, limit: int,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Tuple[NodeRow, float]]:
+        result = await self._run(f"""
+            CALL db.index.fulltext.queryNodes($index_name, $query, {{limit: $limit}})
+            YIELD node, score
+            RETURN {projection("node")} AS node, score
+        """, {
+            "index_name": f"{check_identifier(label).lower()}_fulltext_index",
+            "query": escape_lucene(text),
+            "limit": limit,
+            "fields": _fields(fields),
+            "preview_chars": preview_chars,
+        })
+        return [(_row(record["node"]), record["score"]) async for record in result]
+
+    async def neighbors(
+        self, label: str, where: Dict[str, Any], rel_types: Optional[Sequence[str]] = None,
+        direction: str = "out", target_label: Optional[str] = None, limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        rel = f"[r{_rel_filter(rel_types)}]"
+        pattern = {"out": f"-{rel}->", "in": f"<-{rel}-", "both": f"-{rel}-"}[direction]
+        target = f"m:{check_identifier(target_label)}" if target_label else "m"
+        limit_clause = "LIMIT $limit" if limit is not None else ""
+        result = await self._run(f"""
+            MATCH (n:{check_identifier(label)})
+            WHERE {_where("n", where, "where")}
+            MATCH (n){pattern}({target})
+            RETURN CASE WHEN startNode(r) = n THEN 'out' ELSE 'in' END AS direction,
+                   type(r) AS rel_type,
+                   labels(m) AS target_labels,
+                   {projection("m")} AS target_node
+            {limit_clause}
+        """, {"where": where, "limit": limit, "fields": _fields(fields), "preview_chars": preview_chars})
+        return [
+            {
+                "direction": record["direction"],
+                "relationship_type": record["rel_type"],
+                "target_labels": record["target_labels"],
+                "target_node": _row(record["target_node"]),
+            }
+            async for record in result
+        ]
+
+    async def shortest_paths(
+        self, start_label: str, start_where: Dict[str, Any], end_label: str, end_where: Dict[str, Any],
+        rel_types: Sequence[str], max_depth: Optional[int] = None, direction: str = "both",
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        hops = f"*..{int(max_depth)}" if max_depth is not None else "*"
+        rel = f"[{_rel_filter(rel_types)}{hops}]"
+        pattern = {"out": f"-{rel}->", "in": f"<-{rel}-", "both": f"-{rel}-"}[direction]
+        result = await self._run(f"""
+            MATCH (start:{check_identifier(start_label)})
+            WHERE {_where("start", start_where, "start_where")}
+            MATCH (end:{check_identifier(end_label)})
+            WHERE {_where("end", end_where, "end_where")} AND end <> start
+            MATCH path = shortestPath((start){pattern}(end))
+            RETURN [n IN nodes(path) | {projection("n")}] AS nodes,
+                   [r IN relationships(path) | type(r)] AS relationships
+        """, {
+            "start_where": start_where, "end_where": end_where,
+            "fields": _fields(fields), "preview_chars": preview_chars,
+        })
+        return [
+            {"nodes": [_row(node) for node in record["nodes"]], "relationships": record["relationships"]}
+            async for record in result
+        ]
+
+    async def subtree(
+        self, label: str, where: Dict[str, Any], rel_types: Sequence[str], max_depth: int,
+        exclude_labels: Sequence[str] = (), skip: int = 0, limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        limit_clause = "LIMIT $limit" if limit is not None else ""
+        result = await self._run(f"""
+            MATCH path = (root:{check_identifier(label)})-[{_rel_filter(rel_types)}*1..{int(max_depth)}]->(node)
+            WHERE {_where("root", where, "where")}
+              AND none(l IN labels(node) WHERE l IN $exclude_labels)
+            RETURN [n IN nodes(path) | n.name] AS path_names,
+                   labels(node)[0] AS label,
+                   {projection("node")} AS node
+            ORDER BY path_names
+            SKIP $skip
+            {limit_clause}
+        """, {
+            "where": where, "exclude_labels": list(exclude_labels), "skip": skip, "limit": limit,
+            "fields": _fields(fields), "preview_chars": preview_chars,
+        })
+        return [
+            {"path_names": record["path_names"], "label": record["label"], "node": _row(record["node"])}
+            async for record in result
+        ]
+
+    async def repository_graph(
+        self, repo_name: str, structure_rels: Sequence[str], rel_types: Sequence[str],
+    ) -> Tuple[List[Tuple[str, str, str]], List[Tuple[str, str, str]]]:
+        # Walks down from the Repository (an index seek by name) instead of
+        # scanning every node and relationship of the database
+        result = await self._run(f"""
+            MATCH (r:Repository {{name: $repo}})
+            MATCH (r)-[{_rel_filter(structure_rels)}*0..]->(n)
+            WITH DISTINCT n
+            OPTIONAL MATCH (n)-[rel]->(m)
+            WHERE type(rel) IN $rel_types
+            RETURN n.node_id AS node_id, labels(n)[0] AS label, n.name AS name,
+                   collect([type(rel), m.node_id]) AS edges
+        """, {"repo": repo_name, "rel_types": list(rel_types)})
+        nodes, edges = [], []
+        async for record in result:
+            if not record["node_id"]:
+                continue
+            nodes.append((record["node_id"], record["label"], record["name"]))
+            edges.extend((record["node_id"], rel_type, target) for rel_type, target in record["edges"] if target)
+        return nodes, edges
+
+    async def graph_versions(self) -> Dict[str, Optional[str]]:
+        result = await self._run("""
+            MATCH (r:Repository)
+            RETURN r.name AS name, r.graph_version AS version
+        """)
+        return {record["name"]: record["version"] async for record in result}
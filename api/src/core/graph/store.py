@@ -0,0 +1,204 @@
+import re
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from src.core.config import config
+
+# A node as returned by the read methods: its properties minus embeddings
+NodeRow = Dict[str, Any]
+# (label, node_id)
+NodeRef = Tuple[str, str]
+# (source key value, target key value, relationship properties or None)
+EdgeRow = Tuple[Any, Any, Optional[Dict[str, Any]]]
+
+EMBEDDING_PREFIX = "embedding_"
+BACKENDS = ("neo4j", "memory")
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def check_identifier(name: str) -> str:
+    """Labels, relationship types and property keys end up in query text; only plain identifiers are allowed."""
+    if not isinstance(name, str) or not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid graph identifier: {name!r}")
+    return name
+
+
+def project(properties: Dict[str, Any], fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None) -> NodeRow:
+    """
+    The node properties exposed to callers: `fields` (all of them when None),
+    never embeddings nor missing values, `content` cut to `preview_chars`.
+    """
+    keys = properties.keys() if fields is None else fields
+    row = {}
+    for key in keys:
+        value = properties.get(key)
+        if value is None or key.startswith(EMBEDDING_PREFIX):
+            continue
+        if key == "content" and preview_chars is not None and isinstance(value, str):
+            value = value[:preview_chars]
+        row[key] = value
+    return row
+
+
+class GraphStore(ABC):
+    """
+    Persistence of the code graph: nodes keyed by (label, node_id), typed
+    relationships between them, embeddings stored as `embedding_<field>`
+    properties, and the reads the insight tools need.
+
+    Writes are idempotent (merge semantics), so a resumed ingestion can
+    replay them. Read methods take `fields` (None for every property) and
+    `preview_chars` (cuts `content`), and never return embeddings.
+    """
+
+    backend = ""
+    # Whether the graph outlives the process; ingestion checkpoints are only
+    # trusted when it does, since a resumed run skips the stages they record
+    persistent = True
+
+    @asynccontextmanager
+    async def session(self):
+        """Store bound to one unit of work; backends with connections reuse one for every call inside."""
+        yield self
+
+    async def verify(self):
+        """Raise when the backend is unreachable."""
+
+    async def close(self):
+        """Release connections; the store stays usable and reconnects on the next call."""
+
+    # ---------------------------------#
+    #   Writes                         #
+    # ---------------------------------#
+
+    @abstractmethod
+    async def upsert_node(self, label: str, node_id: str, properties: Dict[str, Any]) -> NodeRow:
+        """Create the node or set `properties` on it, and return it."""
+
+    @abstractmethod
+    async def update_nodes(self, label: str, rows: List[Dict[str, Any]], key: str = "node_id") -> int:
+        """Set the other properties of each row on the existing nodes whose `key` matches; returns nodes updated."""
+
+    @abstractmethod
+    async def upsert_edges(
+        self, rel_type: str, source_label: str, target_label: str, rows: List[EdgeRow],
+        source_key: str = "node_id", target_key: str = "node_id",
+    ) -> int:
+        """
+        Merge a `rel_type` relationship for every row between the nodes whose
+        `source_key` / `target_key` properties equal the row's values, and set
+        the row's properties on it. Rows whose endpoints do not exist are skipped.
+        """
+
+    @abstractmethod
+    async def link_matching(self, rel_type: str, source_label: str, source_key: str, target_label: str, target_key: str) -> int:
+        """Merge (source)-[rel_type]->(target) for every pair where target.target_key = source.source_key."""
+
+    @abstractmethod
+    async def delete_repository(self, repo_name: str) -> int:
+        """Delete every node of a repository with its relationships."""
+
+    # ---------------------------------#
+    #   Reads                          #
+    # ---------------------------------#
+
+    @abstractmethod
+    async def find_nodes(
+        self, label: str, where: Optional[Dict[str, Any]] = None, fields: Optional[Sequence[str]] = None,
+        preview_chars: Optional[int] = None, limit: Optional[int] = None,
+    ) -> List[NodeRow]:
+        """Nodes of `label` whose properties equal every entry of `where`."""
+
+    @abstractmethod
+    async def get_nodes(
+        self, refs: List[NodeRef], fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> Dict[str, NodeRow]:
+        """Nodes by (label, node_id), keyed by node_id; unknown ids are left out."""
+
+    @abstractmethod
+    async def vector_search(
+        self, label: str, properties: Sequence[str], embedding: List[float], top_k: int,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Tuple[NodeRow, float]]:
+        """
+        Nearest nodes of `label` by cosine similarity over `embedding_<property>`
+        for each of `properties`, best score per node, highest first. Scores
+        are normalised to [0, 1] like Neo4j's vector indexes.
+        """
+
+    @abstractmethod
+    async def fulltext_search(
+        self, label: str, text: str, limit: int,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Tuple[NodeRow, float]]:
+        """Nodes of `label` matching the words of `text` in their full-text fields, best first."""
+
+    @abstractmethod
+    async def neighbors(
+        self, label: str, where: Dict[str, Any], rel_types: Optional[Sequence[str]] = None,
+        direction: str = "out", target_label: Optional[str] = None, limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Relationships of the matching nodes as {"direction", "relationship_type",
+        "target_labels", "target_node"}; `direction` is "out", "in" or "both".
+        """
+
+    @abstractmethod
+    async def shortest_paths(
+        self, start_label: str, start_where: Dict[str, Any], end_label: str, end_where: Dict[str, Any],
+        rel_types: Sequence[str], max_depth: Optional[int] = None, direction: str = "both",
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """One shortest path per connected (start, end) pair, as {"nodes", "relationships"}."""
+
+    @abstractmethod
+    async def subtree(
+        self, label: str, where: Dict[str, Any], rel_types: Sequence[str], max_depth: int,
+        exclude_labels: Sequence[str] = (), skip: int = 0, limit: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None, preview_chars: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Descendants of the matching nodes along outgoing `rel_types`, ordered by
+        their path of names, as {"path_names", "label", "node"}.
+        """
+
+    @abstractmethod
+    async def repository_graph(
+        self, repo_name: str, structure_rels: Sequence[str], rel_types: Sequence[str],
+    ) -> Tuple[List[Tuple[str, str, str]], List[Tuple[str, str, str]]]:
+        """
+        Every (node_id, label, name) of a repository, i.e. the Repository node
+        and what it reaches along outgoing `structure_rels`, and their outgoing
+        (source_id, rel_type, target_id) relationships of `rel_types`.
+        """
+
+    @abstractmethod
+    async def graph_versions(self) -> Dict[str, Optional[str]]:
+        """Repository.graph_version of every repository, keyed by name."""
+
+
+_store: Optional[GraphStore] = None
+
+
+def get_graph_store() -> GraphStore:
+    """The process-wide store of the configured GRAPH_BACKEND."""
+    global _store
+    if _store is None:
+        if config.GRAPH_BACKEND == "memory":
+            from src.core.graph.memory_store import MemoryGraphStore
+            _store = MemoryGraphStore()
+        elif config.GRAPH_BACKEND == "neo4j":
+            from src.core.graph.neo4j_store import Neo4jGraphStore
+            _store = Neo4jGraphStore()
+        else:
+            raise ValueError(f"GRAPH_BACKEND must be one of {list(BACKENDS)}, got {config.GRAPH_BACKEND!r}")
+    return _store
+
+
+def set_graph_store(store: Optional[GraphStore]) -> Optional[GraphStore]:
+    """Swap the process-wide store (tests, benchmarks); returns the previous one."""
+    global _store
+    previous, _store = _store, store
+    return previous
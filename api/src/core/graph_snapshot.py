@@ -0,0 +1,266 @@
+import time
+import asyncio
+import logging
+from collections import defaultdict, deque
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+STRUCTURAL_RELS = ["CONTAINS", "HAS_SCRIPT", "Has_CLASS", "Has_METHOD"]
+DEPENDENCY_RELS = ["RELATED_TO"]
+REL_GROUPS = {"structure": STRUCTURAL_RELS, "dependency": DEPENDENCY_RELS}
+REL_TYPES = STRUCTURAL_RELS + DEPENDENCY_RELS
+
+
+class CSRGraph:
+    """Adjacency in compressed sparse row form: neighbours of i are indices[indptr[i]:indptr[i+1]]."""
+
+    def __init__(self, num_nodes: int, src: np.ndarray, dst: np.ndarray, rel: np.ndarray):
+        order = np.argsort(src, kind="stable")
+        self.indices = dst[order].astype(np.int32)
+        self.rel = rel[order].astype(np.int8)
+        self.indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        if len(src):
+            np.cumsum(np.bincount(src, minlength=num_nodes), out=self.indptr[1:])
+
+    def neighbors(self, node: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return self.indices[start:end], self.rel[start:end]
+
+
+class GraphSnapshot:
+    """
+    Read-optimised copy of one repository's structural and dependency graph.
+
+    Node ids are interned to ints; properties stay in the graph store. Ids are never
+    reused, so refreshes only append new nodes and rebuild the CSR arrays.
+    """
+
+    def __init__(self, repo_name: str):
+        self.repo_name = repo_name
+        self.version: Optional[str] = None
+        self.node_ids: List[str] = []
+        self.labels: List[str] = []
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.by_name: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        self.alive = np.zeros(0, dtype=bool)
+        self.forward: Dict[str, CSRGraph] = {}
+        self.backward: Dict[str, CSRGraph] = {}
+
+    def _intern(self, node_id: str, label: str, name: str) -> int:
+        idx = self.index.get(node_id)
+        if idx is None:
+            idx = len(self.node_ids)
+            self.index[node_id] = idx
+            self.node_ids.append(node_id)
+            self.labels.append(label)
+            self.names.append(name)
+            self.by_name[(label, name)].append(idx)
+        elif self.names[idx] != name or self.labels[idx] != label:
+            previous = self.by_name.get((self.labels[idx], self.names[idx]), [])
+            if idx in previous:
+                previous.remove(idx)
+            self.labels[idx], self.names[idx] = label, name
+            self.by_name[(label, name)].append(idx)
+        return idx
+
+    def load(self, nodes: List[Tuple[str, str, str]], edges: List[Tuple[str, str, str]], version: Optional[str] = None):
+        """Apply a full (node_id, label, name) / (source_id, rel_type, target_id) listing of the repository."""
+        seen = {self._intern(node_id, label, name) for node_id, label, name in nodes}
+        self.alive = np.zeros(len(self.node_ids), dtype=bool)
+        if seen:
+            self.alive[list(seen)] = True
+        for key in [k for k, idxs in self.by_name.items() if not any(self.alive[i] for i in idxs)]:
+            del self.by_name[key]
+
+        rel_codes = {rel: code for code, rel in enumerate(REL_TYPES)}
+        grouped = {group: ([], [], []) for group in REL_GROUPS}
+        for source_id, rel_type, target_id in edges:
+            source, target = self.index.get(source_id), self.index.get(target_id)
+            if source is None or target is None or rel_type not in rel_codes:
+                continue
+            group = "dependency" if rel_type in DEPENDENCY_RELS else "structure"
+            grouped[group][0].append(source)
+            grouped[group][1].append(target)
+            grouped[group][2].append(rel_codes[rel_type])
+
+        num_nodes = len(self.node_ids)
+        for group, (src, dst, rel) in grouped.items():
+            src = np.asarray(src, dtype=np.int64)
+            dst = np.asarray(dst, dtype=np.int64)
+            rel = np.asarray(rel, dtype=np.int8)
+            self.forward[group] = CSRGraph(num_nodes, src, dst, rel)
+            self.backward[group] = CSRGraph(num_nodes, dst, src, rel)
+        self.version = version
+
+    def find(self, label: str, name: str) -> List[int]:
+        return [i for i in self.by_name.get((label, name), []) if self.alive[i]]
+
+    def _expand(self, node: int, group: str, direction: str):
+        if direction in ("out", "both"):
+            yield from zip(*self.forward[group].neighbors(node))
+        if direction in ("in", "both"):
+            yield from zip(*self.backward[group].neighbors(node))
+
+    def shortest_paths(
+        self, start: int, ends: List[int], rel_types: List[str],
+        max_depth: int, direction: str = "both",
+    ) -> List[Tuple[List[int], List[str]]]:
+        """
+        Breadth-first search from `start` until every end (other than the start
+        itself) is reached; one (node path, relationship types) per reached end.
+        """
+        group = "dependency" if set(rel_types) <= set(DEPENDENCY_RELS) else "structure"
+        allowed = {REL_TYPES.index(rel) for rel in rel_types if rel in REL_TYPES}
+        remaining = set(ends) - {start}
+        parents: Dict[int, Tuple[int, int]] = {start: (-1, -1)}
+        frontier = deque([(start, 0)])
+        found = []
+        while frontier and remaining:
+            node, depth = frontier.popleft()
+            if depth >= max_depth:
+                continue
+            for neighbor, rel in self._expand(node, group, direction):
+                neighbor = int(neighbor)
+                if neighbor in parents or not self.alive[neighbor] or int(rel) not in allowed:
+                    continue
+                parents[neighbor] = (node, int(rel))
+                frontier.append((neighbor, depth + 1))
+                if neighbor in remaining:
+                    remaining.discard(neighbor)
+                    path, rels = [neighbor], []
+                    while parents[path[-1]][0] != -1:
+                        parent, parent_rel = parents[path[-1]]
+                        rels.append(REL_TYPES[parent_rel])
+                        path.append(parent)
+                    found.append((path[::-1], rels[::-1]))
+        return found
+
+    def neighborhood(self, node: int, group: str, direction: str = "both", depth: int = 1) -> List[int]:
+        """All nodes within `depth` hops of `node`, excluding the node itself."""
+        seen = {node}
+        frontier = [node]
+        for _ in range(depth):
+            next_frontier = []
+            for current in frontier:
+                for neighbor, _ in self._expand(current, group, direction):
+                    neighbor = int(neighbor)
+                    if neighbor not in seen and self.alive[neighbor]:
+                        seen.add(neighbor)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        seen.discard(node)
+        return sorted(seen)
+
+    def iter_subtree(self, root: int, max_depth: Optional[int] = None):
+        """Lazily yield structural descendants of `root` in depth-first name order, as (node, path from root)."""
+        stack = [(root, [root])]
+        while stack:
+            node, path = stack.pop()
+            if node != root:
+                yield node, path
+            if max_depth is not None and len(path) - 1 >= max_depth:
+                continue
+            children = [int(c) for c, _ in self._expand(node, "structure", "out") if self.alive[int(c)]]
+            children.sort(key=lambda c: self.names[c] or "", reverse=True)
+            stack.extend((child, path + [child]) for child in children if child not in path)
+
+    def subtree(self, root: int, max_depth: Optional[int] = None, max_nodes: Optional[int] = None) -> List[Tuple[int, List[int]]]:
+        """Structural descendants of `root` in depth-first name order, as (node, path from root) pairs."""
+        return list(islice(self.iter_subtree(root, max_depth), max_nodes))
+
+
+# ---------------------------------#
+#   Snapshot registry              #
+# ---------------------------------#
+
+_snapshots: Dict[str, GraphSnapshot] = {}
+_last_sync = float("-inf")
+_sync_lock = asyncio.Lock()
+_refresh_task: Optional[asyncio.Task] = None
+
+
+async def fetch_graph_versions() -> Dict[str, Optional[str]]:
+    """Current Repository.graph_version of every repository, keyed by name."""
+    from src.core.graph.store import get_graph_store
+    return await get_graph_store().graph_versions()
+
+
+async def refresh_snapshot(repo_name: str, version: Optional[str] = None) -> GraphSnapshot:
+    """Build or refresh the snapshot of one repository from the graph store."""
+    from src.core.graph.store import get_graph_store
+
+    start = time.perf_counter()
+    nodes, edges = await get_graph_store().repository_graph(repo_name, STRUCTURAL_RELS, REL_TYPES)
+
+    snapshot = _snapshots.get(repo_name) or GraphSnapshot(repo_name)
+    snapshot.load(nodes, edges, version)
+    _snapshots[repo_name] = snapshot
+    logger.info(
+        f"Graph snapshot of '{repo_name}' refreshed: {len(nodes)} nodes, {len(edges)} edges "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return snapshot
+
+
+async def _sync():
+    global _last_sync
+    async with _sync_lock:
+        try:
+            versions = await fetch_graph_versions()
+
+            for repo_name, version in versions.items():
+                snapshot = _snapshots.get(repo_name)
+                if snapshot is None or snapshot.version != version:
+                    try:
+                        await refresh_snapshot(repo_name, version)
+                    except Exception as e:
+                        logger.warning(f"Failed to refresh graph snapshot of '{repo_name}': {e}")
+            for repo_name in set(_snapshots) - set(versions):
+                del _snapshots[repo_name]
+        finally:
+            _last_sync = time.monotonic()
+
+
+async def _sync_in_background():
+    try:
+        await _sync()
+    except Exception as e:
+        logger.warning(f"Failed to sync graph snapshots: {e}")
+
+
+async def sync_snapshots(force: bool = False) -> List[GraphSnapshot]:
+    """
+    Snapshots of every repository.
+
+    Repository.graph_version changes on each completed ingestion; versions are
+    checked at most every GRAPH_SNAPSHOT_REFRESH_INTERVAL seconds. Queries do
+    not wait for that: the check and any rebuilds run in a background task
+    while the current snapshots keep answering, and repositories without a
+    snapshot fall back to the graph store. `force` syncs before returning.
+    """
+    global _refresh_task
+    if not config.GRAPH_SNAPSHOT_ENABLED:
+        return []
+
+    if force:
+        await _sync()
+    elif time.monotonic() - _last_sync >= config.GRAPH_SNAPSHOT_REFRESH_INTERVAL and (
+        _refresh_task is None or _refresh_task.done()
+    ):
+        _refresh_task = asyncio.create_task(_sync_in_background())
+    return list(_snapshots.values())
+
+
+async def snapshots_with(label: str, name: str) -> List[Tuple[GraphSnapshot, List[int]]]:
+    """Snapshots containing a node with the given label and name, with the matching node indexes."""
+    matches = []
+    for snapshot in await sync_snapshots():
+        found = snapshot.find(label, name)
+        if found:
+            matches.append((snapshot, found))
+    return matches
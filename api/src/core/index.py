@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from typing import Dict, List, Optional
 from src.core.config import config
 
 logger = logging.getLogger(__name__)
@@ -11,10 +13,16 @@ def get_vector_store(
         label: str, 
         embedd_property: str, 
         text_property: str = "text",
-        dim: int = 1536,
+        dim: Optional[int] = None,
     ):
+    from llama_index.core.settings import Settings
     from llama_index.vector_stores.neo4jvector import Neo4jVectorStore
 
+    # Same dimension as the indexes created by create_vector_indexes_if_missing
+    dim = dim or _embedding_dimension or config.EMBED_DIM
+    if not dim:
+        raise RuntimeError("Embedding dimension unknown; await get_embedding_dimension() first or set EMBED_DIM")
+
     return Neo4jVectorStore(
         url=config.NEO4J_URI,
         username=config.NEO4J_USERNAME,
@@ -35,7 +43,7 @@ def get_index_for_label_field(label: str, field: str = None):
     if key in _vector_store_cache:
         return _vector_store_cache[key]
 
-    index_name = f"{label.lower()}_{field}_index"
+    index_name = f"{label.lower()}_embedding_{field}_index"
     embed_property = f"embedding_{field}"
 
     store = get_vector_store(index_name, label, embed_property, field)
@@ -48,14 +56,31 @@ def get_index_for_label_field(label: str, field: str = None):
 #   Setup index  Manually          #
 # ---------------------------------#
 
-async def create_vector_indexes_if_missing(
-    session,
-    index_config: dict,
-    default_dim: int = 384,
-    default_distance: str = "cosine"
-):
+_embedding_dimension: Optional[int] = None
+
+
+async def get_embedding_dimension() -> int:
+    """
+    Dimension of the active embedding model: EMBED_DIM when set, otherwise
+    probed once with a single embedding call and cached for the process.
+    """
+    global _embedding_dimension
+    if _embedding_dimension is None:
+        if config.EMBED_DIM:
+            _embedding_dimension = config.EMBED_DIM
+        else:
+            from src.utils.helper import get_embedding
+            embedding = await asyncio.to_thread(get_embedding, "dimension probe")
+            if not embedding:
+                raise RuntimeError("Embedding model returned an empty vector; cannot probe its dimension")
+            _embedding_dimension = len(embedding)
+            logger.info(f"Embedding model dimension: {_embedding_dimension}")
+    return _embedding_dimension
+
+
+def vector_index_specs(index_config: dict, default_dim: int, default_distance: str = "cosine") -> List[dict]:
     """
-    Create vector indexes in Neo4j if missing.
+    Expand an index config into one spec per vector index.
 
     Supports simple strings (for default settings) or dicts (for custom dim/distance):
         "File": [
@@ -63,54 +88,162 @@ async def create_vector_indexes_if_missing(
             {"summary": {"dim": 768}},
             {"description": {"distance": "euclidean"}}
         ]
-
-    :param session: Neo4j session
-    :param index_config: Dict[str, List[Union[str, Dict[str, Dict]]]]
-    :param default_dim: Default dimension size
-    :param default_distance: Default distance metric
     """
-    # Fetch existing index names
-    result = await session.run("""
-        SHOW VECTOR INDEXES 
-        YIELD name, type
-        RETURN name, type
-    """)
-    existing_indexes = {
-        record["name"]
-        async for record in result
-        if record["type"] == "VECTOR"
-    }
-
+    specs = []
     for label, prop_entries in index_config.items():
         for entry in prop_entries:
             if isinstance(entry, str):
                 prop = f"embedding_{entry}"
-                dim = default_dim
-                distance = default_distance
+                opts = {}
             elif isinstance(entry, dict):
                 name, opts = next(iter(entry.items()))
                 prop = f"embedding_{name}"
-                dim = opts.get("dim", default_dim)
-                distance = opts.get("distance", default_distance)
             else:
                 raise ValueError(f"Invalid property entry: {entry}")
+            specs.append({
+                "name": f"{label.lower()}_{prop}_index",
+                "label": label,
+                "property": prop,
+                "dim": opts.get("dim", default_dim),
+                "distance": opts.get("distance", default_distance),
+            })
+    return specs
 
-            index_name = f"{label.lower()}_{prop}_index"
 
-            if index_name in existing_indexes:
+def _vector_options(spec: dict, tuned: bool) -> str:
+    options = [
+        f"`vector.dimensions`: {int(spec['dim'])}",
+        f"`vector.similarity_function`: '{spec['distance']}'",
+    ]
+    if tuned:
+        options += [
+            f"`vector.hnsw.m`: {int(config.VECTOR_HNSW_M)}",
+            f"`vector.hnsw.ef_construction`: {int(config.VECTOR_HNSW_EF_CONSTRUCTION)}",
+            f"`vector.quantization.enabled`: {'true' if config.VECTOR_QUANTIZATION else 'false'}",
+        ]
+    return "{indexConfig: {" + ", ".join(options) + "}}"
+
+
+async def _existing_vector_indexes(session) -> Dict[str, dict]:
+    result = await session.run("""
+        SHOW VECTOR INDEXES
+        YIELD name, type, labelsOrTypes, properties, options, state, populationPercent
+        RETURN name, type, labelsOrTypes, properties, options, state, populationPercent
+    """)
+    existing = {}
+    async for record in result:
+        if record["type"] != "VECTOR":
+            continue
+        index_config = (record["options"] or {}).get("indexConfig", {})
+        existing[record["name"]] = {
+            "label": (record["labelsOrTypes"] or [None])[0],
+            "property": (record["properties"] or [None])[0],
+            "dim": index_config.get("vector.dimensions"),
+            "distance": str(index_config.get("vector.similarity_function", "")).lower(),
+            "state": record["state"],
+            "population_percent": record["populationPercent"],
+        }
+    return existing
+
+
+def _matches(spec: dict, existing: dict) -> bool:
+    return (
+        existing["dim"] == spec["dim"]
+        and existing["distance"] == spec["distance"].lower()
+        and existing["label"] == spec["label"]
+        and existing["property"] == spec["property"]
+    )
+
+
+async def create_vector_indexes_if_missing(
+    session,
+    index_config: dict,
+    default_dim: Optional[int] = None,
+    default_distance: str = "cosine"
+):
+    """
+    Create vector indexes in Neo4j if missing, and rebuild those whose
+    dimension or similarity function no longer matches the embedding model.
+
+    Indexes are created with tuned HNSW options and quantization; servers
+    that do not support those options get a plain index instead.
+
+    :param session: Neo4j session
+    :param index_config: Dict[str, List[Union[str, Dict[str, Dict]]]] (see vector_index_specs)
+    :param default_dim: Default dimension size (probed from the embedding model when None)
+    :param default_distance: Default distance metric
+    """
+    default_dim = default_dim or await get_embedding_dimension()
+    existing_indexes = await _existing_vector_indexes(session)
+
+    for spec in vector_index_specs(index_config, default_dim, default_distance):
+        index_name = spec["name"]
+        existing = existing_indexes.get(index_name)
+
+        if existing is not None:
+            if _matches(spec, existing):
                 logger.debug(f"[Index Exists] {index_name} — Skipping")
                 continue
+            logger.warning(
+                f"[Rebuilding Index] {index_name}: dim {existing['dim']} -> {spec['dim']}, "
+                f"similarity {existing['distance']} -> {spec['distance']}. "
+                f"Embeddings stored with the old dimension are not indexed until re-ingested."
+            )
+            await session.run(f"DROP INDEX {index_name} IF EXISTS")
+
+        logger.info(f"[Creating Index] {index_name} (dim={spec['dim']}, distance={spec['distance']})")
+        create = f"""
+            CREATE VECTOR INDEX {index_name} IF NOT EXISTS
+            FOR (n:{spec['label']}) ON (n.{spec['property']})
+            OPTIONS {{options}}
+        """
+        try:
+            await session.run(create.replace("{options}", _vector_options(spec, tuned=True)))
+        except Exception as e:
+            logger.info(f"[Creating Index] {index_name}: tuned HNSW/quantization options not supported ({e}); using defaults")
+            await session.run(create.replace("{options}", _vector_options(spec, tuned=False)))
+
 
-            logger.info(f"[Creating Index] {index_name} (dim={dim}, distance={distance})")
+async def create_fulltext_indexes_if_missing(session, fulltext_config: dict):
+    """
+    Create one full-text index per label over the given properties, if missing.
+
+        "File": ["name", "path", "content"]  ->  file_fulltext_index
+    """
+    result = await session.run("""
+        SHOW FULLTEXT INDEXES
+        YIELD name
+        RETURN name
+    """)
+    existing_indexes = {record["name"] async for record in result}
+
+    for label, props in fulltext_config.items():
+        index_name = f"{label.lower()}_fulltext_index"
+        if index_name in existing_indexes:
+            logger.debug(f"[Index Exists] {index_name} — Skipping")
+            continue
+
+        fields = ", ".join(f"n.{prop}" for prop in props)
+        logger.info(f"[Creating Full-text Index] {index_name} on {props}")
+        await session.run(f"""
+            CREATE FULLTEXT INDEX {index_name} IF NOT EXISTS
+            FOR (n:{label}) ON EACH [{fields}]
+        """)
+
+
+async def create_lookup_indexes_if_missing(session, labels: list, props: list):
+    """Create range indexes so exact lookups (by name, by node_id) are a single index seek."""
+    for label in labels:
+        for prop in props:
+            index_name = f"{label.lower()}_{prop}_lookup_index"
             await session.run(f"""
-                CALL db.index.vector.createNodeIndex('{index_name}', '{label}', '{prop}', {dim}, '{distance}')
+                CREATE INDEX {index_name} IF NOT EXISTS
+                FOR (n:{label}) ON (n.{prop})
             """)
 
 
-async def setup_all_indexes():
-    from src.core.db import get_session
-
-    index_config = {
+def vector_index_config() -> dict:
+    return {
         config.REPO_LABEL: ["content"],
         config.FOLDER_LABEL: [
             "name",
@@ -127,7 +260,7 @@ async def setup_all_indexes():
             "name",
             "content",
             "description",
-            {"summary": {"dim": 384}},
+            "summary",
         ],
         config.CLASS_LABEL: [
             "name",
@@ -148,5 +281,83 @@ async def setup_all_indexes():
         ]
     }
 
+
+def fulltext_index_config() -> dict:
+    return {
+        config.FOLDER_LABEL: ["name", "path"],
+        config.FILE_LABEL: ["name", "path", "content"],
+        config.CLASS_LABEL: ["name", "file_path", "content"],
+        config.METHOD_LABEL: ["name", "file_path", "content"],
+        config.SCRIPT_LABEL: ["name", "file_path", "content"],
+    }
+
+
+LOOKUP_PROPS = ["name", "node_id"]
+
+
+async def setup_all_indexes() -> dict:
+    """Create missing indexes, rebuild mismatched vector indexes, and return the schema status."""
+    from src.core.db import get_session
+
+    if config.GRAPH_BACKEND != "neo4j":
+        return await check_schema()
+
+    fulltext_config = fulltext_index_config()
     async with get_session() as session:
-        await create_vector_indexes_if_missing(session, index_config)
+        await create_vector_indexes_if_missing(session, vector_index_config())
+        await create_fulltext_indexes_if_missing(session, fulltext_config)
+        await create_lookup_indexes_if_missing(session, list(fulltext_config), LOOKUP_PROPS)
+    return await check_schema()
+
+
+async def check_schema() -> dict:
+    """
+    Compare the indexes in Neo4j with the expected schema.
+
+    Ready means every expected index exists and is ONLINE, and every vector
+    index has the embedding model's dimension and similarity function.
+    Indexes still populating are reported with their progress. The memory
+    backend builds its indexes on first use, so it is always ready.
+    """
+    from src.core.db import get_session
+
+    if config.GRAPH_BACKEND != "neo4j":
+        return {"ready": True, "backend": config.GRAPH_BACKEND}
+
+    dim = await get_embedding_dimension()
+    specs = vector_index_specs(vector_index_config(), dim)
+    fulltext_config = fulltext_index_config()
+    expected_other = [f"{label.lower()}_fulltext_index" for label in fulltext_config] + [
+        f"{label.lower()}_{prop}_lookup_index" for label in fulltext_config for prop in LOOKUP_PROPS
+    ]
+
+    async with get_session() as session:
+        vector_indexes = await _existing_vector_indexes(session)
+        result = await session.run("""
+            SHOW INDEXES
+            YIELD name, state, populationPercent
+            RETURN name, state, populationPercent
+        """)
+        states = {record["name"]: (record["state"], record["populationPercent"]) async for record in result}
+
+    missing = [spec["name"] for spec in specs if spec["name"] not in vector_indexes]
+    missing += [name for name in expected_other if name not in states]
+    mismatched = [
+        {"name": spec["name"], "expected_dim": spec["dim"], "actual_dim": vector_indexes[spec["name"]]["dim"]}
+        for spec in specs
+        if spec["name"] in vector_indexes and not _matches(spec, vector_indexes[spec["name"]])
+    ]
+    expected = [spec["name"] for spec in specs] + expected_other
+    not_online = {
+        name: {"state": states[name][0], "population_percent": states[name][1]}
+        for name in expected
+        if name in states and states[name][0] != "ONLINE"
+    }
+    return {
+        "ready": not missing and not mismatched and not not_online,
+        "embedding_dimension": dim,
+        "indexes": len(expected),
+        "missing": missing,
+        "mismatched": mismatched,
+        "not_online": not_online,
+    }
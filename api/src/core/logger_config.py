@@ -1,4 +1,12 @@
+import time
+import queue
+import atexit
+import logging
+import threading
 import logging.config
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from src.core.config import config
 
 LOGGING_CONFIG = {
     "version": 1,
@@ -15,19 +23,19 @@ LOGGING_CONFIG = {
         "console": {
             "class": "logging.StreamHandler",
             "formatter": "default",
-            "level": "INFO",
+            "level": config.LOG_LEVEL,
         },
         "file": {
             "class": "logging.FileHandler",
-            "filename": "app.log",
+            "filename": config.LOG_FILE,
             "formatter": "detailed",
-            "level": "INFO",
+            "level": config.LOG_LEVEL,
         },
     },
     "loggers": {
         "": {  # root logger
             "handlers": ["console", "file"],
-            "level": "INFO",
+            "level": config.LOG_LEVEL,
         },
         "uvicorn.error": {
             "level": "INFO",
@@ -42,5 +50,77 @@ LOGGING_CONFIG = {
     },
 }
 
+# Loggers whose handlers are moved behind the queue
+QUEUED_LOGGERS = ("", "uvicorn.error", "uvicorn.access")
+
+
+class EntityRateLimitFilter(logging.Filter):
+    """
+    Rate-limits per-entity records, i.e. those logged with
+    ``extra={"entity": kind}`` once per file, class, commit..., to `rate` per
+    second per kind with bursts of up to `burst`. Suppressed records are
+    counted and reported on the next record of the same kind that passes.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, list] = {}  # kind -> [tokens, last refill, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        kind = getattr(record, "entity", None)
+        if kind is None or self.rate <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(kind, [float(self.burst), now, 0])
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.msg = f"{record.getMessage()} (+{suppressed} similar '{kind}' messages suppressed)"
+            record.args = None
+        return True
+
+
+_listener: Optional[QueueListener] = None
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def setup_logging():
-    logging.config.dictConfig(LOGGING_CONFIG)
\ No newline at end of file
+    """
+    Configure the handlers, then put them behind a QueueHandler: callers only
+    enqueue records and a QueueListener thread does the console and file I/O.
+    Safe to call again (worker pool processes do, once per job).
+    """
+    global _listener
+    _stop_listener()
+    logging.config.dictConfig(LOGGING_CONFIG)
+
+    loggers = [logging.getLogger(name) for name in QUEUED_LOGGERS]
+    handlers = list({id(h): h for logger in loggers for h in logger.handlers}.values())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(EntityRateLimitFilter(config.LOG_ENTITY_RATE, config.LOG_ENTITY_BURST))
+    for logger in loggers:
+        logger.handlers = [queue_handler]
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+# Flush queued records on interpreter exit
+atexit.register(_stop_listener)
@@ -0,0 +1,366 @@
+import os
+import json
+import time
+import bisect
+import socket
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+# Latency buckets in seconds, from index seeks to multi-minute LLM stages
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class JobMetrics:
+    """Totals of every metric observed while one ingestion job runs."""
+
+    def __init__(self, job: str):
+        self.job = job
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def _key(name: str, labels: LabelKey) -> str:
+        return name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else "")
+
+    def add(self, name: str, labels: LabelKey, amount: float):
+        key = self._key(name, labels)
+        self.counters[key] = self.counters.get(key, 0.0) + amount
+
+    def observe(self, name: str, labels: LabelKey, value: float):
+        entry = self.histograms.setdefault(self._key(name, labels), {"count": 0, "sum": 0.0, "max": 0.0})
+        entry["count"] += 1
+        entry["sum"] += value
+        entry["max"] = max(entry["max"], value)
+
+    def summary(self) -> dict:
+        return {
+            "job": self.job,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_s": round((self.finished_at or time.time()) - self.started_at, 3),
+            "counters": {k: round(v, 6) for k, v in sorted(self.counters.items())},
+            "histograms": {
+                k: {**v, "sum": round(v["sum"], 6), "max": round(v["max"], 6),
+                    "avg": round(v["sum"] / v["count"], 6) if v["count"] else 0.0}
+                for k, v in sorted(self.histograms.items())
+            },
+        }
+
+
+current_job: ContextVar[Optional[JobMetrics]] = ContextVar("current_job_metrics", default=None)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, labels: Dict[str, object]) -> LabelKey:
+        return tuple((name, str(labels.get(name, ""))) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        job = current_job.get()
+        if job is not None:
+            job.add(self.name, key, amount)
+
+    def snapshot(self) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def merge(values: Dict[LabelKey, float], other: Dict[LabelKey, float]):
+        for key, value in other.items():
+            values[key] = values.get(key, 0.0) + value
+
+    def samples(self, values: Optional[Dict[LabelKey, float]] = None):
+        values = self.snapshot() if values is None else values
+        return [(self.name, key, value) for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, List[float]] = {}  # bucket counts..., +Inf count, sum
+
+    def observe(self, value: float, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            entry = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            entry[bisect.bisect_left(self.buckets, value)] += 1
+            entry[-1] += value
+        job = current_job.get()
+        if job is not None:
+            job.observe(self.name, key, value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[LabelKey, List[float]]:
+        with self._lock:
+            return {key: list(entry) for key, entry in self._values.items()}
+
+    def merge(self, values: Dict[LabelKey, List[float]], other: Dict[LabelKey, List[float]]):
+        for key, entry in other.items():
+            if len(entry) != len(self.buckets) + 2:
+                continue  # Exported with other buckets
+            current = values.setdefault(key, [0.0] * len(entry))
+            for i, value in enumerate(entry):
+                current[i] += value
+
+    def samples(self, values: Optional[Dict[LabelKey, List[float]]] = None):
+        values = self.snapshot() if values is None else values
+        samples = []
+        for key, entry in values.items():
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), entry[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                samples.append((f"{self.name}_bucket", key + (("le", le),), cumulative))
+            samples.append((f"{self.name}_count", key, cumulative))
+            samples.append((f"{self.name}_sum", key, entry[-1]))
+        return samples
+
+
+class Gauge(_Metric):
+    """Value read from a callback at scrape time (e.g. a cache hit rate)."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, read: Callable[[], Dict[LabelKey, float]], labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._read = read
+
+    def samples(self):
+        try:
+            return [(self.name, key, value) for key, value in self._read().items()]
+        except Exception:
+            return []
+
+
+_registry: Dict[str, _Metric] = {}
+
+
+def _register(metric: _Metric) -> _Metric:
+    return _registry.setdefault(metric.name, metric)
+
+
+def counter(name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    return _register(Counter(name, help, labelnames))
+
+
+def histogram(name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help, labelnames, buckets))
+
+
+def gauge(name: str, help: str, read: Callable[[], Dict[LabelKey, float]], labelnames: Tuple[str, ...] = ()) -> Gauge:
+    return _register(Gauge(name, help, read, labelnames))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus() -> str:
+    """
+    Metrics in the Prometheus text exposition format (0.0.4): those of this
+    process, with the counters and histograms exported by the ingestion
+    worker processes added in. Gauges are this process's own.
+    """
+    exported = load_exported_metrics()
+    lines = []
+    for metric in _registry.values():
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if isinstance(metric, (Counter, Histogram)):
+            values = metric.snapshot()
+            for process_values in exported:
+                metric.merge(values, process_values.get(metric.name, {}))
+            samples = metric.samples(values)
+        else:
+            samples = metric.samples()
+        for name, labels, value in samples:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------#
+#   Worker processes               #
+# ---------------------------------#
+
+# The ingestion worker's pool processes have no scrape endpoint. Each one
+# writes its cumulative counters and histograms to a file on the shared
+# REPO_DIRS volume, and the API's /metrics adds them to its own.
+
+_export_thread: Optional[threading.Thread] = None
+
+
+def _process_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _processes_dir() -> str:
+    return os.path.join(config.REPO_DIRS, ".metrics", "processes")
+
+
+def export_process_metrics():
+    """Write this process's counters and histograms for the scraping process to merge."""
+    metrics = {
+        metric.name: [[list(key), values] for key, values in metric.snapshot().items()]
+        for metric in _registry.values() if isinstance(metric, (Counter, Histogram))
+    }
+    os.makedirs(_processes_dir(), exist_ok=True)
+    path = os.path.join(_processes_dir(), f"{_process_id()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"updated_at": time.time(), "metrics": metrics}, f)
+    os.replace(tmp_path, path)
+
+
+def start_metrics_export(interval: float):
+    """Export this process's metrics every `interval` seconds from a daemon thread (once per process)."""
+    global _export_thread
+    if _export_thread is not None:
+        return
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                export_process_metrics()
+            except Exception as e:
+                logger.warning(f"Exporting process metrics failed: {e}")
+
+    _export_thread = threading.Thread(target=run, name="metrics-export", daemon=True)
+    _export_thread.start()
+
+
+def load_exported_metrics() -> List[Dict[str, Dict[LabelKey, object]]]:
+    """Metric values exported by other processes, one {name: {labels: values}} per process."""
+    directory = _processes_dir()
+    if not os.path.isdir(directory):
+        return []
+    own = f"{_process_id()}.json"
+    exported = []
+    for entry in os.listdir(directory):
+        if not entry.endswith(".json") or entry == own:
+            continue
+        try:
+            with open(os.path.join(directory, entry)) as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        exported.append({
+            name: {tuple(tuple(pair) for pair in key): values for key, values in rows}
+            for name, rows in data.get("metrics", {}).items()
+        })
+    return exported
+
+
+# ---------------------------------#
+#   Per-job metrics                #
+# ---------------------------------#
+
+def _jobs_dir() -> str:
+    return os.path.join(config.REPO_DIRS, ".metrics")
+
+
+def job_metrics_path(job: str) -> str:
+    return os.path.join(_jobs_dir(), f"{job}.json")
+
+
+@contextmanager
+def job_metrics(job: str):
+    """
+    Collect the metrics observed inside the block (including in tasks it
+    spawns) for one job, and save them as JSON under REPO_DIRS/.metrics so
+    they are readable from any process.
+    """
+    metrics = JobMetrics(job)
+    token = current_job.set(metrics)
+    try:
+        yield metrics
+    finally:
+        current_job.reset(token)
+        metrics.finished_at = time.time()
+        os.makedirs(_jobs_dir(), exist_ok=True)
+        path = job_metrics_path(job)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(metrics.summary(), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+def load_job_metrics(job: str) -> Optional[dict]:
+    try:
+        with open(job_metrics_path(job)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+# ---------------------------------#
+#   Metrics                        #
+# ---------------------------------#
+
+INGEST_STAGE_SECONDS = histogram("ingest_stage_seconds", "Duration of each ingestion stage.", ("stage",))
+INGEST_JOBS = counter("ingest_jobs_total", "Finished ingestion jobs.", ("status",))
+FILES_READ = counter("ingest_files_read_total", "Source files read during ingestion.")
+BYTES_READ = counter("ingest_bytes_read_total", "Bytes of source read during ingestion.")
+NEO4J_STATEMENTS = counter("neo4j_statements_total", "Statements run in managed transactions.", ("mode",))
+NEO4J_SECONDS = histogram("neo4j_transaction_seconds", "Managed transaction latency, including retries.", ("mode",))
+NEO4J_BATCH_ROWS = histogram(
+    "neo4j_batch_rows", "Rows per UNWIND batch statement.", buckets=(1, 10, 50, 100, 500, 1000, 5000, 10000),
+)
+EMBEDDING_CALLS = counter("embedding_calls_total", "Calls to the embedding model.")
+EMBEDDING_SECONDS = histogram("embedding_seconds", "Embedding model latency per call.")
+LLM_CALLS = counter("llm_calls_total", "LLM agent runs.", ("agent",))
+LLM_SECONDS = histogram("llm_seconds", "LLM agent run latency.", ("agent",))
+LLM_TOKENS = counter("llm_tokens_total", "LLM tokens, estimated at ~4 characters per token.", ("agent", "direction"))
+CACHE_REQUESTS = counter("cache_requests_total", "Cache lookups by outcome.", ("cache", "result"))
+
+
+def _cache_hit_rates() -> Dict[LabelKey, float]:
+    totals: Dict[str, Dict[str, float]] = {}
+    for _, labels, value in CACHE_REQUESTS.samples():
+        cache, result = dict(labels)["cache"], dict(labels)["result"]
+        totals.setdefault(cache, {}).setdefault(result, 0.0)
+        totals[cache][result] += value
+    return {
+        (("cache", cache),): counts.get("hit", 0.0) / sum(counts.values())
+        for cache, counts in totals.items() if sum(counts.values())
+    }
+
+
+gauge("cache_hit_ratio", "Hit ratio per cache since process start.", _cache_hit_rates, ("cache",))
@@ -0,0 +1,335 @@
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import pstats
+import logging
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+MODES = ("sampling", "cprofile")
+ARTIFACTS = ("summary.json", "profile.folded", "profile.prof")
+
+# Leaf frames of threads that are only waiting (event loop select, idle pool workers)
+IDLE_FILES = ("selectors.py", "threading.py")
+
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler. A daemon thread records the stack of every
+    other thread each `interval` seconds; the result is in the folded format
+    read by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval: float, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _label(code) -> str:
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if not self.include_idle and os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int) -> List[dict]:
+        """Functions with the most samples on top of the stack (self time)."""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return [
+            {"function": name, "samples": count, "share": round(count / total, 4)}
+            for name, count in leaves.most_common(limit)
+        ]
+
+
+def _cprofile_top(profiler: cProfile.Profile, limit: int) -> List[dict]:
+    """Functions with the highest cumulative time."""
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{func} ({os.path.basename(path)}:{line})",
+            "calls": calls,
+            "self_s": round(self_time, 6),
+            "cumulative_s": round(cumulative, 6),
+        }
+        for (path, line, func), (_, calls, self_time, cumulative, _) in rows
+    ]
+
+
+class Profile:
+    """
+    One opt-in profiling run (an ingestion job or a WebSocket query). CPU time
+    comes from the sampler or cProfile, memory from tracemalloc snapshots
+    taken around each stage. Artifacts go to REPO_DIRS/.profiles/<id>/.
+
+    Both profilers see the whole process: work of other requests running at
+    the same time shows up in the profile too.
+    """
+
+    def __init__(self, profile_id: str, kind: str, target: str, mode: str):
+        self.id = profile_id
+        self.kind = kind
+        self.target = target
+        self.mode = mode
+        self.started_at: Optional[float] = None
+        self.stages: List[dict] = []
+        self.error: Optional[str] = None
+        self._sampler: Optional[StackSampler] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._started_tracemalloc = False
+        self._peak_bytes = 0
+        self._wall_start = 0.0
+        self._cpu_start = 0.0
+
+    @property
+    def path(self) -> str:
+        return os.path.join(_profiles_dir(), self.id)
+
+    def start(self):
+        self.started_at = time.time()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(config.PROFILE_TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        if self.mode == "cprofile":
+            # Profiles the calling thread, i.e. the event loop and every coroutine on it
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        else:
+            self._sampler = StackSampler(config.PROFILE_SAMPLE_INTERVAL)
+            self._sampler.start()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Wall/CPU time of the stage and the allocations that grew during it."""
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            self._peak_bytes = max(self._peak_bytes, peak)
+            ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+            growth = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+            self.stages.append({
+                "stage": name,
+                "wall_s": round(wall, 6),
+                "cpu_s": round(cpu, 6),
+                "traced_current_bytes": current,
+                "traced_peak_bytes": peak,
+                "top_allocations": [
+                    {"where": str(stat.traceback[0]), "size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff}
+                    for stat in growth[:config.PROFILE_TOP_N] if stat.size_diff > 0
+                ],
+            })
+
+    def stop(self):
+        wall = time.perf_counter() - self._wall_start
+        cpu = time.process_time() - self._cpu_start
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        peak = max(self._peak_bytes, peak)  # stages reset the peak
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        os.makedirs(self.path, exist_ok=True)
+        summary = {
+            "id": self.id,
+            "kind": self.kind,
+            "target": self.target,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "wall_s": round(wall, 3),
+            "cpu_s": round(cpu, 3),
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "error": self.error,
+            "stages": self.stages,
+        }
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(os.path.join(self.path, "profile.prof"))
+            summary["top"] = _cprofile_top(self._cprofile, config.PROFILE_TOP_N)
+        if self._sampler is not None:
+            self._sampler.stop()
+            with open(os.path.join(self.path, "profile.folded"), "w") as f:
+                f.write(self._sampler.folded())
+            summary["samples"] = self._sampler.samples
+            summary["top"] = self._sampler.top(config.PROFILE_TOP_N)
+        summary["artifacts"] = [name for name in ARTIFACTS if name == "summary.json" or os.path.exists(os.path.join(self.path, name))]
+
+        tmp_path = os.path.join(self.path, "summary.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(summary, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, "summary.json"))
+        logger.info(f"Saved {self.mode} profile of {self.kind} '{self.target}' to {self.path}")
+        _prune()
+
+
+current_profile: ContextVar[Optional[Profile]] = ContextVar("current_profile", default=None)
+
+_lock = threading.Lock()
+_active: Optional[str] = None
+
+
+def new_profile_id(kind: str, target: str) -> str:
+    slug = "".join(c if c.isalnum() or c in "-_" else "-" for c in target)[:40] or "run"
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{kind}-{slug}-{uuid.uuid4().hex[:6]}"
+
+
+def new_profile(kind: str, target: str, mode: str = "sampling", profile_id: Optional[str] = None) -> Profile:
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode '{mode}', expected one of {MODES}.")
+    return Profile(profile_id or new_profile_id(kind, target), kind, target, mode)
+
+
+def profiler_busy() -> bool:
+    return _active is not None
+
+
+@contextmanager
+def profiled(profile: Optional[Profile]):
+    """
+    Record `profile` around the block; a no-op when profile is None. Only one
+    profile records at a time, as tracemalloc and cProfile are process-wide,
+    so the block runs unprofiled if another one is already recording.
+    """
+    global _active
+    if profile is None:
+        yield None
+        return
+    with _lock:
+        busy = _active
+        if busy is None:
+            _active = profile.id
+    if busy is not None:
+        logger.warning(f"Not profiling {profile.kind} '{profile.target}': profile '{busy}' is still recording.")
+        yield None
+        return
+
+    token = current_profile.set(profile)
+    profile.start()
+    try:
+        yield profile
+    except BaseException as e:
+        profile.error = repr(e)
+        raise
+    finally:
+        current_profile.reset(token)
+        try:
+            profile.stop()
+        except Exception as e:
+            logger.error(f"Failed to save profile {profile.id}: {e}")
+        finally:
+            with _lock:
+                _active = None
+
+
+@contextmanager
+def profile_stage(name: str):
+    """Stage marker for the profile of the current run, if it is being profiled."""
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    with profile.stage(name):
+        yield
+
+
+# ---------------------------------#
+#   Artifacts                      #
+# ---------------------------------#
+
+def _profiles_dir() -> str:
+    return os.path.join(config.REPO_DIRS, ".profiles")
+
+
+def _prune():
+    """Keep the newest PROFILE_KEEP profiles."""
+    profile_dirs = sorted(
+        (entry for entry in os.scandir(_profiles_dir()) if entry.is_dir()),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in profile_dirs[config.PROFILE_KEEP:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def profile_artifact_path(profile_id: str, artifact: str) -> Optional[str]:
+    """Path of a saved artifact, or None for unknown ids and names."""
+    if artifact not in ARTIFACTS or os.path.basename(profile_id) != profile_id or profile_id.startswith("."):
+        return None
+    path = os.path.join(_profiles_dir(), profile_id, artifact)
+    return path if os.path.isfile(path) else None
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    path = profile_artifact_path(profile_id, "summary.json")
+    if path is None:
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        return None
+
+
+def list_profiles() -> List[Dict]:
+    """Saved profiles, newest first, without their per-stage details."""
+    if not os.path.isdir(_profiles_dir()):
+        return []
+    profiles = []
+    for entry in os.scandir(_profiles_dir()):
+        summary = load_profile(entry.name) if entry.is_dir() else None
+        if summary is not None:
+            profiles.append({key: value for key, value in summary.items() if key not in ("stages", "top")})
+    return sorted(profiles, key=lambda p: p["started_at"] or 0, reverse=True)
@@ -0,0 +1,167 @@
+import inspect
+import logging
+import functools
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from opentelemetry import trace
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+TRACER_NAME = "repository-insight"
+SERVICE = "Repository Insight"
+
+# Longest Cypher text recorded on a span
+STATEMENT_CHARS = 1000
+
+
+# ---------------------------------#
+#   Setup                          #
+# ---------------------------------#
+
+def _set_provider():
+    """
+    Install the tracer provider with the configured sampler. Sampling is
+    parent-based, so a request or ingestion job is kept or dropped as a whole.
+    """
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.sdk.resources import Resource, SERVICE_NAME
+
+    sampler = ParentBased(root=TraceIdRatioBased(config.TRACE_SAMPLE_RATIO))
+    trace.set_tracer_provider(TracerProvider(resource=Resource.create({SERVICE_NAME: SERVICE}), sampler=sampler))
+
+
+def instrument_app(app):
+    """
+    Set the tracer provider and instrument FastAPI. This part has to run
+    before the app serves requests, so it only pulls in the OpenTelemetry SDK.
+    """
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+    _set_provider()
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=trace.get_tracer_provider())
+
+
+def _span_exporter():
+    """Exporter selected by TRACE_EXPORTER; console and a local OTLP collector work offline."""
+    exporter = config.TRACE_EXPORTER.lower()
+    if exporter == "none":
+        return None
+    if exporter == "jaeger":
+        from opentelemetry.exporter.jaeger.thrift import JaegerExporter
+        return JaegerExporter(agent_host_name=config.JAEGER_HOST, agent_port=config.JAEGER_PORT)
+    if exporter == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            return OTLPSpanExporter(endpoint=config.OTLP_ENDPOINT)
+        except ImportError:
+            logger.warning("opentelemetry-exporter-otlp is not installed; exporting spans to the console.")
+    elif exporter != "console":
+        logger.warning(f"Unknown TRACE_EXPORTER '{config.TRACE_EXPORTER}'; exporting spans to the console.")
+
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+    return ConsoleSpanExporter(service_name=SERVICE)
+
+
+def _slow_span_logger(threshold_ms: float):
+    """Span processor that logs every sampled span slower than threshold_ms with its attributes."""
+    from opentelemetry.sdk.trace import SpanProcessor
+
+    class SlowSpanLogger(SpanProcessor):
+        def on_end(self, span):
+            duration_ms = (span.end_time - span.start_time) / 1e6
+            if duration_ms >= threshold_ms:
+                logger.warning(
+                    f"Slow span '{span.name}' took {duration_ms:.0f}ms "
+                    f"(trace {span.context.trace_id:032x}): {dict(span.attributes or {})}"
+                )
+
+    return SlowSpanLogger()
+
+
+def start_exporters():
+    """
+    Attach the span exporter and instrument LlamaIndex. Importing the Jaeger
+    exporter and the LlamaIndex instrumentor is slow (thrift, llama_index),
+    so this runs in the background warm-up instead of at import time.
+    """
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.instrumentation.llamaindex import LlamaIndexInstrumentor
+
+    provider = trace.get_tracer_provider()
+    exporter = _span_exporter()
+    if exporter is not None:
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    if config.TRACE_SLOW_SPAN_MS > 0:
+        provider.add_span_processor(_slow_span_logger(config.TRACE_SLOW_SPAN_MS))
+    LlamaIndexInstrumentor().instrument()
+
+
+_worker_configured = False
+
+
+def setup_tracing():
+    """
+    Provider and exporters for processes without the FastAPI app (ingestion
+    workers). Pool processes run many jobs, so this only configures once.
+    """
+    global _worker_configured
+    if _worker_configured:
+        return
+    _set_provider()
+    start_exporters()
+    _worker_configured = True
+
+
+def flush_spans(timeout_ms: int = 30000):
+    """Export buffered spans, e.g. before a worker process reports a finished job."""
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "force_flush"):
+        provider.force_flush(timeout_ms)
+
+
+# ---------------------------------#
+#   Spans                          #
+# ---------------------------------#
+
+def _clean(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop unset values and stringify anything OpenTelemetry cannot store."""
+    return {
+        key: value if isinstance(value, (str, bool, int, float)) else str(value)
+        for key, value in attributes.items() if value is not None
+    }
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, **kwargs):
+    """Child span of the current one; exceptions are recorded on it and re-raised."""
+    with trace.get_tracer(TRACER_NAME).start_as_current_span(name) as current:
+        if current.is_recording():
+            current.set_attributes(_clean({**(attributes or {}), **kwargs}))
+        yield current
+
+
+def set_attributes(attributes: Optional[Dict[str, Any]] = None, **kwargs):
+    """Add attributes to the current span; a no-op when the trace is not sampled."""
+    current = trace.get_current_span()
+    if current.is_recording():
+        current.set_attributes(_clean({**(attributes or {}), **kwargs}))
+
+
+def traced(name: str):
+    """Run the decorated function (sync or async) in a span called `name`."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
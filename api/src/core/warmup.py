@@ -0,0 +1,77 @@
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A replica cannot answer anything without the database; the other steps
+# only make the first query slower when they are missing.
+CRITICAL_STEPS = {"neo4j"}
+
+
+class WarmupState:
+    """Progress of the background warm-up, reported by /health/ready."""
+
+    def __init__(self, steps: List[str]):
+        self.steps: Dict[str, dict] = {name: {"status": "pending"} for name in steps}
+        self.finished = False
+
+    @property
+    def ready(self) -> bool:
+        return self.finished and all(self.steps[name]["status"] == "ok" for name in CRITICAL_STEPS if name in self.steps)
+
+    def report(self) -> dict:
+        return {"ready": self.ready, "finished": self.finished, "steps": self.steps}
+
+
+async def _warm_tracing():
+    from src.core.tracing import start_exporters
+    await asyncio.to_thread(start_exporters)
+
+
+async def _warm_neo4j():
+    from src.core.graph.store import get_graph_store
+    # Opens the driver's first connection; a no-op for the memory backend
+    await get_graph_store().verify()
+
+
+async def _warm_embedding():
+    from src.utils.helper import get_embedding
+    # Instantiates the embedding model and opens its HTTP connection pool
+    await asyncio.to_thread(get_embedding, "warm-up")
+
+
+async def _warm_llm():
+    from src.agent.insight.core import build_insight_agent
+    # Imports llama_index agents and builds the Gemini clients once
+    await asyncio.to_thread(build_insight_agent)
+
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], Awaitable[None]]]] = [
+    ("tracing", _warm_tracing),
+    ("neo4j", _warm_neo4j),
+    ("embedding", _warm_embedding),
+    ("llm", _warm_llm),
+]
+
+
+def new_warmup_state() -> WarmupState:
+    return WarmupState([name for name, _ in WARMUP_STEPS])
+
+
+async def warm_up(state: WarmupState):
+    """Run all warm-up steps concurrently; a failed step is recorded, not raised."""
+    async def run(name: str, step: Callable[[], Awaitable[None]]):
+        start = time.perf_counter()
+        try:
+            await step()
+            state.steps[name] = {"status": "ok", "seconds": round(time.perf_counter() - start, 3)}
+        except Exception as e:
+            logger.warning(f"Warm-up step '{name}' failed: {e}")
+            state.steps[name] = {"status": "failed", "seconds": round(time.perf_counter() - start, 3), "error": str(e)}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(name, step) for name, step in WARMUP_STEPS))
+    state.finished = True
+    logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s: {state.steps}")
@@ -1,49 +1,42 @@
-import os
 import asyncio
-import logging
-from pathlib import Path
-
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import RedirectResponse
-from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.exporter.jaeger.thrift import JaegerExporter
-from opentelemetry.sdk.resources import Resource, SERVICE_NAME
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.instrumentation.llamaindex import LlamaIndexInstrumentor
+from starlette.responses import JSONResponse, PlainTextResponse, RedirectResponse
 from src.core.logger_config import setup_logging
-from src.core.index import setup_all_indexes
+from src.core.index import setup_all_indexes, check_schema
 from src.core.config import config
+from src.core.metrics import render_prometheus
+from src.core.tracing import instrument_app
+from src.core.warmup import new_warmup_state, warm_up
 from src.service.ingestion import router as ingestion_router
+from src.service.admin import router as admin_router
 # from src.service.llama_ingestion import router as llama_router 
 from src.service.insight_ws import router as websocket_router
 
+# Heavy imports (llama_index, the Jaeger exporter, the LlamaIndex instrumentor,
+# the embedding model and LLM clients) are deferred to the background warm-up
+# started in lifespan, so a new replica starts serving quickly.
 setup_logging()
 logger=logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # This runs before the app starts receiving requests
+    # This runs before the app starts receiving requests.
+    # prod creates or repairs the indexes; dev only checks them (build via POST /index)
     if config.APP_ENV == "prod":
-        if INDEX_FLAG_PATH.exists():
-            logger.info("Index already exists. Skipping setup.")
-            app.state.index_ready = True
-        else:
-            try:
-                logger.info("Running vector index setup...")
-                await setup_all_indexes()
-                INDEX_FLAG_PATH.touch()
-                app.state.index_ready = True
-                logger.info("Vector index setup complete.")
-            except Exception as e:
-                logger.error(f"Error during index setup: {e}")
-                app.state.index_ready = False
+        asyncio.create_task(run_setup())
     else:
-        app.state.index_ready = False  # for dev
+        asyncio.create_task(refresh_schema_status())
+
+    app.state.warmup = new_warmup_state()
+    app.state.warmup_task = asyncio.create_task(warm_up(app.state.warmup))
+
+    # In worker mode the worker requeues interrupted jobs itself
+    if config.INGEST_RESUME_ON_STARTUP and config.INGEST_MODE == "inline":
+        from src.service.ingest.main_ingest import resume_pending_ingests
+        asyncio.create_task(resume_pending_ingests())
 
     yield
 
@@ -61,22 +54,8 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Set the tracer provider
-trace.set_tracer_provider(TracerProvider(resource=Resource.create({SERVICE_NAME:"Repository Insight"})))
-tracer = trace.get_tracer(__name__)
-
-
-# Configure the Jaeger exporter
-jaeger_exporter = JaegerExporter(
-    agent_host_name="jaeger",
-    agent_port=6831,  # Jaeger agent port
-)
-jaeger_span_processor = BatchSpanProcessor(jaeger_exporter)
-trace.get_tracer_provider().add_span_processor(jaeger_span_processor)
-
-# Instrument the FastAPI app
-FastAPIInstrumentor.instrument_app(app, tracer_provider=trace.get_tracer_provider())
-LlamaIndexInstrumentor().instrument()
+# Instrument the FastAPI app; exporters are attached during warm-up
+instrument_app(app)
 
 # Configure CORS middleware to allow requests from any origin
 app.add_middleware(
@@ -87,21 +66,30 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
-INDEX_FLAG_PATH = Path(config.REPO_DIRS) / "index.ready"
 app.state.index_ready = False
+app.state.schema = None
 
-async def run_setup():
-    if INDEX_FLAG_PATH.exists():
-        logger.info("Index already exists. Skipping setup.")
-        app.state.index_ready = True
-        return
+async def refresh_schema_status() -> dict:
+    """Check the Neo4j schema against the expected indexes and update readiness."""
+    try:
+        status = await check_schema()
+    except Exception as e:
+        logger.error(f"Error checking index schema: {e}")
+        status = {"ready": False, "error": str(e)}
+    app.state.schema = status
+    app.state.index_ready = status["ready"]
+    return status
 
+async def run_setup():
     try:
         logger.info("Running vector index setup...")
-        await setup_all_indexes()
-        INDEX_FLAG_PATH.touch()
-        app.state.index_ready = True
-        logger.info("Vector index setup complete.")
+        status = await setup_all_indexes()
+        app.state.schema = status
+        app.state.index_ready = status["ready"]
+        if status["ready"]:
+            logger.info("Vector index setup complete.")
+        else:
+            logger.info(f"Vector index setup done; waiting for indexes: {status}")
     except Exception as e:
         logger.error(f"Error during index setup: {e}")
         app.state.index_ready = False
@@ -119,9 +107,38 @@ if config.APP_ENV == "dev":
 
     @app.get("/index/status", tags=["Dev Tools"])
     async def get_index_status():
-        return {"ready": app.state.index_ready}
+        return await refresh_schema_status()
     
 
+@app.get("/health/live", tags=["Health"])
+async def health_live():
+    return {"status": "ok"}
+
+
+@app.get("/health/ready", tags=["Health"])
+async def health_ready():
+    """
+    Ready once the background warm-up has finished and Neo4j is reachable
+    (and, in prod, every expected index is ONLINE with the embedding model's
+    dimension). Returns 503 until then.
+    """
+    warmup = getattr(app.state, "warmup", None)
+    report = warmup.report() if warmup else {"ready": False, "finished": False, "steps": {}}
+    if config.APP_ENV == "prod" and not app.state.index_ready and app.state.schema is not None:
+        # Indexes may have finished populating since the last check
+        await refresh_schema_status()
+    report["index_ready"] = app.state.index_ready
+    if config.APP_ENV == "prod" and not app.state.index_ready:
+        report["ready"] = False
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: this process plus the metrics exported by the ingestion worker processes."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # Redirect root path to API documentation
 @app.get("/", include_in_schema=False)
 def root_redirect():
@@ -131,5 +148,6 @@ def root_redirect():
     return RedirectResponse(url="/docs/")
 
 app.include_router(ingestion_router, prefix="/api", tags=["Ingestion"])
+app.include_router(admin_router, prefix="/api", tags=["Admin"])
 # app.include_router(llama_router, prefix="/api", tags=["LlamaIndex Ingestion"])
 app.include_router(websocket_router, tags=["WebSocket"])
\ No newline at end of file
@@ -0,0 +1,56 @@
+import hmac
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+from src.core.config import config
+from src.core.profiling import list_profiles, load_profile, profile_artifact_path
+
+
+logger = logging.getLogger(__name__)
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """True when ADMIN_TOKEN is set and `token` matches it; without ADMIN_TOKEN nobody is admin."""
+    if not config.ADMIN_TOKEN or token is None:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), config.ADMIN_TOKEN.encode("utf-8"))
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Admin endpoints are disabled unless ADMIN_TOKEN is set, then the X-Admin-Token header must match."""
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set).")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles", response_model=List[dict])
+async def get_profiles():
+    """Endpoint to list saved ingestion and query profiles, newest first."""
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """Endpoint to get the summary of a profile: top functions and per-stage time and memory growth."""
+    summary = load_profile(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return summary
+
+
+@router.get("/profiles/{profile_id}/{artifact}")
+async def download_profile_artifact(profile_id: str, artifact: str):
+    """
+    Endpoint to download a profile artifact: `profile.folded` (sampling mode; collapsed
+    stacks for flamegraph.pl or speedscope), `profile.prof` (cprofile mode; pstats for
+    snakeviz) or `summary.json`.
+    """
+    path = profile_artifact_path(profile_id, artifact)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found.")
+    return FileResponse(path, filename=f"{profile_id}-{artifact}")
@@ -0,0 +1,186 @@
+import logging
+from typing import List, Tuple
+import numpy as np
+from src.core.config import config
+from src.core.graph.store import get_graph_store
+from src.core.graph_snapshot import CSRGraph, refresh_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def strongly_connected_components(num_nodes: int, graph: CSRGraph) -> np.ndarray:
+    """Iterative Tarjan: returns a component id per node (import cycles share an id)."""
+    index = np.full(num_nodes, -1, dtype=np.int64)
+    lowlink = np.zeros(num_nodes, dtype=np.int64)
+    on_stack = np.zeros(num_nodes, dtype=bool)
+    component = np.full(num_nodes, -1, dtype=np.int64)
+    stack: List[int] = []
+    counter = 0
+    next_component = 0
+
+    for root in range(num_nodes):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, edge = work.pop()
+            if edge == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+
+            neighbors, _ = graph.neighbors(node)
+            recursed = False
+            for i in range(edge, len(neighbors)):
+                neighbor = int(neighbors[i])
+                if index[neighbor] == -1:
+                    work.append((node, i + 1))
+                    work.append((neighbor, 0))
+                    recursed = True
+                    break
+                if on_stack[neighbor]:
+                    lowlink[node] = min(lowlink[node], index[neighbor])
+            if recursed:
+                continue
+
+            if lowlink[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = next_component
+                    if member == node:
+                        break
+                next_component += 1
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+    return component
+
+
+def pagerank(num_nodes: int, src: np.ndarray, dst: np.ndarray, damping: float = 0.85,
+             max_iter: int = 100, tol: float = 1e-9) -> np.ndarray:
+    """Power-iteration PageRank; dangling nodes spread their rank uniformly."""
+    if num_nodes == 0:
+        return np.zeros(0)
+    out_degree = np.bincount(src, minlength=num_nodes).astype(np.float64)
+    dangling = out_degree == 0
+    rank = np.full(num_nodes, 1.0 / num_nodes)
+    for _ in range(max_iter):
+        contribution = np.zeros(num_nodes)
+        if len(src):
+            np.add.at(contribution, dst, rank[src] / out_degree[src])
+        new_rank = (1 - damping) / num_nodes + damping * (contribution + rank[dangling].sum() / num_nodes)
+        if np.abs(new_rank - rank).sum() < tol:
+            return new_rank
+        rank = new_rank
+    return rank
+
+
+def closures(components: np.ndarray, graph: CSRGraph) -> List[int]:
+    """
+    Per component, a bitset (bit i = node i) of its members and every node they
+    reach. `components` must number the components of `graph` the way Tarjan
+    does, in reverse topological order, so each component only unions the
+    finished closures of the lower-numbered components it has edges to.
+    """
+    count = int(components.max()) + 1 if len(components) else 0
+    reach = [0] * count
+    successors: List[set] = [set() for _ in range(count)]
+    for node, component in enumerate(components):
+        reach[component] |= 1 << node
+        for neighbor in graph.neighbors(node)[0]:
+            other = components[int(neighbor)]
+            if other != component:
+                successors[component].add(int(other))
+    for component in range(count):
+        for other in successors[component]:
+            reach[component] |= reach[other]
+    return reach
+
+
+def members(bits: int, num_nodes: int) -> np.ndarray:
+    """Node indexes set in a bitset, ascending."""
+    raw = np.frombuffer(bits.to_bytes((num_nodes + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little")[:num_nodes])
+
+
+async def compute_dependency_analytics(repo_name: str):
+    """
+    Precompute impact analytics over the RELATED_TO graph of one repository and
+    store them on the File nodes: SCC (import cycles), PageRank and degree
+    centrality, and transitive upstream/downstream sets.
+    """
+    snapshot = await refresh_snapshot(repo_name)
+    files = [i for i, label in enumerate(snapshot.labels) if label == config.FILE_LABEL and snapshot.alive[i]]
+    if not files:
+        return
+
+    # Compact the file subgraph so the arrays only cover files
+    local = {node: i for i, node in enumerate(files)}
+    src, dst = [], []
+    for node in files:
+        for neighbor in snapshot.forward["dependency"].neighbors(node)[0]:
+            neighbor = int(neighbor)
+            if neighbor in local:
+                src.append(local[node])
+                dst.append(local[neighbor])
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    rel = np.zeros(len(src), dtype=np.int8)
+    forward = CSRGraph(len(files), src, dst, rel)
+    backward = CSRGraph(len(files), dst, src, rel)
+
+    components = strongly_connected_components(len(files), forward)
+    # The same components, numbered in the reverse topological order of the backward graph
+    backward_components = strongly_connected_components(len(files), backward)
+    downstream_reach = closures(components, forward)
+    upstream_reach = closures(backward_components, backward)
+    component_sizes = np.bincount(components)
+    ranks = pagerank(len(files), src, dst)
+    out_degree = np.bincount(src, minlength=len(files)) if len(src) else np.zeros(len(files), dtype=np.int64)
+    in_degree = np.bincount(dst, minlength=len(files)) if len(dst) else np.zeros(len(files), dtype=np.int64)
+
+    store = get_graph_store()
+    found = await store.get_nodes([(config.FILE_LABEL, snapshot.node_ids[node]) for node in files], fields=["path"])
+    paths = {node_id: node.get("path") for node_id, node in found.items()}
+
+    def path_of(i: int) -> str:
+        node_id = snapshot.node_ids[files[i]]
+        return paths.get(node_id) or snapshot.names[files[i]]
+
+    limit = config.ANALYTICS_MAX_CLOSURE
+    rows = []
+    # Files of one component share their closure, so each is unpacked once
+    unpacked = {}
+
+    def closure_of(direction: str, reach: List[int], component: int, i: int) -> Tuple[int, List[int]]:
+        """Size and first `limit` members of a file's closure, the file itself left out."""
+        key = (direction, component)
+        if key not in unpacked:
+            unpacked[key] = members(reach[component], len(files))
+        nodes = unpacked[key]
+        return len(nodes) - 1, [int(j) for j in nodes[:limit + 1] if j != i][:limit]
+
+    for i, node in enumerate(files):
+        downstream_count, downstream = closure_of("down", downstream_reach, int(components[i]), i)
+        upstream_count, upstream = closure_of("up", upstream_reach, int(backward_components[i]), i)
+        rows.append({
+            "node_id": snapshot.node_ids[node],
+            "scc_id": int(components[i]),
+            "scc_size": int(component_sizes[components[i]]),
+            "in_cycle": bool(component_sizes[components[i]] > 1),
+            "pagerank": float(ranks[i]),
+            "in_degree": int(in_degree[i]),
+            "out_degree": int(out_degree[i]),
+            "downstream_count": downstream_count,
+            "upstream_count": upstream_count,
+            "downstream": [path_of(j) for j in downstream],
+            "upstream": [path_of(j) for j in upstream],
+        })
+
+    await store.update_nodes(config.FILE_LABEL, rows)
+
+    cycles = int((component_sizes > 1).sum())
+    logger.info(f"Dependency analytics for '{repo_name}': {len(files)} files, {len(src)} edges, {cycles} import cycles.")
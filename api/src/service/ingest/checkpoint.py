@@ -0,0 +1,85 @@
+import os
+import json
+import time
+import logging
+from dataclasses import dataclass, field, fields, asdict
+from typing import List, Optional
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = ".checkpoints"
+
+
+@dataclass
+class IngestCheckpoint:
+    """Progress of one repository ingestion, persisted after every stage and file batch."""
+    repo_name: str
+    repo_url: Optional[str] = None
+    commit_oid: Optional[str] = None
+    completed_stages: List[str] = field(default_factory=list)
+    # Enrichment runs inside each file batch, so this also marks how far it got
+    file_index: int = 0
+    dependency_queue: List[list] = field(default_factory=list)
+    updated_at: float = 0.0
+
+    def is_done(self, stage: str) -> bool:
+        return stage in self.completed_stages
+
+    def mark_done(self, stage: str):
+        if stage not in self.completed_stages:
+            self.completed_stages.append(stage)
+
+
+def checkpoint_path(repo_name: str) -> str:
+    return os.path.join(config.REPO_DIRS, CHECKPOINT_DIR, f"{repo_name}.json")
+
+
+def load_checkpoint(repo_name: str) -> Optional[IngestCheckpoint]:
+    """Load the checkpoint for a repository, or None if there is no usable one."""
+    path = checkpoint_path(repo_name)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        # Keys of older checkpoint versions are dropped
+        known = {f.name for f in fields(IngestCheckpoint)}
+        return IngestCheckpoint(**{key: value for key, value in data.items() if key in known})
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def save_checkpoint(checkpoint: IngestCheckpoint):
+    """Atomically write the checkpoint so a crash never leaves a half-written file."""
+    path = checkpoint_path(checkpoint.repo_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    checkpoint.updated_at = time.time()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(asdict(checkpoint), f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def clear_checkpoint(repo_name: str):
+    path = checkpoint_path(repo_name)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def list_checkpoints() -> List[IngestCheckpoint]:
+    """Return all checkpoints of ingestions that have not finished yet."""
+    directory = os.path.join(config.REPO_DIRS, CHECKPOINT_DIR)
+    if not os.path.isdir(directory):
+        return []
+
+    checkpoints = []
+    for entry in sorted(os.listdir(directory)):
+        if entry.endswith(".json"):
+            checkpoint = load_checkpoint(entry[:-len(".json")])
+            if checkpoint:
+                checkpoints.append(checkpoint)
+    return checkpoints
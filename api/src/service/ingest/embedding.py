@@ -1,3 +1,4 @@
+import asyncio
 import logging 
 import math 
 import uuid
@@ -11,18 +12,19 @@ async def add_embeddings(
     node_id: str,
     fields: dict,
 ):
-    """Embeds the given content and stores it on the node with given node_id."""
+    """Embeds the given content and stores it on the node with given node_id.
+
+    The model runs off the event loop while holding an embedding slot from the
+    ingestion scheduler, shared fairly between concurrently ingested repositories.
+    `session` is a graph store (or one of its sessions).
+    """
     from src.utils.helper import get_embedding
+    from src.service.ingest.scheduler import get_scheduler
 
     for field_name, content in fields.items():
         if not content:
             continue
 
-        embedding = get_embedding(content)
-        embed_prop = f"embedding_{field_name}"
-        query = f"""
-            MATCH (n:{node_label} {{node_id: $node_id}})
-            SET n.{embed_prop} = $embedding
-            RETURN n
-        """
-        await session.run(query, node_id=node_id, embedding=embedding)
\ No newline at end of file
+        async with get_scheduler().slot("embedding"):
+            embedding = await asyncio.to_thread(get_embedding, content)
+        await session.update_nodes(node_label, [{"node_id": node_id, f"embedding_{field_name}": embedding}])
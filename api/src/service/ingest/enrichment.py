@@ -2,7 +2,7 @@ import os
 import logging 
 from asyncio import Lock
 from src.core.config import config
-from src.core.db import get_session
+from src.core.graph.store import get_graph_store
 from src.utils.helper import generate_stable_id
 from src.service.ingest.node import create_class_node, create_method_node, create_script_node
 from src.service.ingest.relationship import queue_dependency_relationships_safe 
@@ -14,24 +14,15 @@ async def enrich_file_node(session,path,name, state):
     description = state.get("file_description", "")
     node_id = generate_stable_id(f"{path}:{name}")
     try:
-        logger.info(f"Updating node properties for file: {path}, {name}")
-        query = """
-        MATCH (file:File {node_id: $node_id})
-        SET file.description = $description
-        RETURN file
-        """
-        result = await session.run(
-            query, 
-            node_id=node_id,
-            description=description, 
-        )
-
-        # Return the updated node
-        updated_node = await result.single()
-        logger.info(f"Successfully updated node: {updated_node}")
+        logger.debug(f"Updating node properties for file: {path}, {name}")
+        updated_node = await session.update_nodes(config.FILE_LABEL, [{
+            "node_id": node_id,
+            "description": description,
+        }])
+        logger.info(f"Successfully updated file node: {path} ({node_id})", extra={"entity": "file_enrichment"})
         
         from src.service.ingest.embedding import add_embeddings
-        add_embeddings(
+        await add_embeddings(
             session=session,
             node_label=config.FILE_LABEL,
             node_id=node_id,
@@ -39,7 +30,7 @@ async def enrich_file_node(session,path,name, state):
                 "description": description,
             }
         )
-        logger.info(f"Added embeddings for node: {node_id}")
+        logger.debug(f"Added embeddings for node: {node_id}")
         return updated_node
     except Exception as e:
         logger.error(f"Error updating node properties: {e}")
@@ -52,7 +43,7 @@ async def enrich_script_class_method(session, file_path, state):
         scripts = state.get("scripts", [])
 
         if not classes and not methods and not scripts:
-            logger.info(f"No classes/methods/scripts found in {file_path}. Skipping enrichment.")
+            logger.info(f"No classes/methods/scripts found in {file_path}. Skipping enrichment.", extra={"entity": "file_enrichment"})
             return
         
         for class_data in classes:
@@ -64,7 +55,7 @@ async def enrich_script_class_method(session, file_path, state):
                 file_path
             )
         for method_data in methods:
-            logger.info(f"Creating method node for {method_data['method_name']}")
+            logger.debug(f"Creating method node for {method_data['method_name']}")
             # Create or update the method node
             method_node = await create_method_node(
                 session, 
@@ -75,7 +66,7 @@ async def enrich_script_class_method(session, file_path, state):
             )
         
         for script_data in scripts:
-            logger.info(f"Creating script node for {script_data['script_name']}")
+            logger.debug(f"Creating script node for {script_data['script_name']}")
             # Create or update the script node
             script_node = await create_script_node(
                 session, 
@@ -98,9 +89,9 @@ async def enrich_kg(
     dep_queue: list, 
     dep_lock: Lock
 ):
-    """Enrich the Neo4j knowledge graph with data from a code analysis state."""
+    """Enrich the knowledge graph with data from a code analysis state."""
     try:
-        async with get_session() as session:
+        async with get_graph_store().session() as session:
             logging.info("Update Repositor property ....")
             await enrich_file_node(
                 session=session,
@@ -110,7 +101,7 @@ async def enrich_kg(
             )
 
             if state["analysis_skipped"]:
-                logger.info(f"Analysis was skipped for {file_path}: {state.get('skip_reason')}")
+                logger.info(f"Analysis was skipped for {file_path}: {state.get('skip_reason')}", extra={"entity": "file_analysis"})
                 return
             
             if not state["skip_code_parser"]:
@@ -119,7 +110,7 @@ async def enrich_kg(
                     file_path=file_path,
                     state=state.get("code_analysis", {})
                 )
-                logger.info("Enriching knowledge graph with classes, methods, and scripts.")
+                logger.debug("Enriching knowledge graph with classes, methods, and scripts.")
             
             if not state["skip_dependency_parser"]:        
                 await queue_dependency_relationships_safe(
@@ -128,10 +119,10 @@ async def enrich_kg(
                     dep_queue=dep_queue,
                     lock=dep_lock
                 )
-                logger.info("Successfully enriched the knowledge grap with relationship.")
+                logger.debug("Successfully enriched the knowledge grap with relationship.")
 
             if state["skip_code_parser"] and state["skip_dependency_parser"]:
-                logger.info("Only file node updated. No code or dependency enrichment was needed.")
+                logger.debug("Only file node updated. No code or dependency enrichment was needed.")
         
     except Exception as e:
         logger.error(f"Error during enrichment process: {e}")
@@ -148,8 +139,10 @@ async def analyze_and_enrich(
 ):
     """Run code analysis and enrich the knowledge graph with the results."""
     from src.agent.ingest.base import run_code_analysis_agent
+    from src.service.ingest.scheduler import get_scheduler
 
-    state = await run_code_analysis_agent(file_path=full_path, repo_base=repo_base)
+    async with get_scheduler().slot("llm"):
+        state = await run_code_analysis_agent(file_path=full_path, repo_base=repo_base)
     await enrich_kg(
         repo_name=repo_name,
         file_name=file_name,
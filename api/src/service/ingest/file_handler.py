@@ -2,7 +2,8 @@ import os
 from asyncio import Lock
 import logging
 from src.core.config import config
-from src.core.db import get_session
+from src.core.graph.store import get_graph_store
+from src.core.metrics import BYTES_READ, FILES_READ
 from src.service.ingest.node import create_file_node
 from src.agent.ingest.tool import extract_file_content
 
@@ -10,19 +11,22 @@ from src.agent.ingest.tool import extract_file_content
 logger = logging.getLogger(__name__)
 
 async def process_file_node(
-    file_semaphore,
     node,
     updated_filter_result: dict,
     dependency_queue: list,
     dep_lock: Lock 
 ):
-    async with get_session() as session:
-        async with file_semaphore:
+    from src.service.ingest.scheduler import get_scheduler
+
+    async with get_scheduler().slot("neo4j"):
+        async with get_graph_store().session() as session:
             file_path = node["path"]
             full_path = os.path.join(config.REPO_DIRS, file_path)
 
             try:
                 file_content = await extract_file_content(full_path)
+                FILES_READ.inc()
+                BYTES_READ.inc(len(file_content.encode("utf-8")))
 
                 await create_file_node(
                     session=session,
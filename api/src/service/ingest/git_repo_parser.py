@@ -2,6 +2,7 @@ import os
 import fnmatch
 import logging
 from src.utils.helper import get_tree
+from src.core.tracing import set_attributes, traced
 import pygit2
 
 logger = logging.getLogger(__name__)
@@ -18,7 +19,9 @@ class GitRepoParser:
             "commits": [],
         }
 
+    @traced("git.parse")
     def get_nodes(self):
+        set_attributes({"repo.path": self.repo_path})
         self.get_metadata()
 
         try:
@@ -35,6 +38,7 @@ class GitRepoParser:
         except Exception as e:
             logger.warning(f"Failed to collect branches or commits: {e}")
 
+        set_attributes({key: len(self.nodes[key]) for key in ("folders", "files", "branches", "commits")})
         return self.nodes
 
     def _get_tree_from_commit(self, commit_oid) -> str:
@@ -57,6 +61,7 @@ class GitRepoParser:
         walk(tree)
         return "\n".join(lines)
 
+    @traced("git.metadata")
     def get_metadata(self):
         remote_url = None
         repo_name = None
@@ -100,8 +105,10 @@ class GitRepoParser:
         }
         return self.nodes["metadata"]
     
+    @traced("git.diff_branches")
     def diff_files_between_branches(self, repo: pygit2.Repository, default_branch: str, other_branch: str) -> dict:
         """Compare file changes between default_branch and other_branch."""
+        set_attributes({"branch.base": default_branch, "branch.other": other_branch})
         try:
             default_commit = repo.branches.get(default_branch).peel()
             other_commit = repo.branches.get(other_branch).peel()
@@ -148,6 +155,12 @@ class GitRepoParser:
                         "diff": "\n".join(lines)
                     })
 
+            set_attributes({
+                "files.added": len(added),
+                "files.removed": len(removed),
+                "files.modified": len(modified),
+                "diff.bytes": sum(len(m["diff"]) for m in modified),
+            })
             return {
                 "added": added,
                 "removed": removed,
@@ -163,6 +176,7 @@ class GitRepoParser:
             }
 
 
+    @traced("git.branches")
     def get_branches(self):
         all_branches = {}
         repo_name = self.nodes["metadata"].get("name", "unknown")
@@ -240,6 +254,7 @@ class GitRepoParser:
                 logger.warning(f"Failed to process remote branch '{remote_branch_name}': {e}")
 
         self.nodes["branches"] = list(all_branches.values())
+        set_attributes({"branches": len(all_branches)})
         return self.nodes["branches"]
 
 
@@ -254,6 +269,7 @@ class GitRepoParser:
             first_line = first_line[:max_chars].rstrip() + "..."
         return first_line
 
+    @traced("git.walk_commits")
     def collect_all_commits(self):
         commits={}
         repo_name = self.nodes["metadata"].get("name", "unknown")
@@ -318,8 +334,14 @@ class GitRepoParser:
             {**c, "branches": sorted(list(c["branches"]))}
             for c in commits.values()
         ]
+        set_attributes({
+            "commits": len(commits),
+            "files.touched": sum(len(c["touched_files"]) for c in commits.values()),
+            "diff.bytes": sum(len(f["diff"]) for c in commits.values() for f in c["touched_files"]),
+        })
         return self.nodes["commits"]
 
+    @traced("git.walk_tree")
     def get_tree_dicts(self, commit):
         tree = commit.tree
         repo_name = self.nodes["metadata"]["name"]
@@ -364,4 +386,5 @@ class GitRepoParser:
                     })
 
         walk(tree, base_path)
+        set_attributes({"commit": str(commit.id), "folders": len(folders), "files": len(files)})
         return folders, files
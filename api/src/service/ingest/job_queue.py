@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import socket
+import uuid
+import logging
+from typing import List, Optional
+from src.core.config import config
+from src.utils.helper import pid_alive
+
+logger = logging.getLogger(__name__)
+
+JOBS_DIR = ".jobs"
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+JOB_STATES = (PENDING, RUNNING, DONE, FAILED)
+
+# A local spool directory is the queue: each job is a JSON file that moves
+# between state folders with os.replace, which is atomic on one filesystem,
+# so several worker processes can claim jobs without a broker.
+# One repository has at most one active (pending or running) job: jobs of a
+# repository share its clone under REPO_DIRS and its checkpoint file.
+
+
+def _state_dir(state: str) -> str:
+    return os.path.join(config.REPO_DIRS, JOBS_DIR, state)
+
+
+def _job_path(state: str, job_id: str) -> str:
+    return os.path.join(_state_dir(state), f"{job_id}.json")
+
+
+def _write_job(state: str, job: dict):
+    os.makedirs(_state_dir(state), exist_ok=True)
+    path = _job_path(state, job["id"])
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(job, f)
+    os.replace(tmp_path, path)
+
+
+def _read_job(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def repo_name_of(repo_url: str) -> str:
+    """Directory name of the clone, as in prepare_repository_sync."""
+    return os.path.basename(repo_url.rstrip('/')).replace('.git', '')
+
+
+def _jobs(state: str) -> List[dict]:
+    state_dir = _state_dir(state)
+    if not os.path.isdir(state_dir):
+        return []
+    jobs = (_read_job(os.path.join(state_dir, e)) for e in os.listdir(state_dir) if e.endswith(".json"))
+    return [job for job in jobs if job is not None]
+
+
+def find_active_job(repo_url: str) -> Optional[dict]:
+    """The pending or running job of the repository of repo_url, if any."""
+    repo_name = repo_name_of(repo_url)
+    for state in (RUNNING, PENDING):
+        for job in _jobs(state):
+            if repo_name_of(job["repo_url"]) == repo_name:
+                return job
+    return None
+
+
+def enqueue_job(repo_url: str, **options) -> dict:
+    """
+    Add an ingestion job to the local queue and return it. While the
+    repository already has a pending or running job, that job is returned
+    instead and nothing is queued.
+    """
+    active = find_active_job(repo_url)
+    if active is not None:
+        logger.info(f"Ingestion of {repo_url} already {active['status']} as job {active['id']}, not queueing another")
+        return active
+
+    created_at = time.time()
+    job = {
+        "id": f"{int(created_at * 1000):013d}-{uuid.uuid4().hex[:8]}",
+        "repo_url": repo_url,
+        "options": options,
+        "status": PENDING,
+        "created_at": created_at,
+        "started_at": None,
+        "finished_at": None,
+        "error": None,
+    }
+    _write_job(PENDING, job)
+    logger.info(f"Queued ingestion job {job['id']} for {repo_url}")
+    return job
+
+
+def claim_next_job() -> Optional[dict]:
+    """
+    Move the oldest pending job to running and return it, or None if the
+    queue is empty. Jobs whose repository is already running stay pending.
+    """
+    pending_dir = _state_dir(PENDING)
+    if not os.path.isdir(pending_dir):
+        return None
+    running_repos = {repo_name_of(job["repo_url"]) for job in _jobs(RUNNING)}
+
+    # Highest priority first; job ids start with the enqueue time, so ties are FIFO
+    def order(entry):
+        job = _read_job(os.path.join(pending_dir, entry)) or {}
+        return -job.get("options", {}).get("priority", 1), entry
+
+    entries = sorted((e for e in os.listdir(pending_dir) if e.endswith(".json")), key=order)
+
+    os.makedirs(_state_dir(RUNNING), exist_ok=True)
+    for entry in entries:
+        source = os.path.join(pending_dir, entry)
+        job = _read_job(source)
+        if job is None or repo_name_of(job["repo_url"]) in running_repos:
+            continue
+        target = os.path.join(_state_dir(RUNNING), entry)
+        try:
+            os.replace(source, target)
+        except FileNotFoundError:
+            continue  # Claimed by another worker
+
+        # Another worker may have claimed a job of the same repository
+        # meanwhile; the job queued first keeps running, the others go back to pending
+        repo_name = repo_name_of(job["repo_url"])
+        if any(repo_name_of(other["repo_url"]) == repo_name and other["id"] < job["id"] for other in _jobs(RUNNING)):
+            os.replace(target, source)
+            running_repos.add(repo_name)
+            continue
+
+        job["status"] = RUNNING
+        job["started_at"] = job["heartbeat_at"] = time.time()
+        job["owner"] = {"host": socket.gethostname(), "pid": os.getpid()}
+        _write_job(RUNNING, job)
+        return job
+    return None
+
+
+def heartbeat_jobs(jobs: List[dict]):
+    """Refresh the heartbeat of the running jobs of this worker."""
+    now = time.time()
+    for job in jobs:
+        # A job requeued by another worker must not be written back to running
+        if not os.path.exists(_job_path(RUNNING, job["id"])):
+            logger.warning(f"Job {job['id']} is no longer in running; not refreshing its heartbeat")
+            continue
+        job["heartbeat_at"] = now
+        _write_job(RUNNING, job)
+
+
+def _orphaned(job: dict) -> bool:
+    """A running job whose worker is gone: dead on this host, or silent for INGEST_HEARTBEAT_TIMEOUT."""
+    owner = job.get("owner") or {}
+    if owner.get("host") == socket.gethostname() and owner.get("pid") != os.getpid() and not pid_alive(owner["pid"]):
+        return True
+    heartbeat_at = job.get("heartbeat_at") or job.get("started_at") or 0
+    return time.time() - heartbeat_at > config.INGEST_HEARTBEAT_TIMEOUT
+
+
+def finish_job(job: dict, succeeded: bool, error: Optional[str] = None, **extra) -> dict:
+    """Record the outcome of a running job."""
+    state = DONE if succeeded else FAILED
+    job.update(extra)
+    job["status"] = state
+    job["finished_at"] = time.time()
+    job["error"] = error
+    _write_job(state, job)
+    running_path = _job_path(RUNNING, job["id"])
+    if os.path.exists(running_path):
+        os.remove(running_path)
+    return job
+
+
+def requeue_running_jobs() -> int:
+    """
+    Return jobs left in running by a crashed worker to the queue; their
+    checkpoints resume them. Jobs of live workers, here or on other hosts
+    sharing the spool, are left alone.
+    """
+    running_dir = _state_dir(RUNNING)
+    if not os.path.isdir(running_dir):
+        return 0
+
+    os.makedirs(_state_dir(PENDING), exist_ok=True)
+    count = 0
+    for entry in os.listdir(running_dir):
+        if not entry.endswith(".json"):
+            continue
+        source = os.path.join(running_dir, entry)
+        job = _read_job(source)
+        if job is None or not _orphaned(job):
+            continue
+        try:
+            # Moving the file first means only one worker requeues it
+            os.replace(source, _job_path(PENDING, job["id"]))
+        except FileNotFoundError:
+            continue
+        job["status"] = PENDING
+        job.pop("owner", None)
+        _write_job(PENDING, job)
+        logger.info(f"Requeued job {job['id']} of a worker that stopped ({job.get('repo_url')})")
+        count += 1
+    return count
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    for state in JOB_STATES:
+        job = _read_job(_job_path(state, job_id))
+        if job is not None:
+            return job
+    return None
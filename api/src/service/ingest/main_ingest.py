@@ -1,10 +1,19 @@
 import os
+import time
 import logging
 import shutil
 import pygit2
 import asyncio
-from asyncio import Semaphore, Lock
-from src.core.db import get_session, close_driver
+from asyncio import Lock
+from contextlib import contextmanager
+from typing import Optional
+from src.core.config import config
+from src.core.graph.store import get_graph_store
+from src.core.graph_snapshot import sync_snapshots
+from src.core.metrics import INGEST_JOBS, INGEST_STAGE_SECONDS, job_metrics
+from src.core.profiling import Profile, profile_stage, profiled
+from src.core.tracing import set_attributes, traced
+from src.service.response_cache import invalidate_repository
 from src.service.ingest.node import (
     create_repository_node, create_folder_node, create_branch_node, create_commit_node
 )
@@ -13,6 +22,11 @@ from src.service.ingest.relationship import (
     run_dependency_relationships_batch,
 )
 from src.service.ingest.file_handler import process_file_node
+from src.service.ingest.analytics import compute_dependency_analytics
+from src.service.ingest.scheduler import get_scheduler
+from src.service.ingest.checkpoint import (
+    IngestCheckpoint, load_checkpoint, save_checkpoint, clear_checkpoint, list_checkpoints
+)
 # from src.agent.ingest.base import run_filter_agent
 from src.utils.git_utils import traverse_tree_sync
 from src.service.ingest.git_repo_parser import GitRepoParser
@@ -20,93 +34,229 @@ from src.service.ingest.git_repo_parser import GitRepoParser
 
 logger = logging.getLogger(__name__)
 
-async def ingest_repo(cloned_repo: pygit2.Repository):
-    """Ingest a Git repository into Neo4j with nodes, embeddings, and relationships."""
-    dependency_queue = []
+
+@contextmanager
+def ingest_stage(name: str):
+    """Time an ingestion stage, and mark it in the profile when the job is profiled."""
+    with INGEST_STAGE_SECONDS.time(stage=name), profile_stage(name):
+        yield
+
+@traced("ingest.repository")
+async def ingest_repo(
+    cloned_repo: pygit2.Repository, repo_url: str = None, priority: int = 1, profile: Optional[Profile] = None
+):
+    """Ingest a Git repository into the graph store with nodes, embeddings, and relationships.
+
+    Progress is checkpointed after every stage and file batch, so a restarted
+    ingestion of the same commit resumes where the previous run stopped
+    (persistent graph stores only).
+    Concurrency is governed by the process-wide FairScheduler, which admits the
+    job and shares Neo4j, embedding and LLM slots with other repositories.
+    """
     dep_lock = Lock()
-    file_semaphore = Semaphore(10)  # Limit concurrency for file processing
+    scheduler = get_scheduler()
+    store = get_graph_store()
 
     try:
         repo_path = cloned_repo.workdir
+        repo_name = os.path.basename(os.path.normpath(repo_path))
+        commit_oid = str(cloned_repo.head.target)
+        set_attributes({"repository": repo_name, "commit": commit_oid, "priority": priority})
 
-         # --- Parse repo structure using GitRepoParser ---
-        parser = GitRepoParser(repo_path)
-        nodes = parser.get_nodes()
+        async with scheduler.job(repo_name, priority):
+            with job_metrics(repo_name), profiled(profile):
+                # A non-persistent store may have lost what a checkpoint says
+                # was written, so those ingestions always start over
+                checkpoint = load_checkpoint(repo_name) if store.persistent else None
+                if checkpoint and checkpoint.commit_oid == commit_oid:
+                    logger.info(
+                        f"Resuming ingestion of '{repo_name}' at file {checkpoint.file_index}, "
+                        f"completed stages: {checkpoint.completed_stages}"
+                    )
+                else:
+                    checkpoint = IngestCheckpoint(repo_name=repo_name, repo_url=repo_url, commit_oid=commit_oid)
+                    save_checkpoint(checkpoint)
+                dependency_queue = checkpoint.dependency_queue
+
+                 # --- Parse repo structure using GitRepoParser ---
+                with ingest_stage("parse"):
+                    parser = GitRepoParser(repo_path)
+                    nodes = parser.get_nodes()
         
-        async with get_session() as session:
-            await create_repository_node(
-                session,
-                node = nodes["metadata"],
-                )
-            logger.info(f"Repository node created: {nodes["metadata"]}")
+                if not checkpoint.is_done("repository"):
+                    with ingest_stage("repository"):
+                        async with scheduler.slot("neo4j"), store.session() as session:
+                            await create_repository_node(
+                                session,
+                                node = nodes["metadata"],
+                                )
+                            logger.info(f"Repository node created: {nodes['metadata']['name']}")
+                        checkpoint.mark_done("repository")
+                        save_checkpoint(checkpoint)
         
         
-        # --- Folder ingestion (parallel, safe) ---
-        async def run_with_own_session_for_folder(node):
-            async with get_session() as session:
-                await create_folder_node(session, node)
-
-        folder_tasks = [
-            asyncio.create_task(run_with_own_session_for_folder(node))
-            for node in parser.nodes["folders"]
-        ]
-        await asyncio.gather(*folder_tasks)
-        logger.info(f"Created {len(folder_tasks)} folder nodes.")
+                # --- Folder ingestion (parallel, safe) ---
+                async def run_with_own_session_for_folder(node):
+                    async with scheduler.slot("neo4j"), store.session() as session:
+                        await create_folder_node(session, node)
+
+                if not checkpoint.is_done("folders"):
+                    with ingest_stage("folders"):
+                        folder_tasks = [
+                            asyncio.create_task(run_with_own_session_for_folder(node))
+                            for node in parser.nodes["folders"]
+                        ]
+                        await asyncio.gather(*folder_tasks)
+                        logger.info(f"Created {len(folder_tasks)} folder nodes.")
+                        checkpoint.mark_done("folders")
+                        save_checkpoint(checkpoint)
         
-        # # # --- Filter agent ---
-        # filter_result = await run_filter_agent(parser.nodes.metadata["tree"])
-        # updated_filter_result = {
-        #     f"{parser.nodes.metadata["name"]}/{key}": val
-        #     for key, val in filter_result.items()
-        #     if val is True
-        # }
-        updated_filter_result = {}
-        # # # --- File ingestion ---
-        file_tasks = [
-            asyncio.create_task(process_file_node(
-                file_semaphore,
-                node,
-                updated_filter_result,
-                dependency_queue,
-                dep_lock
-            ))
-            for node in parser.nodes["files"]
-        ]
-        await asyncio.gather(*file_tasks)
-
-        # # # --- Branch Ingestion ---
-        async def run_with_own_session_for_branch(node):
-            async with get_session() as session:
-                await create_branch_node(session, node)
-
-        branch_tasks = [
-            asyncio.create_task(run_with_own_session_for_branch(node))
-            for node in parser.nodes["branches"]
-        ]
-        await asyncio.gather(*branch_tasks)
-        logger.info(f"Created {len(branch_tasks)} branches nodes.")
-
-        # # # --- Commit Ingestion  
-        async def run_with_own_session_for_commit(node):
-            async with get_session() as session:
-                await create_commit_node(session, node)
-
-        commit_tasks = [
-            asyncio.create_task(run_with_own_session_for_commit(node))
-            for node in parser.nodes["commits"]
-        ]
-        await asyncio.gather(*commit_tasks)
-        logger.info(f"Created {len(commit_tasks)} commits nodes.")
-
-        # # # --- Final relationship setup ---
-        await create_containment_relationships_cypher()
-        await run_dependency_relationships_batch(dependency_queue)
-
-        logger.info(f"Created {len(dependency_queue)} dependency relationships.")
-        logger.info(f"Repository '{nodes["metadata"]}' ingestion complete.")
+                # # # --- Filter agent ---
+                # filter_result = await run_filter_agent(parser.nodes.metadata["tree"])
+                # updated_filter_result = {
+                #     f"{parser.nodes.metadata["name"]}/{key}": val
+                #     for key, val in filter_result.items()
+                #     if val is True
+                # }
+                updated_filter_result = {}
+                # # # --- File ingestion (checkpointed per batch) ---
+                files = parser.nodes["files"]
+                batch_size = max(1, config.INGEST_CHECKPOINT_BATCH)
+                while not checkpoint.is_done("files") and checkpoint.file_index < len(files):
+                    start = checkpoint.file_index
+                    batch = files[start:start + batch_size]
+                    file_tasks = [
+                        asyncio.create_task(process_file_node(
+                            node,
+                            updated_filter_result,
+                            dependency_queue,
+                            dep_lock
+                        ))
+                        for node in batch
+                    ]
+                    with ingest_stage("files_batch"):
+                        await asyncio.gather(*file_tasks)
+
+                    checkpoint.file_index = start + len(batch)
+                    save_checkpoint(checkpoint)
+                    logger.info(f"Checkpointed {checkpoint.file_index}/{len(files)} files.")
+
+                if not checkpoint.is_done("files"):
+                    checkpoint.mark_done("files")
+                    save_checkpoint(checkpoint)
+
+                # # # --- Branch Ingestion ---
+                async def run_with_own_session_for_branch(node):
+                    async with scheduler.slot("neo4j"), store.session() as session:
+                        await create_branch_node(session, node)
+
+                if not checkpoint.is_done("branches"):
+                    with ingest_stage("branches"):
+                        branch_tasks = [
+                            asyncio.create_task(run_with_own_session_for_branch(node))
+                            for node in parser.nodes["branches"]
+                        ]
+                        await asyncio.gather(*branch_tasks)
+                        logger.info(f"Created {len(branch_tasks)} branches nodes.")
+                        checkpoint.mark_done("branches")
+                        save_checkpoint(checkpoint)
+
+                # # # --- Commit Ingestion  
+                async def run_with_own_session_for_commit(node):
+                    async with scheduler.slot("neo4j"), store.session() as session:
+                        await create_commit_node(session, node)
+
+                if not checkpoint.is_done("commits"):
+                    with ingest_stage("commits"):
+                        commit_tasks = [
+                            asyncio.create_task(run_with_own_session_for_commit(node))
+                            for node in parser.nodes["commits"]
+                        ]
+                        await asyncio.gather(*commit_tasks)
+                        logger.info(f"Created {len(commit_tasks)} commits nodes.")
+                        checkpoint.mark_done("commits")
+                        save_checkpoint(checkpoint)
+
+                # # # --- Final relationship setup ---
+                if not checkpoint.is_done("relationships"):
+                    with ingest_stage("relationships"):
+                        await create_containment_relationships_cypher()
+                        await run_dependency_relationships_batch(dependency_queue)
+                        logger.info(f"Created {len(dependency_queue)} dependency relationships.")
+                        checkpoint.mark_done("relationships")
+                        save_checkpoint(checkpoint)
+
+                if config.ANALYTICS_ENABLED and not checkpoint.is_done("analytics"):
+                    with ingest_stage("analytics"):
+                        await compute_dependency_analytics(nodes["metadata"]["name"])
+                    checkpoint.mark_done("analytics")
+                    save_checkpoint(checkpoint)
+
+                # A new graph version tells query-side snapshots and caches to refresh
+                await store.update_nodes(config.REPO_LABEL, [{
+                    "name": nodes["metadata"]["name"],
+                    "graph_version": f"{commit_oid}:{int(time.time())}",
+                }], key="name")
+
+                if config.INGEST_MODE == "inline":
+                    invalidate_repository(nodes["metadata"]["name"])
+                    if config.GRAPH_SNAPSHOT_ENABLED:
+                        await sync_snapshots(force=True)
+
+                clear_checkpoint(repo_name)
+                logger.info(f"Repository '{nodes['metadata']['name']}' ingestion complete.")
+                INGEST_JOBS.inc(status="succeeded")
+                return True
 
     except Exception as e:
         logger.error(f"Repository ingestion failed: {e}", exc_info=True)
+        INGEST_JOBS.inc(status="failed")
+        return False
 
     finally:
-        await close_driver()
\ No newline at end of file
+        # Other admitted jobs may still be using the shared driver
+        if scheduler.active_jobs == 0:
+            await store.close()
+
+
+def prepare_repository_sync(repo_url: str):
+    """Return a local clone of repo_url and whether it resumes an interrupted ingestion.
+
+    A clone with a pending checkpoint is reused as-is; anything else is re-cloned.
+    """
+    from src.utils.helper import clone_repository_sync
+
+    repo_name = os.path.basename(repo_url.rstrip('/')).replace('.git', '')
+    destination = os.path.join(config.REPO_DIRS, repo_name)
+    os.makedirs(config.REPO_DIRS, exist_ok=True)
+
+    if load_checkpoint(repo_name) and os.path.exists(destination):
+        try:
+            return pygit2.Repository(destination), True
+        except Exception as e:
+            logger.warning(f"Existing clone of {repo_name} is unusable, re-cloning: {e}")
+
+    if os.path.exists(destination):
+        shutil.rmtree(destination)
+    return clone_repository_sync(repo_url, destination), False
+
+
+async def run_ingest_job(repo_url: str, priority: int = 1, profile: Optional[Profile] = None) -> bool:
+    """Clone (or reuse) a repository and ingest it; used by the standalone worker."""
+    cloned_repo, resumed = await asyncio.to_thread(prepare_repository_sync, repo_url)
+    logger.info(f"{'Resuming' if resumed else 'Starting'} ingestion of {repo_url}")
+    return await ingest_repo(cloned_repo, repo_url=repo_url, priority=priority, profile=profile)
+
+
+async def resume_pending_ingests():
+    """Resume every ingestion that left a checkpoint behind, one repository at a time."""
+    for checkpoint in list_checkpoints():
+        repo_path = os.path.join(config.REPO_DIRS, checkpoint.repo_name)
+        try:
+            cloned_repo = pygit2.Repository(repo_path)
+        except Exception as e:
+            logger.warning(f"Cannot resume ingestion of '{checkpoint.repo_name}': {e}")
+            continue
+
+        logger.info(f"Resuming interrupted ingestion of '{checkpoint.repo_name}'.")
+        await ingest_repo(cloned_repo, repo_url=checkpoint.repo_url)
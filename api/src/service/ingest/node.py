@@ -2,32 +2,23 @@ import logging
 from datetime import datetime
 from src.utils.helper import generate_stable_id
 from src.core.config import config
+from src.core.tracing import set_attributes, traced
 from src.service.ingest.embedding import add_embeddings
 
 logger = logging.getLogger(__name__)
 
+@traced("ingest.create_repository_node")
 async def create_repository_node(session, node, username="admin"):
-    """Create or merge a repository node in Neo4j."""
+    """Create or merge a repository node in the graph store."""
+    set_attributes({"repository": node["name"], "tree.bytes": len(node["tree"] or "")})
     node_id = generate_stable_id(f"{node["name"]}:{username}")
-    query = (f"""
-        MERGE (r:{config.REPO_LABEL} {{ node_id: $node_id }})
-        SET r.name = $name,
-            r.remote_url = $remote_url,
-            r.default_branch = $default_branch,
-            r.description = $description,
-            r.tree = $tree
-        RETURN r
-    """)
-    result = await session.run(
-        query,
-        node_id=node_id,
-        name=node["name"],
-        remote_url=node["remote_url"],
-        default_branch=node["default_branch"],
-        description=node["description"],
-        tree=node["tree"],
-    )
-    record = await result.single()
+    repository = await session.upsert_node(config.REPO_LABEL, node_id, {
+        "name": node["name"],
+        "remote_url": node["remote_url"],
+        "default_branch": node["default_branch"],
+        "description": node["description"],
+        "tree": node["tree"],
+    })
 
     embedding_content = f"""
         Repository: {node['name']}
@@ -42,56 +33,36 @@ async def create_repository_node(session, node, username="admin"):
         node_id=node_id,
         fields={"content": embedding_content},
     )
-    return record["r"]
+    return repository
 
+@traced("ingest.create_branch_node")
 async def create_branch_node(session, node):
     """Create or merge a branch node and connect it to its parent repository."""
     repo_name = node["repository"]
+    set_attributes({"repository": repo_name, "branch": node["name"], "commit_count": node["commit_count"]})
     node_id = generate_stable_id(f"{node['name']}:{repo_name}")
-    logger.info(f"Creating branch node: name={node['name']}...")
+    logger.debug(f"Creating branch node: name={node['name']}...")
 
     try:
         # Create branch node
-        query = f"""
-            MERGE (b:{config.BRANCH_LABEL} {{ node_id: $node_id }})
-            SET b.name = $name, 
-                b.remote_name = $remote_name,
-                b.is_head = $is_head,
-                b.is_default = $is_default,
-                b.is_remote_tracking = $is_remote_tracking,
-                b.upstream_name = $upstream_name,
-                b.remote_name = $remote_name,
-                b.latest_commit_id = $latest_commit_id,
-                b.commit_count = $commit_count,
-                b.repository = $repository,
-                b.tree = $tree
-            RETURN b
-        """
-        result = await session.run(
-            query, 
-            node_id=node_id,
-            name=node["name"], 
-            is_head=node["is_head"],
-            is_default=node["is_default"],
-            is_remote_tracking=node["is_remote_tracking"],
-            upstream_name=node["upstream_name"],
-            remote_name=node["remote_name"],
-            latest_commit_id=node["latest_commit_id"],
-            commit_count=node["commit_count"],
-            repository=repo_name,
-            tree = node["tree"]
-        )
-        record = await result.single()
+        branch = await session.upsert_node(config.BRANCH_LABEL, node_id, {
+            "name": node["name"],
+            "is_head": node["is_head"],
+            "is_default": node["is_default"],
+            "is_remote_tracking": node["is_remote_tracking"],
+            "upstream_name": node["upstream_name"],
+            "remote_name": node["remote_name"],
+            "latest_commit_id": node["latest_commit_id"],
+            "commit_count": node["commit_count"],
+            "repository": repo_name,
+            "tree": node["tree"],
+        })
 
         # Create relationship to repository
-        await session.run(
-            f"""
-            MATCH (b:{config.BRANCH_LABEL} {{ node_id: $node_id }})
-            MATCH (r:{config.REPO_LABEL} {{ name: $repository }})
-            MERGE (r)-[:HAS_BRANCH]->(b)
-            """,
-            node_id=node_id,
-            repository=repo_name
+        await session.upsert_edges(
+            "HAS_BRANCH", config.REPO_LABEL, config.BRANCH_LABEL,
+            [(repo_name, node_id, None)],
+            source_key="name",
         )
 
         if node.get("file_diff"):
@@ -117,14 +88,15 @@ async def create_branch_node(session, node):
             fields={"content": content}
         )
 
-        logger.info(f"Branch node created and linked to repository: {record['b']}")
-        return record["b"]
+        logger.info(f"Branch node created and linked to repository: {node['name']} ({node_id})", extra={"entity": "branch"})
+        return branch
 
     except Exception as e:
         logger.error(f"Error creating branch node {node['name']}: {e}", exc_info=True)
         return None
 
 
+@traced("ingest.create_commit_node")
 async def create_commit_node(session, node):
     """
     Create or merge a commit node, and relate it to:
@@ -135,74 +107,46 @@ async def create_commit_node(session, node):
     commit_id = node["id"]
     repo_name = node["repository"]
     branch_names = node.get("branches", [])
+    set_attributes({
+        "repository": repo_name,
+        "commit": commit_id,
+        "branches": len(branch_names),
+        "files.touched": len(node.get("touched_files", [])),
+        "diff.bytes": sum(len(f["diff"]) for f in node.get("touched_files", [])),
+    })
 
-    logger.info(f"Creating commit node: {commit_id}...")
+    logger.debug(f"Creating commit node: {commit_id}...")
 
     try:
         # Create the commit node
-        result = await session.run(
-            f"""
-            MERGE (c:{config.COMMIT_LABEL} {{ node_id: $node_id }})
-            SET c.name = $name,
-                c.message = $message,
-                c.author = $author,
-                c.email = $email,
-                c.timestamp = $timestamp,
-                c.repository = $repository,
-                c.branches = $branches
-            RETURN c
-            """,
-            node_id=commit_id,
-            name= node["name"],
-            message=node["message"],
-            author=node["author"],
-            email=node["email"],
-            timestamp=node["timestamp"],
-            repository=repo_name,
-            branches=branch_names
-        )
-        record = await result.single()
-
-        # Relate commit → branch
+        commit = await session.upsert_node(config.COMMIT_LABEL, commit_id, {
+            "name": node["name"],
+            "message": node["message"],
+            "author": node["author"],
+            "email": node["email"],
+            "timestamp": node["timestamp"],
+            "repository": repo_name,
+            "branches": branch_names,
+        })
+
+        # Relate branch → commit (branch ids are derived from name and repository)
+        branch_rows = []
         for branch_name in branch_names:
-            await session.run(
-                f"""
-                MATCH (c:{config.COMMIT_LABEL} {{ node_id: $commit_id }})
-                MATCH (b:{config.BRANCH_LABEL} {{ name: $branch_name, repository: $repository }})
-                MERGE (b)-[:CONTAINS_COMMIT]->(c)
-                """,
-                commit_id=commit_id,
-                branch_name=branch_name,
-                repository=repo_name
-            )
-
-
-        # Relate commit → files
-        for f in node.get("touched_files", []):
-            await session.run(
-                f"""
-                MATCH (c:{config.COMMIT_LABEL} {{ node_id: $commit_id }})
-                MATCH (f:{config.FILE_LABEL} {{ path: $file_path, repository: $repository }})
-                MERGE (c)-[r:MODIFIED_FILE]->(f)
-                SET r.diff = $diff
-                """,
-                commit_id=commit_id,
-                file_path=f["file_path"],
-                repository=repo_name,
-                diff=f["diff"]
-            )
+            branch_rows.append((generate_stable_id(f"{branch_name}:{repo_name}"), commit_id, None))
+        await session.upsert_edges("CONTAINS_COMMIT", config.BRANCH_LABEL, config.COMMIT_LABEL, branch_rows)
+
+        # Relate commit → files (touched paths are prefixed with the repository name)
+        await session.upsert_edges(
+            "MODIFIED_FILE", config.COMMIT_LABEL, config.FILE_LABEL,
+            [(commit_id, f["file_path"], {"diff": f["diff"]}) for f in node.get("touched_files", [])],
+            target_key="path",
+        )
 
         # Relate commit → parents
-        for parent_id in node.get("parents", []):
-            await session.run(
-                f"""
-                MATCH (c1:{config.COMMIT_LABEL} {{ node_id: $commit_id }})
-                MATCH (c2:{config.COMMIT_LABEL} {{ node_id: $parent_id }})
-                MERGE (c1)-[:PARENT]->(c2)
-                """,
-                commit_id=commit_id,
-                parent_id=parent_id
-            )
+        await session.upsert_edges(
+            "PARENT", config.COMMIT_LABEL, config.COMMIT_LABEL,
+            [(commit_id, parent_id, None) for parent_id in node.get("parents", [])],
+        )
 
         # Embedding content
         content = f"""\
@@ -219,39 +163,28 @@ async def create_commit_node(session, node):
             fields={"content": content}
         )
 
-        logger.info(f"Commit node created and linked: {record['c']}")
-        return record["c"]
+        logger.info(f"Commit node created and linked: {commit_id}", extra={"entity": "commit"})
+        return commit
 
     except Exception as e:
         logger.error(f"Error creating commit node {commit_id}: {e}", exc_info=True)
         return None
     
+@traced("ingest.create_folder_node")
 async def create_folder_node(session, node):
     """Create or merge a folder node and connect it to its parent node (repository or folder)."""
+    set_attributes({"path": node["path"], "tree.bytes": len(node["tree"] or "")})
     node_id = generate_stable_id(f"{node["path"]}:{node["name"]}")
-    logger.info(f"Creating folder node: name={node["name"]}, path={node["path"]}, parent_path={node["parent_path"]}, node_id={node_id}")    
+    logger.debug(f"Creating folder node: path={node["path"]}, parent_path={node["parent_path"]}, node_id={node_id}")
 
     try:
-        query = f"""
-            MERGE (f:{config.FOLDER_LABEL} {{ node_id: $node_id }})
-            SET f.name = $name, 
-                f.path = $path , 
-                f.parent_path = $parent_path, 
-                f.tree = $tree,
-                f.repository = $repository
-            RETURN f
-        """
-        result = await session.run(
-            query, 
-            node_id=node_id,
-            name=node["name"], 
-            path=node["path"], 
-            parent_path=node["parent_path"],
-            tree=node["tree"],
-            repository=node["repository"] 
-
-        )
-        record = await result.single()
+        folder = await session.upsert_node(config.FOLDER_LABEL, node_id, {
+            "name": node["name"],
+            "path": node["path"],
+            "parent_path": node["parent_path"],
+            "tree": node["tree"],
+            "repository": node["repository"],
+        })
 
         await add_embeddings(
             session=session,
@@ -262,42 +195,31 @@ async def create_folder_node(session, node):
                 "content": node["tree"],
             }
         )
-        logger.info(f"Folder node created or merged: {record['f']}")
-        return record["f"]
+        logger.info(f"Folder node created or merged: {node["path"]} ({node_id})", extra={"entity": "folder"})
+        return folder
 
     except Exception as e:
         logger.error(f"Error creating folder node {node["path"]}: {e}", exc_info=True)
         return None
 
+@traced("ingest.create_file_node")
 async def create_file_node(session,node, file_content=None):
     """Create or merge a file node and connect it to its parent node (repository or folder)."""
-    logger.info(f"Running query to create file node with name: {node["name"]}.")
+    set_attributes({"path": node["path"], "content.bytes": len(file_content or "")})
+    logger.debug(f"Running query to create file node with name: {node["name"]}.")
     node_id = generate_stable_id(f"{node["path"]}:{node["name"]}")
     # Set file content only if provided
     file_content = file_content.strip() if file_content and file_content.strip() else "File is empty"
 
-    query = (f"""
-        MERGE (f:{config.FILE_LABEL} {{ node_id: $node_id }})
-        SET f.name = $name,
-            f.content = $file_content,
-            f.parent_path = $parent_path,
-            f.path = $path,
-            f.extension = $extension,
-            f.repository = $repository
-        RETURN f
-        """)
-    result = await session.run(
-        query, 
-        node_id=node_id,
-        name=node["name"], 
-        path=node["path"],
-        extension=node["extension"],
-        repository=node["repository"], 
-        parent_path=node["parent_path"], 
-        file_content=file_content
-    )
-    record = await result.single()
-    logger.info(f"File node created or merged: {record['f']}")
+    file = await session.upsert_node(config.FILE_LABEL, node_id, {
+        "name": node["name"],
+        "content": file_content,
+        "parent_path": node["parent_path"],
+        "path": node["path"],
+        "extension": node["extension"],
+        "repository": node["repository"],
+    })
+    logger.info(f"File node created or merged: {node["path"]} ({node_id})", extra={"entity": "file"})
     await add_embeddings(
         session=session,
         node_label=config.FILE_LABEL,
@@ -307,27 +229,20 @@ async def create_file_node(session,node, file_content=None):
             "content": file_content
         }
     )
-    return record["f"]
+    return file
 
+@traced("ingest.create_script_node")
 async def create_script_node(session, name, description, content, file_path):
+    set_attributes({"path": file_path, "name": name, "content.bytes": len(content or "")})
     try:
         node_id = generate_stable_id(f"{file_path}:{name}")
-        logger.info(f"Creating/Updating script node: {name}")
-        query_script = f"""
-        MERGE (script:{config.SCRIPT_LABEL} {{ node_id: $node_id }})
-        SET script.name= $name, 
-            script.description = $description, 
-            script.content = $content, 
-            script.file_path = $file_path
-        RETURN script
-        """
-        result_script = await session.run(query_script, 
-                                          node_id=node_id,
-                                          name=name, 
-                                          description=description, 
-                                          content=content,
-                                          file_path=file_path)
-        result = await result_script.single()
+        logger.debug(f"Creating/Updating script node: {name}")
+        result = await session.upsert_node(config.SCRIPT_LABEL, node_id, {
+            "name": name,
+            "description": description,
+            "content": content,
+            "file_path": file_path,
+        })
         await add_embeddings(
             session=session, 
             node_label=config.SCRIPT_LABEL,
@@ -338,31 +253,24 @@ async def create_script_node(session, name, description, content, file_path):
                 "content": content
             }
         )    
-        logger.info(f"Script node created or updated: {result['script']}")
-        return result["script"]
+        logger.info(f"Script node created or updated: {file_path}:{name} ({node_id})", extra={"entity": "script"})
+        return result
     except Exception as e:
         logger.error(f"Error creating/updating script node: {e}")
         raise
 
+@traced("ingest.create_class_node")
 async def create_class_node(session, name, description, content, file_path):
+    set_attributes({"path": file_path, "name": name, "content.bytes": len(content or "")})
     try:
-        logger.info(f"Creating/Updating class node: {name}")
+        logger.debug(f"Creating/Updating class node: {name}")
         node_id = generate_stable_id(f"{file_path}:{name}")
-        query_class = f"""
-        MERGE (class:{config.CLASS_LABEL} {{ node_id: $node_id }})
-        SET class.name = $name,
-            class.description = $description, 
-            class.content = $content,
-            class.file_path = $file_path
-        RETURN class
-       """
-        result_class = await session.run(query_class,
-                                         node_id=node_id,
-                                         name=name,
-                                         description=description,
-                                         content=content,
-                                         file_path=file_path)
-        result = await result_class.single()
+        result = await session.upsert_node(config.CLASS_LABEL, node_id, {
+            "name": name,
+            "description": description,
+            "content": content,
+            "file_path": file_path,
+        })
         await add_embeddings(
             session=session,
             node_label=config.CLASS_LABEL,
@@ -373,32 +281,25 @@ async def create_class_node(session, name, description, content, file_path):
                 "content": content
             }
         )
-        logger.info(f"Class node created or updated: {result['class']}")
-        return result["class"]
+        logger.info(f"Class node created or updated: {file_path}:{name} ({node_id})", extra={"entity": "class"})
+        return result
     except Exception as e:
         logger.error(f"Error creating/updating class node: {e}")
         raise
 
 # Function to create or merge the Method node and connect it to the Class or File node
+@traced("ingest.create_method_node")
 async def create_method_node(session, name, description, content, file_path):
+    set_attributes({"path": file_path, "name": name, "content.bytes": len(content or "")})
     try:
-        logger.info(f"Creating/Updating method node: {name}")
+        logger.debug(f"Creating/Updating method node: {name}")
         node_id = generate_stable_id(f"{file_path}:{name}")
-        query_method = f"""
-        MERGE (method:{config.METHOD_LABEL} {{ node_id: $node_id }})
-        SET method.name = $name,
-            method.description = $description,
-            method.content = $content,
-            method.file_path = $file_path
-        RETURN method
-       """
-        result_method = await session.run(query_method,
-                                          node_id=node_id,
-                                          name=name,
-                                          description=description,
-                                          content=content,
-                                          file_path=file_path)
-        method_node = await result_method.single()
+        method_node = await session.upsert_node(config.METHOD_LABEL, node_id, {
+            "name": name,
+            "description": description,
+            "content": content,
+            "file_path": file_path,
+        })
         await add_embeddings(
             session=session,
             node_label=config.METHOD_LABEL,
@@ -409,8 +310,8 @@ async def create_method_node(session, name, description, content, file_path):
                 "content": content
             }
         )
-        logger.info(f"Method node created or updated: {method_node['method']}")
-        return method_node["method"]
+        logger.info(f"Method node created or updated: {file_path}:{name} ({node_id})", extra={"entity": "method"})
+        return method_node
     except Exception as e:
         logger.error(f"Error creating/updating method node: {e}")
         raise
\ No newline at end of file
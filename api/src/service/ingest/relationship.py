@@ -1,8 +1,9 @@
 import os 
 import logging 
 from asyncio import Lock
-from src.core.db import get_session
 from src.core.config import config
+from src.core.graph.store import get_graph_store
+from src.core.tracing import set_attributes, traced
 from src.utils.helper import generate_stable_id
 
 
@@ -21,121 +22,64 @@ async def queue_dependency_relationships_safe(state: dict, repo_name: str, dep_q
         dep_queue.extend(deps)
         logger.info(f"Queued {len(deps)} dependency relationships for processing.")
 
+# (source label, source key, relationship, target label, target key): target.key = source.key
+CONTAINMENT_LINKS = [
+    # Repository → root-level folders and files
+    (config.REPO_LABEL, "name", "CONTAINS", config.FOLDER_LABEL, "parent_path"),
+    (config.REPO_LABEL, "name", "CONTAINS", config.FILE_LABEL, "parent_path"),
+    # Folder → subfolders and files
+    (config.FOLDER_LABEL, "path", "CONTAINS", config.FOLDER_LABEL, "parent_path"),
+    (config.FOLDER_LABEL, "path", "CONTAINS", config.FILE_LABEL, "parent_path"),
+    # File → Script/Class/Method nodes
+    (config.FILE_LABEL, "path", "HAS_SCRIPT", config.SCRIPT_LABEL, "file_path"),
+    (config.FILE_LABEL, "path", "Has_CLASS", config.CLASS_LABEL, "file_path"),
+    (config.FILE_LABEL, "path", "Has_METHOD", config.METHOD_LABEL, "file_path"),
+]
+
+@traced("ingest.containment_relationships")
 async def create_containment_relationships_cypher():
     try:
-        async with  get_session() as session:
-            logger.info("Creating CONTAINS relationships in Neo4j...")
-
-            # Connect Repository → Folder (for root-level folders)
-            await session.run("""
-                MATCH (repo:Repository), (folder:Folder)
-                WHERE folder.parent_path = repo.name
-                MERGE (repo)-[:CONTAINS]->(folder)
-            """)
-            # Connect Repository → File (for root-level folders)
-            await session.run("""
-                MATCH (repo:Repository), (file:File)
-                WHERE file.parent_path = repo.name
-                MERGE (repo)-[:CONTAINS]->(file)
-            """)
-
-            # Connect Folder → Folder (subfolders)
-            await session.run("""
-                MATCH (parent:Folder), (child:Folder)
-                WHERE child.parent_path = parent.path
-                MERGE (parent)-[:CONTAINS]->(child)
-            """)
-
-            # Connect Folder → File
-            await session.run("""
-                MATCH (folder:Folder), (file:File)
-                WHERE file.parent_path = folder.path
-                MERGE (folder)-[:CONTAINS]->(file)
-            """)
-
-            # Optionally: Connect File → Script/Class/Method nodes
-            await session.run("""
-                MATCH (file:File), (script:Script)
-                WHERE script.file_path = file.path
-                MERGE (file)-[:HAS_SCRIPT]->(script)
-            """)
-
-            await session.run("""
-                MATCH (file:File), (cls:Class)
-                WHERE cls.file_path = file.path
-                MERGE (file)-[:Has_CLASS]->(cls)
-            """)
-
-            await session.run("""
-                MATCH (file:File), (method:Method)
-                WHERE method.file_path = file.path
-                MERGE (file)-[:Has_METHOD]->(method)
-            """)
-
+        async with get_graph_store().session() as session:
+            logger.info("Creating CONTAINS relationships in the graph store...")
+            for source_label, source_key, rel_type, target_label, target_key in CONTAINMENT_LINKS:
+                await session.link_matching(rel_type, source_label, source_key, target_label, target_key)
             logger.info("All CONTAINS relationships created.")
     except Exception as e:
-        logger.error(f"Error creating relationships via Cypher: {e}")
+        logger.error(f"Error creating containment relationships: {e}")
 
 
+@traced("ingest.dependency_relationships")
 async def run_dependency_relationships_batch(dep_queue: list):
-    """Run Cypher to create all queued RELATED_TO file relationships."""
+    """Create all queued RELATED_TO file relationships in one batch."""
+    set_attributes(batch_size=len(dep_queue))
     try:
-        async with get_session() as session:
-            for source, target, description in dep_queue:
-                await session.run("""
-                    MATCH (source:File {path: $source_path})
-                    MATCH (target:File {path: $target_path})
-                    MERGE (source)-[r:RELATED_TO]->(target)
-                    SET r.description = $description
-                """, {
-                    "source_path": source,
-                    "target_path": target,
-                    "description": description,
-                })
-
-            logger.info(f"Created {len(dep_queue)} RELATED_TO relationships.")
+        await get_graph_store().upsert_edges(
+            "RELATED_TO", config.FILE_LABEL, config.FILE_LABEL,
+            [(source, target, {"description": description}) for source, target, description in dep_queue],
+            source_key="path", target_key="path",
+        )
+        logger.info(f"Created {len(dep_queue)} RELATED_TO relationships.")
     except Exception as e:
         logger.error(f"Error creating dependency relationships: {e}")
 
 
+@traced("ingest.file_diff_relationships")
 async def create_file_diff_relationships(session, branch_node, file_diff):
     """
     For a given branch, create ADDED_FILE, REMOVED_FILE, and MODIFIED_FILE relationships
     to the affected file nodes.
     """
+    set_attributes({
+        "branch": branch_node["name"],
+        "files.added": len(file_diff.get("added", [])),
+        "files.removed": len(file_diff.get("removed", [])),
+        "files.modified": len(file_diff.get("modified", [])),
+    })
     branch_id = generate_stable_id(f"{branch_node['name']}:{branch_node['repository']}")
-    
-    for path in file_diff.get("added", []):
-        await session.run(
-            f"""
-            MATCH (b:{config.BRANCH_LABEL} {{ node_id: $branch_id }})
-            MATCH (f:{config.FILE_LABEL} {{ path: $path }})
-            MERGE (b)-[:ADDED_FILE]->(f)
-            """,
-            branch_id=branch_id,
-            path=path
-        )
 
-    for path in file_diff.get("removed", []):
-        await session.run(
-            f"""
-            MATCH (b:{config.BRANCH_LABEL} {{ node_id: $branch_id }})
-            MATCH (f:{config.FILE_LABEL} {{ path: $path }})
-            MERGE (b)-[:REMOVED_FILE]->(f)
-            """,
-            branch_id=branch_id,
-            path=path
-        )
-
-    for item in file_diff.get("modified", []):
-        await session.run(
-            f"""
-            MATCH (b:{config.BRANCH_LABEL} {{ node_id: $branch_id }})
-            MATCH (f:{config.FILE_LABEL} {{ path: $path }})
-            MERGE (b)-[r:MODIFIED_FILE]->(f)
-            SET r.diff = $diff
-            """,
-            branch_id=branch_id,
-            path=item["file_path"],
-            diff=item["diff"]
-        )
+    for rel_type, rows in (
+        ("ADDED_FILE", [(branch_id, path, None) for path in file_diff.get("added", [])]),
+        ("REMOVED_FILE", [(branch_id, path, None) for path in file_diff.get("removed", [])]),
+        ("MODIFIED_FILE", [(branch_id, item["file_path"], {"diff": item["diff"]}) for item in file_diff.get("modified", [])]),
+    ):
+        await session.upsert_edges(rel_type, config.BRANCH_LABEL, config.FILE_LABEL, rows, target_key="path")
@@ -0,0 +1,401 @@
+import os
+import json
+import time
+import socket
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from multiprocessing.managers import BaseManager
+from typing import Dict, Optional
+from src.core.config import config
+from src.utils.helper import pid_alive
+
+logger = logging.getLogger(__name__)
+
+# Set by FairScheduler.job() and inherited by every task the job spawns, so
+# deep helpers like add_embeddings know which repository they work for.
+current_repo: ContextVar[Optional[str]] = ContextVar("current_repo", default=None)
+current_priority: ContextVar[int] = ContextVar("current_priority", default=1)
+
+# How often a process waiting on the shared budget retries
+SHARED_POLL_INTERVAL = 0.05
+
+
+class ResourcePool:
+    """A fixed number of slots shared fairly between repositories.
+
+    When a slot frees up it goes to the waiting repository holding the fewest
+    slots relative to its priority, so a repository with thousands of queued
+    files cannot starve a small one that arrived later.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.in_use = 0
+        self.held: Dict[str, int] = defaultdict(int)
+        self.waiters: Dict[str, deque] = defaultdict(deque)
+        self.priorities: Dict[str, int] = {}
+
+    def _pick_repo(self) -> Optional[str]:
+        candidates = [repo for repo, queue in self.waiters.items() if queue]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda repo: self.held[repo] / max(1, self.priorities.get(repo, 1)))
+
+    def _grant(self, repo: str):
+        self.in_use += 1
+        self.held[repo] += 1
+
+    def _dispatch(self):
+        while self.in_use < self.capacity:
+            repo = self._pick_repo()
+            if repo is None:
+                return
+            future = self.waiters[repo].popleft()
+            if not self.waiters[repo]:
+                del self.waiters[repo]
+            if future.done():  # Waiter was cancelled
+                continue
+            self._grant(repo)
+            future.set_result(None)
+
+    async def acquire(self, repo: str, priority: int):
+        self.priorities[repo] = priority
+        if self.in_use < self.capacity and not any(self.waiters.values()):
+            self._grant(repo)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[repo].append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(repo)  # Granted right before cancellation
+            raise
+
+    def release(self, repo: str):
+        self.in_use -= 1
+        self.held[repo] -= 1
+        if self.held[repo] <= 0:
+            del self.held[repo]
+            if repo not in self.waiters:
+                self.priorities.pop(repo, None)
+        self._dispatch()
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "waiting": sum(len(q) for q in self.waiters.values()),
+            "held_by_repo": dict(self.held),
+        }
+
+
+class SlotBudget:
+    """Slot capacities shared by the processes of the ingestion worker.
+
+    Lives in the worker's BudgetManager process and is called through a
+    proxy, one round trip per call. Slots are shared fairly by repository,
+    like ResourcePool does inside one process: a repository alone may take
+    every idle slot, but while other repositories wait it gets no more than
+    its priority-weighted share of the capacity. Slots held by a process that
+    died are reclaimed on the next acquire.
+    """
+
+    def __init__(self, capacities: Dict[str, int]):
+        self.capacities = {name: max(1, capacity) for name, capacity in capacities.items()}
+        self.lock = threading.Lock()
+        # (resource, repo, pid) -> slots held / acquires waiting
+        self.held: Dict[tuple, int] = defaultdict(int)
+        self.waiting: Dict[tuple, int] = defaultdict(int)
+        self.priorities: Dict[str, int] = {}
+
+    def _reap(self, resource: str):
+        for table in (self.held, self.waiting):
+            for key in [key for key in table if key[0] == resource and not pid_alive(key[2])]:
+                count = table.pop(key)
+                if table is self.held:
+                    logger.warning(f"Reclaiming {count} '{resource}' slots of dead worker process {key[2]}")
+        active = {key[1] for key in self.held} | {key[1] for key in self.waiting}
+        for repo in set(self.priorities) - active:
+            del self.priorities[repo]
+
+    def _by_repo(self, table: Dict[tuple, int], resource: str) -> Dict[str, int]:
+        counts: Dict[str, int] = defaultdict(int)
+        for (name, repo, _), count in table.items():
+            if name == resource and count > 0:
+                counts[repo] += count
+        return counts
+
+    def _fair_share(self, resource: str, repo: str, held: Dict[str, int], waiting: Dict[str, int]) -> int:
+        active = set(held) | set(waiting) | {repo}
+        weights = sum(max(1, self.priorities.get(name, 1)) for name in active)
+        return max(1, self.capacities[resource] * max(1, self.priorities.get(repo, 1)) // weights)
+
+    def try_acquire(self, resource: str, repo: str, pid: int, priority: int, waiting: bool) -> bool:
+        """
+        Take a slot if the capacity and the repository's fair share allow it.
+        A failed first attempt (`waiting` False) registers the caller as
+        waiting until it is granted or calls cancel_wait.
+        """
+        key = (resource, repo, pid)
+        with self.lock:
+            self.priorities[repo] = priority
+            self._reap(resource)
+            held = self._by_repo(self.held, resource)
+            waiters = self._by_repo(self.waiting, resource)
+            others_waiting = any(count > 0 for name, count in waiters.items() if name != repo)
+            granted = sum(held.values()) < self.capacities[resource] and not (
+                others_waiting and held.get(repo, 0) >= self._fair_share(resource, repo, held, waiters)
+            )
+            if granted:
+                self.held[key] += 1
+                if waiting:
+                    self._forget_wait(key)
+            elif not waiting:
+                self.waiting[key] += 1
+            return granted
+
+    def _forget_wait(self, key: tuple):
+        self.waiting[key] -= 1
+        if self.waiting[key] <= 0:
+            del self.waiting[key]
+
+    def cancel_wait(self, resource: str, repo: str, pid: int):
+        with self.lock:
+            if self.waiting.get((resource, repo, pid)):
+                self._forget_wait((resource, repo, pid))
+
+    def release(self, resource: str, repo: str, pid: int):
+        key = (resource, repo, pid)
+        with self.lock:
+            self.held[key] -= 1
+            if self.held[key] <= 0:
+                del self.held[key]
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                name: {
+                    "capacity": capacity,
+                    "in_use": sum(self._by_repo(self.held, name).values()),
+                    "held_by_repo": dict(self._by_repo(self.held, name)),
+                    "waiting_by_repo": dict(self._by_repo(self.waiting, name)),
+                }
+                for name, capacity in self.capacities.items()
+            }
+
+
+class BudgetManager(BaseManager):
+    """Manager process of the worker that serves the SlotBudget to the pool processes."""
+
+
+BudgetManager.register("SlotBudget", SlotBudget)
+
+
+class SharedBudget:
+    """
+    Handle on the worker's SlotBudget for one pool process. The proxy calls
+    are blocking IPC, so they run in a thread instead of on the event loop.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+
+    @classmethod
+    def create(cls, manager: BudgetManager, capacities: Dict[str, int]) -> "SharedBudget":
+        """A budget living in `manager`; it pickles, so it can be passed to the pool processes."""
+        return cls(manager.SlotBudget(capacities))
+
+    async def acquire(self, resource: str, repo: str, priority: int):
+        pid = os.getpid()
+        waiting = False
+        while True:
+            # Shielded so a cancellation never loses a slot granted meanwhile
+            call = asyncio.ensure_future(
+                asyncio.to_thread(self.budget.try_acquire, resource, repo, pid, priority, waiting)
+            )
+            try:
+                granted = await asyncio.shield(call)
+            except asyncio.CancelledError:
+                if await call:
+                    await asyncio.to_thread(self.budget.release, resource, repo, pid)
+                else:
+                    await asyncio.to_thread(self.budget.cancel_wait, resource, repo, pid)
+                raise
+            if granted:
+                return
+            waiting = True
+            try:
+                await asyncio.sleep(SHARED_POLL_INTERVAL)
+            except asyncio.CancelledError:
+                await asyncio.to_thread(self.budget.cancel_wait, resource, repo, pid)
+                raise
+
+    async def release(self, resource: str, repo: str):
+        await asyncio.to_thread(self.budget.release, resource, repo, os.getpid())
+
+    def stats(self) -> dict:
+        return self.budget.stats()
+
+
+class FairScheduler:
+    """Admits ingestion jobs and shares Neo4j, embedding and LLM slots across them.
+
+    With a SharedBudget, a slot also needs one of the budget's slots, which
+    bounds the whole worker pool instead of this process alone.
+    """
+
+    def __init__(self, max_jobs: int, limits: Dict[str, int], shared: Optional[SharedBudget] = None):
+        self.max_jobs = max(1, max_jobs)
+        self.active_jobs = 0
+        self.pools = {name: ResourcePool(name, capacity) for name, capacity in limits.items()}
+        self.shared = shared
+        self._job_waiters = []
+        self._sequence = itertools.count()
+
+    def _admit_next(self):
+        while self._job_waiters and self.active_jobs < self.max_jobs:
+            _, _, repo, future = heapq.heappop(self._job_waiters)
+            if future.done():
+                continue
+            self.active_jobs += 1
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def job(self, repo: str, priority: int = 1):
+        """Hold one of the job admission slots for the duration of an ingestion.
+
+        Higher priority jobs are admitted first; equal priorities are FIFO.
+        """
+        if self.active_jobs < self.max_jobs and not self._job_waiters:
+            self.active_jobs += 1
+        else:
+            logger.info(f"Ingestion of '{repo}' waiting for admission ({self.active_jobs} jobs running).")
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._job_waiters, (-priority, next(self._sequence), repo, future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self.active_jobs -= 1
+                    self._admit_next()
+                raise
+
+        repo_token = current_repo.set(repo)
+        priority_token = current_priority.set(priority)
+        try:
+            yield
+        finally:
+            current_repo.reset(repo_token)
+            current_priority.reset(priority_token)
+            self.active_jobs -= 1
+            self._admit_next()
+
+    @asynccontextmanager
+    async def slot(self, resource: str):
+        """Hold one slot of a shared resource ("neo4j", "embedding" or "llm") for the current repository."""
+        pool = self.pools[resource]
+        repo = current_repo.get() or "_default"
+        priority = current_priority.get()
+        await pool.acquire(repo, priority)
+        try:
+            if self.shared is None:
+                yield
+                return
+            await self.shared.acquire(resource, repo, priority)
+            try:
+                yield
+            finally:
+                await self.shared.release(resource, repo)
+        finally:
+            pool.release(repo)
+
+    def stats(self) -> dict:
+        stats = {
+            "active_jobs": self.active_jobs,
+            "waiting_jobs": len(self._job_waiters),
+            "pools": {name: pool.stats() for name, pool in self.pools.items()},
+        }
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
+
+
+_scheduler: Optional[FairScheduler] = None
+
+
+def slot_limits() -> Dict[str, int]:
+    return {
+        "neo4j": config.SCHED_NEO4J_SLOTS,
+        "embedding": config.SCHED_EMBEDDING_SLOTS,
+        "llm": config.SCHED_LLM_SLOTS,
+    }
+
+
+def configure_scheduler(share: int = 1, shared: Optional[SharedBudget] = None) -> FairScheduler:
+    """(Re)create the process-wide scheduler.
+
+    With several worker processes each one admits ``1/share`` of the
+    configured jobs, and slots are also bounded by the `shared` budget of the
+    worker pool, which splits them fairly between the repositories of all
+    processes.
+    """
+    global _scheduler
+    share = max(1, share)
+    _scheduler = FairScheduler(
+        max_jobs=max(1, config.SCHED_MAX_JOBS // share),
+        limits=slot_limits(),
+        shared=shared,
+    )
+    return _scheduler
+
+
+def get_scheduler() -> FairScheduler:
+    if _scheduler is None:
+        return configure_scheduler()
+    return _scheduler
+
+
+# ---------------------------------#
+#   Worker status                  #
+# ---------------------------------#
+
+# The API process does not run ingestion in worker mode; the worker writes
+# its scheduler status next to the job spool for the API to report.
+
+def _workers_dir() -> str:
+    return os.path.join(config.REPO_DIRS, ".jobs", "workers")
+
+
+def save_worker_stats(stats: dict):
+    os.makedirs(_workers_dir(), exist_ok=True)
+    path = os.path.join(_workers_dir(), f"{socket.gethostname()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({**stats, "updated_at": time.time()}, f)
+    os.replace(tmp_path, path)
+
+
+def load_worker_stats() -> Dict[str, dict]:
+    """Last status written by each worker host, keyed by host name."""
+    directory = _workers_dir()
+    if not os.path.isdir(directory):
+        return {}
+    workers = {}
+    for entry in sorted(os.listdir(directory)):
+        if not entry.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, entry)) as f:
+                workers[entry[:-len(".json")]] = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+    return workers
@@ -1,11 +1,11 @@
 import os
 import logging
 import asyncio
-import shutil
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, Header, HTTPException, status, BackgroundTasks
+from typing import List, Optional
 from src.core.config import config
-from src.core.db import get_session
+from src.core.db import pool_stats
+from src.core.graph.store import get_graph_store
 
 
 router = APIRouter()
@@ -14,43 +14,85 @@ logger = logging.getLogger(__name__)
 @router.get("/", response_model=List[str])
 async def get_repos():
     """
-    Endpoint to get all repositories in the Neo4j database.
-    """
-    cypher = """
-    MATCH (r:Repository)
-    RETURN r.name AS name
-    ORDER BY name
+    Endpoint to get all repositories in the graph store.
     """
     try:
-        async with get_session() as neo_session:
-            result = await neo_session.run(cypher)
-            repos = [record["name"] async for record in result]
-        return repos
+        repositories = await get_graph_store().find_nodes(config.REPO_LABEL, fields=["name"])
+        return sorted(repository["name"] for repository in repositories if repository.get("name"))
     except Exception as e:
         logger.error(f"Error fetching repositories: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch repositories from database.")
 
+def _profile_spec(mode: Optional[str], repo_url: str, admin_token: Optional[str]) -> Optional[dict]:
+    """Validate an opt-in profile request and name its artifacts."""
+    if not mode:
+        return None
+    from src.core.profiling import MODES, new_profile_id, profiler_busy
+    from src.service.admin import is_admin
+
+    if not config.PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiling is disabled (PROFILING_ENABLED).")
+    if not is_admin(admin_token):
+        raise HTTPException(status_code=403, detail="Profiling requires the X-Admin-Token header (ADMIN_TOKEN).")
+    if mode not in MODES:
+        raise HTTPException(status_code=422, detail=f"profile must be one of {list(MODES)}.")
+    if config.INGEST_MODE == "inline" and profiler_busy():
+        raise HTTPException(status_code=409, detail="Another profile is still recording.")
+    target = os.path.basename(repo_url.rstrip('/')).replace('.git', '')
+    return {"id": new_profile_id("ingest", target), "mode": mode, "target": target}
+
+
 @router.post("/ingest", status_code=status.HTTP_201_CREATED)
-async def clone_repo(repo_url: str, background_tasks: BackgroundTasks):
-    """Clone a Git repository using pygit2 into a designated directory for repositories."""
-    from src.service.ingest.main_ingest import ingest_repo
-    from src.utils.helper import clone_repository_sync
-
-    repo_name = os.path.basename(repo_url.rstrip('/')).replace('.git', '')
-    destination = os.path.join(config.REPO_DIRS, repo_name)
-    if os.path.exists(destination):
-        shutil.rmtree(destination)
-    os.makedirs(config.REPO_DIRS, exist_ok=True)
-    
+async def clone_repo(
+    repo_url: str, background_tasks: BackgroundTasks, priority: int = 1, profile: Optional[str] = None,
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """Clone a Git repository using pygit2 into a designated directory for repositories.
+
+    If an earlier ingestion of the same repository was interrupted, the existing
+    clone is reused and ingestion resumes from its last checkpoint. With
+    INGEST_MODE=worker the job is queued for the standalone worker instead.
+    Higher ``priority`` jobs are admitted first and get a larger share of the
+    ingestion scheduler's slots.
+
+    With PROFILING_ENABLED and a matching X-Admin-Token header, ``profile=sampling``
+    or ``profile=cprofile`` records a CPU profile and per-stage tracemalloc
+    snapshots of the job, retrievable under /api/admin/profiles with the
+    returned ``profile_id``.
+    """
+    profile_spec = _profile_spec(profile, repo_url, x_admin_token)
+
+    if config.INGEST_MODE == "worker":
+        from src.service.ingest.job_queue import enqueue_job
+        options = {"priority": priority}
+        if profile_spec:
+            options["profile"] = profile_spec
+        # A repository with a pending or running job gets that job back
+        job = enqueue_job(repo_url, **options)
+        queued_profile = job["options"].get("profile")
+        return {
+            "message": "Ingestion job queued." if job["status"] == "pending" else "Ingestion of this repository is already running.",
+            "job_id": job["id"],
+            "profile_id": queued_profile["id"] if queued_profile else None,
+        }
+
+    from src.service.ingest.main_ingest import ingest_repo, prepare_repository_sync
+
     try:
-        cloned_repo = await asyncio.get_running_loop().run_in_executor(
-            None, clone_repository_sync, repo_url, destination
+        cloned_repo, resumed = await asyncio.get_running_loop().run_in_executor(
+            None, prepare_repository_sync, repo_url
         )
-        logger.info(f"Repository cloned successfully to {destination}")
-        background_tasks.add_task(ingest_repo, cloned_repo)   
+        destination = os.path.normpath(cloned_repo.workdir)
+        logger.info(f"Repository {'reused' if resumed else 'cloned successfully'} at {destination}")
+        ingest_profile = None
+        if profile_spec:
+            from src.core.profiling import new_profile
+            ingest_profile = new_profile("ingest", profile_spec["target"], profile_spec["mode"], profile_spec["id"])
+        background_tasks.add_task(ingest_repo, cloned_repo, repo_url, priority, ingest_profile)
         return {
-            "message": "Repository cloned successfully.",
+            "message": "Resuming interrupted ingestion." if resumed else "Repository cloned successfully.",
             "repository_path": destination,
+            "profile_id": profile_spec["id"] if profile_spec else None,
         }
     except Exception as e:
         logger.error(f"Error cloning repository: {e}")
@@ -60,4 +102,52 @@ async def clone_repo(repo_url: str, background_tasks: BackgroundTasks):
         )
 
 
+@router.get("/ingest/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """Endpoint to get the status of a queued ingestion job."""
+    from src.service.ingest.job_queue import get_job
+
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+
+@router.get("/ingest/scheduler")
+async def get_scheduler_stats():
+    """
+    Endpoint to inspect admitted jobs and slot usage of the ingestion scheduler.
+    With INGEST_MODE=worker this is the shared slot budget of each worker host.
+    """
+    from src.service.ingest.scheduler import get_scheduler, load_worker_stats
+    if config.INGEST_MODE == "worker":
+        return {"mode": "worker", "workers": load_worker_stats()}
+    return get_scheduler().stats()
+
+
+@router.get("/db/pool")
+async def get_db_pool_stats():
+    """
+    Endpoint to inspect Neo4j session/pool utilisation and transaction retries
+    of this process. With INGEST_MODE=worker, ingestion writes run in the
+    worker, whose Neo4j slot usage is reported under `workers`.
+    """
+    if config.INGEST_MODE == "worker":
+        from src.service.ingest.scheduler import load_worker_stats
+        workers = {
+            host: {"neo4j_slots": status.get("budget", {}).get("neo4j"), "updated_at": status.get("updated_at")}
+            for host, status in load_worker_stats().items()
+        }
+        return {**pool_stats(), "workers": workers}
+    return pool_stats()
+
+
+@router.get("/ingest/metrics/{repo_name}")
+async def get_ingest_metrics(repo_name: str):
+    """Endpoint to get the stage timings, counts and latencies of the last ingestion of a repository."""
+    from src.core.metrics import load_job_metrics
 
+    metrics = load_job_metrics(repo_name)
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="No metrics recorded for this repository.")
+    return metrics
@@ -1,27 +1,180 @@
+import time
+import uuid
+import asyncio
 import logging
+from collections import defaultdict
+from typing import Dict, Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from src.core.config import config
+from src.core.profiling import MODES, Profile, new_profile, profile_stage, profiled
+from src.service.admin import is_admin
 
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# In-flight queries per user across all of their connections
+_inflight: Dict[str, int] = defaultdict(int)
+
+
+class QueryChannel:
+    """Sends the messages of one query over a shared socket, tagged with its request id."""
+
+    def __init__(self, websocket: WebSocket, send_lock: asyncio.Lock, request_id: str):
+        self.websocket = websocket
+        self.send_lock = send_lock
+        self.request_id = request_id
+
+    async def send_json(self, message: dict):
+        async with self.send_lock:
+            await self.websocket.send_json({**message, "request_id": self.request_id})
+
+
+def _user_id(websocket: WebSocket) -> str:
+    return websocket.query_params.get("user_id") or (websocket.client.host if websocket.client else "anonymous")
+
+
+async def _answer_query(channel: QueryChannel, query: str, repository: Optional[str]):
+    from src.agent.insight.core import stream_agent_response_to_websocket
+    from src.agent.insight.router import classify_query, answer_fast_path, get_route_latency
+    from src.service.response_cache import lookup_answer, store_answer, replay_answer
+
+    started = time.perf_counter()
+
+    # Exact lookups are answered by the graph tools without any LLM call
+    decision = classify_query(query) if config.FAST_PATH_ENABLED else None
+    if decision and decision.is_fast_path:
+        with profile_stage("fast_path"):
+            answer = await answer_fast_path(decision)
+        if answer is not None:
+            await replay_answer(channel, answer)
+            get_route_latency().record(decision.route, time.perf_counter() - started)
+            return
+
+    with profile_stage("cache"):
+        cached_answer = await lookup_answer(query, repository)
+    if cached_answer is not None:
+        await replay_answer(channel, cached_answer)
+        get_route_latency().record("cache", time.perf_counter() - started)
+        return
+
+    # Open-ended questions go through the planner workflow
+    with profile_stage("planner"):
+        answer = await stream_agent_response_to_websocket(channel, user_query=query, target_agent="PlannerAgent")
+    get_route_latency().record("planner", time.perf_counter() - started)
+    await store_answer(query, answer, repository)
+
+
+async def _run_query(channel: QueryChannel, query: str, repository: Optional[str], profile: Optional[Profile] = None):
+    """Answer one query under the server-side timeout and report how it ended."""
+    try:
+        with profiled(profile) as recording:
+            await asyncio.wait_for(_answer_query(channel, query, repository), config.WS_QUERY_TIMEOUT)
+        await channel.send_json({"type": "done", **({"profile_id": recording.id} if recording else {})})
+    except asyncio.TimeoutError:
+        logger.warning(f"Query {channel.request_id} timed out after {config.WS_QUERY_TIMEOUT:.0f}s")
+        await _send_quietly(channel, {
+            "type": "error",
+            "payload": f"Query timed out after {config.WS_QUERY_TIMEOUT:.0f}s."
+        })
+    except asyncio.CancelledError:
+        logger.info(f"Query {channel.request_id} cancelled")
+        await _send_quietly(channel, {"type": "cancelled"})
+    except Exception as exc:
+        logger.exception(f"Query {channel.request_id} failed", exc_info=exc)
+        await _send_quietly(channel, {"type": "error", "payload": f"Server error: {exc}"})
+
+
+def _finish_query(task: asyncio.Task, channel: QueryChannel, user_id: str):
+    """
+    Done callback of a query task: frees the user's slot. A task cancelled
+    before its first step never ran `_run_query`, so it is reported here.
+    """
+    _inflight[user_id] -= 1
+    if _inflight[user_id] <= 0:
+        del _inflight[user_id]
+    if task.cancelled():
+        logger.info(f"Query {channel.request_id} cancelled before it started")
+        asyncio.get_running_loop().create_task(_send_quietly(channel, {"type": "cancelled"}))
+
+
+async def _send_quietly(channel: QueryChannel, message: dict):
+    try:
+        await channel.send_json(message)
+    except Exception:
+        pass
+
+
 @router.websocket("/")
 async def query_endpoint(websocket: WebSocket):
-    from src.agent.insight.core import stream_agent_response_to_websocket
+    """
+    Several queries may be in flight per connection. Each message may carry a
+    `request_id` (generated when missing) that tags every reply, and
+    `{"type": "cancel", "request_id": ...}` aborts a running query. A query
+    ends with a `done`, `cancelled` or `error` message.
+
+    With PROFILING_ENABLED, `"profile": "sampling"` (or `"cprofile"`) and an
+    `"admin_token"` matching ADMIN_TOKEN profile the query; `done` then carries
+    the `profile_id` of its artifacts.
+    """
     await websocket.accept()
+    user_id = _user_id(websocket)
+    send_lock = asyncio.Lock()
+    tasks: Dict[str, asyncio.Task] = {}
     try:
         while True:
             # 1) Receive and validate the raw JSON
             data = await websocket.receive_json()
+            request_id = str(data.get("request_id") or uuid.uuid4().hex[:12])
+            channel = QueryChannel(websocket, send_lock, request_id)
+
+            if data.get("type") == "cancel":
+                task = tasks.get(request_id)
+                if task is not None:
+                    task.cancel()
+                else:
+                    await channel.send_json({"type": "error", "payload": "No running query with this request_id."})
+                continue
+
             query = data.get("query")
             if not isinstance(query, str) or not query.strip():
-                await websocket.send_json({
+                await channel.send_json({
                     "type": "error",
                     "payload": "Invalid payload – expected { \"query\": \"...\" }."
                 })
                 continue
+            profile_mode = data.get("profile")
+            if profile_mode and (not config.PROFILING_ENABLED or profile_mode not in MODES):
+                await channel.send_json({
+                    "type": "error",
+                    "payload": f"Profiling is disabled or '{profile_mode}' is not one of {list(MODES)}."
+                })
+                continue
+            if profile_mode and not is_admin(data.get("admin_token")):
+                await channel.send_json({"type": "error", "payload": "Profiling requires a valid admin_token (ADMIN_TOKEN)."})
+                continue
+            if request_id in tasks:
+                await channel.send_json({"type": "error", "payload": "A query with this request_id is already running."})
+                continue
+
+            # 2) Per-user limit on concurrent queries
+            if _inflight[user_id] >= config.WS_MAX_QUERIES_PER_USER:
+                await channel.send_json({
+                    "type": "error",
+                    "payload": f"Too many queries in flight (limit {config.WS_MAX_QUERIES_PER_USER}); wait or cancel one."
+                })
+                continue
 
-            await stream_agent_response_to_websocket(websocket, user_query=query, target_agent="PlannerAgent")
+            # 3) Answer in the background so this loop keeps reading cancels and new queries.
+            # Optional: "repository" scopes the answer cache to one repository.
+            # The slot is released by the done callback, which runs even when
+            # the task is cancelled before it starts.
+            profile = new_profile("query", request_id, profile_mode) if profile_mode else None
+            task = asyncio.create_task(_run_query(channel, query, data.get("repository"), profile))
+            _inflight[user_id] += 1
+            tasks[request_id] = task
+            task.add_done_callback(lambda _, request_id=request_id: tasks.pop(request_id, None))
+            task.add_done_callback(lambda done, channel=channel: _finish_query(done, channel, user_id))
 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected by client")
@@ -35,4 +188,13 @@ async def query_endpoint(websocket: WebSocket):
         except:
             pass
     finally:
-        await websocket.close()
\ No newline at end of file
+        for task in list(tasks.values()):
+            task.cancel()
+        await websocket.close()
+
+
+@router.get("/insight/routes")
+async def get_route_stats():
+    """p50/p95 latency of answered queries per route (fast paths, cache, planner)."""
+    from src.agent.insight.router import get_route_latency
+    return get_route_latency().stats()
@@ -0,0 +1,192 @@
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from src.core.config import config
+from src.core.metrics import CACHE_REQUESTS
+from src.core.tracing import set_attributes
+
+logger = logging.getLogger(__name__)
+
+ALL_REPOSITORIES = "*"
+
+
+@dataclass
+class CachedAnswer:
+    version: str
+    embedding: np.ndarray
+    query: str
+    answer: str
+    created_at: float
+
+
+class SemanticResponseCache:
+    """
+    Final insight answers keyed by (repository graph version, query embedding).
+
+    A lookup hits when a cached query for the same repository and graph version
+    has cosine similarity >= threshold. Entries of an older graph version are
+    dropped as soon as they are seen, so re-ingesting a repository invalidates
+    its answers without any coordination.
+    """
+
+    def __init__(self, threshold: float, ttl: float, max_entries: int):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, List[CachedAnswer]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, scope: str, version: str, embedding: List[float]) -> Optional[CachedAnswer]:
+        now = time.time()
+        entries = [
+            e for e in self._entries.get(scope, [])
+            if e.version == version and now - e.created_at < self.ttl
+        ]
+        self._entries[scope] = entries
+        if not entries:
+            self.misses += 1
+            CACHE_REQUESTS.inc(cache="response", result="miss")
+            set_attributes({"cache.response": "miss"})
+            return None
+
+        query = self._normalize(embedding)
+        scores = np.stack([e.embedding for e in entries]) @ query
+        best = int(np.argmax(scores))
+        if scores[best] >= self.threshold:
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache="response", result="hit")
+            set_attributes({"cache.response": "hit", "cache.response.score": float(scores[best])})
+            return entries[best]
+        self.misses += 1
+        CACHE_REQUESTS.inc(cache="response", result="miss")
+        return None
+
+    def store(self, scope: str, version: str, embedding: List[float], query: str, answer: str):
+        entries = self._entries.setdefault(scope, [])
+        entries.append(CachedAnswer(version, self._normalize(embedding), query, answer, time.time()))
+        if len(entries) > self.max_entries:
+            del entries[:len(entries) - self.max_entries]
+
+    def invalidate(self, scope: Optional[str] = None):
+        if scope is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(scope, None)
+            # Answers across all repositories depend on this one too
+            self._entries.pop(ALL_REPOSITORIES, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": sum(len(e) for e in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache: Optional[SemanticResponseCache] = None
+_versions: Dict[str, Optional[str]] = {}
+_versions_fetched_at = 0.0
+
+
+def get_response_cache() -> SemanticResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = SemanticResponseCache(
+            threshold=config.RESPONSE_CACHE_THRESHOLD,
+            ttl=config.RESPONSE_CACHE_TTL,
+            max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+        )
+    return _cache
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+async def _graph_version(repository: Optional[str]) -> Optional[str]:
+    """Graph version of one repository, or of all of them combined when none is given."""
+    global _versions, _versions_fetched_at
+    from src.core.graph_snapshot import fetch_graph_versions
+
+    if time.monotonic() - _versions_fetched_at > config.GRAPH_SNAPSHOT_REFRESH_INTERVAL:
+        _versions = await fetch_graph_versions()
+        _versions_fetched_at = time.monotonic()
+
+    if repository:
+        return _versions.get(repository)
+    if not _versions:
+        return None
+    return "|".join(f"{name}={version}" for name, version in sorted(_versions.items()))
+
+
+async def lookup_answer(query: str, repository: Optional[str] = None) -> Optional[str]:
+    """
+    Return a cached answer for a semantically equivalent query, if any. The
+    cache is best effort: a failing graph version check or query embedding
+    counts as a miss.
+    """
+    if not config.RESPONSE_CACHE_ENABLED:
+        return None
+    from src.agent.insight.tools.query_embedding import get_query_embedding
+
+    try:
+        version = await _graph_version(repository)
+        if version is None:
+            return None
+        embedding = await get_query_embedding(normalize_query(query))
+    except Exception as e:
+        logger.warning(f"Response cache lookup failed, answering without it: {e}")
+        return None
+    if not embedding:
+        return None
+    entry = get_response_cache().lookup(repository or ALL_REPOSITORIES, version, embedding)
+    if entry:
+        logger.info(f"Response cache hit for '{query}' (cached query: '{entry.query}')")
+        return entry.answer
+    return None
+
+
+async def store_answer(query: str, answer: str, repository: Optional[str] = None):
+    """Cache an answer that has already been sent; failures only skip the store."""
+    if not config.RESPONSE_CACHE_ENABLED or not answer.strip():
+        return
+    from src.agent.insight.tools.query_embedding import get_query_embedding
+
+    try:
+        version = await _graph_version(repository)
+        if version is None:
+            return
+        embedding = await get_query_embedding(normalize_query(query))
+    except Exception as e:
+        logger.warning(f"Response cache store skipped: {e}")
+        return
+    if embedding:
+        get_response_cache().store(repository or ALL_REPOSITORIES, version, embedding, query, answer)
+
+
+def invalidate_repository(repository: str):
+    """Drop cached answers of a re-ingested repository and force a version re-check."""
+    global _versions_fetched_at
+    get_response_cache().invalidate(repository)
+    _versions_fetched_at = 0.0
+
+
+async def replay_answer(websocket, answer: str):
+    """Stream a cached answer in the same message format as a live agent run."""
+    from src.service.stream_writer import StreamWriter
+
+    chunk_size = config.RESPONSE_CACHE_REPLAY_CHUNK
+    async with StreamWriter(websocket) as writer:
+        for start in range(0, len(answer), chunk_size):
+            await writer.write(answer[start:start + chunk_size])
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from typing import List, Optional
+from src.core.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class StreamWriter:
+    """
+    Coalesces streamed deltas into WebSocket frames.
+
+    Deltas are buffered and sent as one `{"type": "stream"}` frame once the
+    buffer reaches max_frame_bytes or flush_interval has passed since the
+    first buffered delta. Frames go through a bounded queue drained by one
+    sender task, so a slow client applies backpressure to the producer
+    instead of growing memory without limit.
+
+        async with StreamWriter(websocket) as writer:
+            await writer.write(delta)
+    """
+
+    def __init__(
+        self,
+        websocket,
+        flush_interval: Optional[float] = None,
+        max_frame_bytes: Optional[int] = None,
+        max_queued_frames: Optional[int] = None,
+    ):
+        self.websocket = websocket
+        self.flush_interval = flush_interval if flush_interval is not None else config.WS_FLUSH_INTERVAL
+        self.max_frame_bytes = max_frame_bytes or config.WS_MAX_FRAME_BYTES
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued_frames or config.WS_MAX_QUEUED_FRAMES)
+        self._parts: List[str] = []
+        self._size = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._error: Optional[BaseException] = None
+        self._sender: Optional[asyncio.Task] = None
+        self.deltas = 0
+        self.frames = 0
+
+    async def __aenter__(self):
+        self._sender = asyncio.create_task(self._send_loop())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.close()
+        else:
+            self._cancel_timer()
+            self._sender.cancel()
+        return False
+
+    async def write(self, delta: str):
+        """Buffer one delta; flushes when the frame is full."""
+        self._raise_if_failed()
+        if not delta:
+            return
+        self._parts.append(delta)
+        self._size += len(delta.encode("utf-8"))
+        self.deltas += 1
+        if self._size >= self.max_frame_bytes:
+            await self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._flush_on_timer)
+
+    async def send_json(self, message: dict):
+        """Send a non-stream message after any buffered deltas, preserving order."""
+        await self.flush()
+        await self._put(message)
+
+    async def flush(self):
+        self._cancel_timer()
+        if self._parts:
+            await self._put(self._take_frame())
+
+    async def close(self):
+        """Flush what is buffered and wait until every frame has been sent."""
+        await self.flush()
+        await self._queue.put(None)
+        await self._sender
+        self._raise_if_failed()
+
+    def _take_frame(self) -> dict:
+        frame = {"type": "stream", "payload": "".join(self._parts)}
+        self._parts, self._size = [], 0
+        return frame
+
+    def _flush_on_timer(self):
+        self._flush_handle = None
+        if not self._parts:
+            return
+        if self._queue.full():
+            # The client is behind; try again rather than block the event loop
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._flush_on_timer)
+            return
+        self._queue.put_nowait(self._take_frame())
+
+    def _cancel_timer(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    async def _put(self, message: dict):
+        self._raise_if_failed()
+        await self._queue.put(message)
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise self._error
+
+    async def _send_loop(self):
+        while True:
+            message = await self._queue.get()
+            if message is None:
+                return
+            if self._error is not None:
+                # Keep draining so producers blocked on a full queue are released
+                continue
+            try:
+                await self.websocket.send_json(message)
+                self.frames += 1
+            except Exception as e:
+                self._error = e
@@ -8,6 +8,16 @@ def clone_repository_sync(repo_url: str, destination: str):
     import pygit2
     return pygit2.clone_repository(repo_url, destination)
 
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this pid exists on this host."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
 def generate_stable_id(identifier: str) -> str:
     """Generate a UUID5 based on a file path (stable across runs)."""
     return str(uuid.uuid5(uuid.NAMESPACE_URL, identifier))
@@ -17,9 +27,19 @@ def get_embedding(text: str) -> list[float]:
     if not text or not text.strip():
         return []
 
-    embedding = Settings.embed_model.get_text_embedding(text)
-    if not isinstance(embedding, list):
-        embedding = embedding.tolist()
+    from src.core.metrics import EMBEDDING_CALLS, EMBEDDING_SECONDS
+    from src.core.tracing import span
+    embed_model = Settings.embed_model
+    EMBEDDING_CALLS.inc()
+    with span("embedding", {
+        "embedding.model": getattr(embed_model, "model_name", None),
+        "input.bytes": len(text.encode("utf-8")),
+    }) as current:
+        with EMBEDDING_SECONDS.time():
+            embedding = embed_model.get_text_embedding(text)
+        if not isinstance(embedding, list):
+            embedding = embedding.tolist()
+        current.set_attribute("embedding.dimension", len(embedding))
 
     return embedding
 
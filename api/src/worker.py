@@ -0,0 +1,141 @@
+"""Standalone ingestion worker.
+
+Pulls ingestion jobs from the local queue filled by ``POST /api/ingest`` (when
+``INGEST_MODE=worker``) and runs each one in a separate process, so parsing,
+embedding and diffing never share the API server's event loop.
+
+Usage:
+    python -m src.worker [--processes N] [--poll-interval SECONDS]
+"""
+import time
+import signal
+import asyncio
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from src.core.config import config
+from src.core.logger_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def run_job_in_process(job: dict, share: int, budget) -> bool:
+    """Entry point of a pool process: run one ingestion job to completion."""
+    setup_logging()
+    from src.core.metrics import export_process_metrics, start_metrics_export
+    from src.core.tracing import setup_tracing, flush_spans
+    from src.service.ingest.scheduler import configure_scheduler
+    from src.service.ingest.main_ingest import run_ingest_job
+
+    # Slots come from the budget shared by every process of the pool
+    configure_scheduler(share=share, shared=budget)
+    # This process has no scrape endpoint; the API's /metrics reads its exports
+    start_metrics_export(config.INGEST_METRICS_EXPORT_INTERVAL)
+    try:
+        setup_tracing()
+    except Exception as e:
+        logger.warning(f"Tracing disabled in worker process: {e}")
+    options = job.get("options", {})
+    priority = options.get("priority", 1)
+    profile = None
+    if options.get("profile"):
+        from src.core.profiling import new_profile
+        spec = options["profile"]
+        profile = new_profile("ingest", spec["target"], spec["mode"], spec["id"])
+    try:
+        return asyncio.run(run_ingest_job(job["repo_url"], priority=priority, profile=profile))
+    finally:
+        flush_spans()
+        try:
+            export_process_metrics()
+        except Exception as e:
+            logger.warning(f"Exporting metrics of job {job['id']} failed: {e}")
+
+
+def _ignore_interrupts():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def serve(processes: int, poll_interval: float):
+    from src.service.ingest.job_queue import claim_next_job, finish_job, heartbeat_jobs, requeue_running_jobs
+    from src.service.ingest.scheduler import BudgetManager, SharedBudget, save_worker_stats, slot_limits
+
+    requeued = requeue_running_jobs()
+    if requeued:
+        logger.info(f"Requeued {requeued} jobs interrupted by a previous worker.")
+
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        logger.info("Worker stopping after in-flight jobs finish...")
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    # spawn keeps Neo4j drivers and event loops out of the children
+    context = multiprocessing.get_context("spawn")
+    in_flight = {}
+
+    # The manager holds the slot budget shared by the pool processes; it
+    # ignores Ctrl+C so in-flight jobs can still release their slots
+    manager = BudgetManager(ctx=context)
+    manager.start(_ignore_interrupts)
+
+    with manager, ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+        budget = SharedBudget.create(manager, slot_limits())
+        logger.info(f"Ingestion worker started with {processes} processes.")
+        while not stopping or in_flight:
+            # Heartbeats tell other workers sharing the spool that these jobs
+            # are alive; jobs of workers that stopped beating are taken over
+            heartbeat_jobs(list(in_flight.values()))
+            try:
+                save_worker_stats({
+                    "processes": processes,
+                    "jobs": [job["id"] for job in in_flight.values()],
+                    "budget": budget.stats(),
+                })
+            except Exception as e:
+                logger.warning(f"Saving worker status failed: {e}")
+            if not stopping:
+                requeued = requeue_running_jobs()
+                if requeued:
+                    logger.info(f"Requeued {requeued} jobs of a worker that stopped.")
+
+            while not stopping and len(in_flight) < processes:
+                job = claim_next_job()
+                if job is None:
+                    break
+                logger.info(f"Starting job {job['id']} ({job['repo_url']})")
+                in_flight[pool.submit(run_job_in_process, job, processes, budget)] = job
+
+            if not in_flight:
+                time.sleep(poll_interval)
+                continue
+
+            done, _ = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                try:
+                    succeeded = future.result()
+                    finish_job(job, succeeded, None if succeeded else "Ingestion failed, see worker logs.")
+                except Exception as e:
+                    logger.error(f"Job {job['id']} crashed: {e}", exc_info=True)
+                    finish_job(job, False, str(e))
+                logger.info(f"Finished job {job['id']} with status {job['status']}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Repository ingestion worker")
+    arg_parser.add_argument("--processes", type=int, default=config.INGEST_WORKERS)
+    arg_parser.add_argument("--poll-interval", type=float, default=config.INGEST_POLL_INTERVAL)
+    args = arg_parser.parse_args()
+
+    setup_logging()
+    serve(max(1, args.processes), args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import asyncio
+import hashlib
+import pytest
+
+# Config requires the provider keys; nothing here calls the providers
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from src.core.config import config
+from src.core.graph.memory_store import MemoryGraphStore
+from src.core.graph.store import set_graph_store
+from src.service.ingest import node as node_module
+from src.service.ingest.node import create_class_node, create_file_node, create_folder_node, create_repository_node
+from src.service.ingest.relationship import create_containment_relationships_cypher, run_dependency_relationships_batch
+
+EMBED_DIM = 8
+REPO = "demo"
+PREVIEW_CHARS = 40
+
+# (name, parent path, content)
+FILES = [
+    ("README.md", REPO, "Demo repository for the graph tools"),
+    ("app.py", f"{REPO}/src", "from src.models import User\n\ndef main():\n    return User()\n"),
+    ("models.py", f"{REPO}/src", "class User:\n    \"\"\"A registered account.\"\"\"\n" + "    field = 1\n" * 40),
+    ("helpers.py", f"{REPO}/src/util", "def slugify(text):\n    return text.lower()\n"),
+    ("format.py", f"{REPO}/src/util", "def render(value):\n    return str(value)\n"),
+]
+# (source path, target path, description): app -> models, app -> helpers, helpers -> format
+DEPENDENCIES = [
+    (f"{REPO}/src/app.py", f"{REPO}/src/models.py", "import"),
+    (f"{REPO}/src/app.py", f"{REPO}/src/util/helpers.py", "import"),
+    (f"{REPO}/src/util/helpers.py", f"{REPO}/src/util/format.py", "import"),
+]
+
+
+def fake_embedding(text: str) -> list:
+    """Deterministic vector per text, so equal texts embed identically."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [byte / 255 - 0.5 for byte in digest[:EMBED_DIM]]
+
+
+async def fake_add_embeddings(session, node_label, node_id, fields):
+    properties = {f"embedding_{field}": fake_embedding(text) for field, text in fields.items() if text}
+    await session.update_nodes(node_label, [{"node_id": node_id, **properties}])
+
+
+async def build_demo_graph(store: MemoryGraphStore):
+    async with store.session() as session:
+        await create_repository_node(session, {
+            "name": REPO, "remote_url": f"https://example.com/{REPO}.git", "default_branch": "main",
+            "description": "Demo repository", "tree": "src/",
+        })
+        for path, parent in ((f"{REPO}/src", REPO), (f"{REPO}/src/util", f"{REPO}/src")):
+            await create_folder_node(session, {
+                "name": os.path.basename(path), "path": path, "parent_path": parent, "tree": path, "repository": REPO,
+            })
+        for name, parent, content in FILES:
+            await create_file_node(session, {
+                "name": name, "path": f"{parent}/{name}", "parent_path": parent,
+                "extension": name.rsplit(".", 1)[-1], "repository": REPO,
+            }, content)
+        await create_class_node(session, "User", "A registered account", "class User: ...", f"{REPO}/src/models.py")
+
+    await create_containment_relationships_cypher()
+    await run_dependency_relationships_batch(DEPENDENCIES)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """An empty MemoryGraphStore installed as the process-wide graph store."""
+    monkeypatch.setattr(config, "GRAPH_BACKEND", "memory")
+    monkeypatch.setattr(config, "GRAPH_SNAPSHOT_ENABLED", False)
+    monkeypatch.setattr(config, "TOOL_CONTENT_PREVIEW_CHARS", PREVIEW_CHARS)
+    monkeypatch.setattr(config, "EMBED_DIM", EMBED_DIM)
+    memory_store = MemoryGraphStore()
+    previous = set_graph_store(memory_store)
+    yield memory_store
+    set_graph_store(previous)
+
+
+@pytest.fixture
+def graph(store, monkeypatch):
+    """The demo repository ingested into the store through the ingestion helpers."""
+    monkeypatch.setattr(node_module, "add_embeddings", fake_add_embeddings)
+    asyncio.run(build_demo_graph(store))
+    return store
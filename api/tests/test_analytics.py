@@ -0,0 +1,42 @@
+import asyncio
+from collections import deque
+import numpy as np
+from src.core.config import config
+from src.core.graph_snapshot import CSRGraph
+from src.service.ingest.analytics import closures, compute_dependency_analytics, members, strongly_connected_components
+from tests.conftest import REPO
+
+
+def reachable(graph: CSRGraph, start: int) -> set:
+    seen, queue = {start}, deque([start])
+    while queue:
+        for neighbor in graph.neighbors(queue.popleft())[0]:
+            if int(neighbor) not in seen:
+                seen.add(int(neighbor))
+                queue.append(int(neighbor))
+    return seen
+
+
+def test_closures_match_breadth_first_search():
+    rng = np.random.default_rng(7)
+    num_nodes = 60
+    src = rng.integers(0, num_nodes, 120)
+    dst = rng.integers(0, num_nodes, 120)
+    graph = CSRGraph(num_nodes, src, dst, np.zeros(len(src), dtype=np.int8))
+
+    components = strongly_connected_components(num_nodes, graph)
+    reach = closures(components, graph)
+
+    for node in range(num_nodes):
+        assert set(members(reach[components[node]], num_nodes).tolist()) == reachable(graph, node)
+
+
+def test_compute_dependency_analytics(graph):
+    asyncio.run(compute_dependency_analytics(REPO))
+
+    files = {node["name"]: node for node in graph.nodes[config.FILE_LABEL].values()}
+    assert files["app.py"]["downstream_count"] == 3
+    assert files["app.py"]["upstream"] == []
+    assert sorted(files["format.py"]["upstream"]) == [f"{REPO}/src/app.py", f"{REPO}/src/util/helpers.py"]
+    assert files["README.md"]["downstream_count"] == 0
+    assert not files["app.py"]["in_cycle"]
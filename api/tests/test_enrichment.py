@@ -0,0 +1,21 @@
+import asyncio
+from src.core.config import config
+from src.service.ingest import embedding
+from src.service.ingest.enrichment import enrich_file_node
+from src.utils.helper import generate_stable_id
+from tests.conftest import REPO, fake_add_embeddings, fake_embedding
+
+
+def test_enrich_file_node_embeds_the_description(graph, monkeypatch):
+    monkeypatch.setattr(embedding, "add_embeddings", fake_add_embeddings)
+    path = f"{REPO}/src/app.py"
+
+    async def enrich():
+        async with graph.session() as session:
+            await enrich_file_node(session, path, "app.py", {"file_description": "Entry point of the demo"})
+
+    asyncio.run(enrich())
+
+    node = graph.nodes[config.FILE_LABEL][generate_stable_id(f"{path}:app.py")]
+    assert node["description"] == "Entry point of the demo"
+    assert node["embedding_description"] == fake_embedding("Entry point of the demo")
@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from src.core import graph_snapshot
+from src.core.config import config
+from src.agent.insight.tools.neo4j_utils import (
+    find_path_between_nodes_by_label,
+    get_depend,
+    get_full_path_to_node,
+    get_node_relationships_by_label,
+    traverse_node,
+)
+from tests.conftest import PREVIEW_CHARS, REPO
+
+
+def test_traverse_node_pages_with_cursor(graph):
+    first = asyncio.run(traverse_node("src", max_nodes=2))
+    second = asyncio.run(traverse_node("src", max_nodes=2, cursor="2"))
+    last = asyncio.run(traverse_node("src", max_nodes=2, cursor="4"))
+
+    # Entries come ordered by their path of names: app.py, models.py, User, format.py, helpers.py
+    assert "app.py" in first and "models.py" in first and "User" not in first
+    assert 'cursor="2"' in first
+    assert "User" in second and "format.py" in second and "app.py" not in second
+    assert 'cursor="4"' in second
+    assert "helpers.py" in last and "cursor=" not in last
+
+
+def test_traverse_node_unknown_folder(graph):
+    assert asyncio.run(traverse_node("missing")) == "No matching node found."
+
+
+def test_get_depend_follows_direction(graph):
+    outgoing = asyncio.run(get_depend("app.py", "out"))
+    incoming = asyncio.run(get_depend("helpers.py", "in"))
+
+    assert {node["name"] for node in outgoing} == {"models.py", "helpers.py"}
+    assert [node["name"] for node in incoming] == ["app.py"]
+    assert all(len(node["content"]) <= PREVIEW_CHARS for node in outgoing)
+    assert all(not key.startswith("embedding_") for node in outgoing for key in node)
+
+
+def test_get_depend_drops_content_past_the_budget(graph, monkeypatch):
+    monkeypatch.setattr(config, "CONTEXT_DEFAULT_BUDGET", 1)
+
+    outgoing = asyncio.run(get_depend("app.py", "out"))
+
+    assert {node["name"] for node in outgoing} == {"models.py", "helpers.py"}
+    assert all("content" not in node for node in outgoing)
+
+
+def test_get_node_relationships_both_directions(graph):
+    relationships = asyncio.run(get_node_relationships_by_label("Folder", "util", "both", "CONTAINS"))
+
+    found = {(rel["direction"], rel["target_node"]["name"]) for rel in relationships}
+    assert found == {("in", "src"), ("out", "helpers.py"), ("out", "format.py")}
+    assert all(rel["relationship_type"] == "CONTAINS" for rel in relationships)
+
+
+def test_find_path_between_nodes_ignores_direction(graph):
+    paths = asyncio.run(find_path_between_nodes_by_label("File", "format.py", "File", "models.py", "RELATED_TO"))
+
+    assert len(paths) == 1
+    assert [node["name"] for node in paths[0]["nodes"]] == ["format.py", "helpers.py", "app.py", "models.py"]
+    assert paths[0]["relationships"] == ["RELATED_TO"] * 3
+
+
+def test_find_path_between_nodes_through_repository(graph):
+    paths = asyncio.run(find_path_between_nodes_by_label("Folder", "util", "File", "README.md", "CONTAINS"))
+
+    assert [node["name"] for node in paths[0]["nodes"]] == ["util", "src", REPO, "README.md"]
+
+
+def test_find_path_between_nodes_without_path(graph):
+    # Classes hang off files through Has_CLASS, not CONTAINS
+    assert asyncio.run(find_path_between_nodes_by_label("File", "models.py", "Class", "User", "CONTAINS")) == []
+
+
+def test_get_full_path_to_node(graph):
+    assert asyncio.run(get_full_path_to_node("File", "helpers.py")) == [f"{REPO}/src/util/helpers.py"]
+
+
+@pytest.mark.parametrize("query", [
+    ("File", "format.py", "File", "models.py", "RELATED_TO"),
+    ("Folder", "util", "File", "README.md", "CONTAINS"),
+    ("File", "models.py", "Class", "User", "CONTAINS"),
+    ("File", "app.py", "File", "app.py", "RELATED_TO"),
+])
+def test_find_path_between_nodes_snapshot_matches_store(graph, monkeypatch, query):
+    from_store = asyncio.run(find_path_between_nodes_by_label(*query))
+    monkeypatch.setattr(config, "GRAPH_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(graph_snapshot, "_snapshots", {})
+    asyncio.run(graph_snapshot.sync_snapshots(force=True))
+
+    assert graph_snapshot._snapshots
+    assert asyncio.run(find_path_between_nodes_by_label(*query)) == from_store
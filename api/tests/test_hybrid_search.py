@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from src.agent.insight.tools import hybrid
+from src.agent.insight.tools.hybrid import exact_lookup, fulltext_lookup, hybrid_search, vector_lookup
+from tests.conftest import REPO, fake_embedding
+
+
+@pytest.fixture
+def query_embedding(monkeypatch):
+    async def embed(text):
+        return fake_embedding(text)
+
+    monkeypatch.setattr(hybrid, "get_query_embedding", embed)
+
+
+def test_exact_lookup(graph):
+    results = asyncio.run(exact_lookup("File", " models.py ", 5))
+
+    assert len(results) == 1
+    assert results[0]["path"] == f"{REPO}/src/models.py"
+    assert results[0]["score"] == 1.0
+
+
+def test_exact_lookup_miss(graph):
+    assert asyncio.run(exact_lookup("File", "models", 5)) == []
+
+
+def test_fulltext_lookup_matches_content(graph):
+    results = asyncio.run(fulltext_lookup("File", "slugify", 5))
+
+    assert [result["name"] for result in results] == ["helpers.py"]
+    assert results[0]["score"] > 0
+
+
+def test_vector_lookup_ranks_identical_name_first(graph, query_embedding):
+    results = asyncio.run(vector_lookup("File", "format.py", 3))
+
+    assert len(results) == 3
+    assert results[0]["name"] == "format.py"
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert results[0]["score"] >= results[1]["score"] >= results[2]["score"]
+
+
+def test_hybrid_search_fuses_fulltext_and_vector(graph, query_embedding):
+    results = asyncio.run(hybrid_search("File", "slugify", top_k=3))
+
+    # helpers.py is the only full-text hit, which puts it ahead in the fusion
+    assert results[0]["name"] == "helpers.py"
+    assert len(results) == 3
+
+
+def test_similarity_search_without_query_embedding(graph, monkeypatch):
+    from src.agent.insight.tools import search
+
+    async def embed(text):
+        return []
+
+    monkeypatch.setattr(search, "get_query_embedding", embed)
+
+    assert asyncio.run(search.similarity_search("File", "anything")) == "No matching node found."
@@ -0,0 +1,37 @@
+import os
+import sys
+import subprocess
+from src.core.config import config
+from src.core.metrics import render_prometheus
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What a worker pool process does around a job: record, then export
+WORKER_SCRIPT = """
+from src.core.metrics import FILES_READ, INGEST_STAGE_SECONDS, export_process_metrics
+INGEST_STAGE_SECONDS.observe(1.5, stage="worker_parse")
+FILES_READ.inc(7)
+export_process_metrics()
+"""
+
+
+def test_worker_process_metrics_are_rendered(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "REPO_DIRS", str(tmp_path))
+    subprocess.run(
+        [sys.executable, "-c", WORKER_SCRIPT],
+        cwd=API_DIR, env={**os.environ, "REPO_DIRS": str(tmp_path)}, check=True,
+    )
+
+    text = render_prometheus()
+
+    assert 'ingest_stage_seconds_count{stage="worker_parse"} 1.0' in text
+    assert 'ingest_stage_seconds_sum{stage="worker_parse"} 1.5' in text
+    assert 'ingest_stage_seconds_bucket{stage="worker_parse",le="2.5"} 1.0' in text
+    files_read = next(line for line in text.splitlines() if line.startswith("ingest_files_read_total "))
+    assert float(files_read.split()[1]) >= 7
+
+
+def test_render_without_worker_exports(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "REPO_DIRS", str(tmp_path))
+
+    assert 'stage="worker_parse"' not in render_prometheus()
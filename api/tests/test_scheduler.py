@@ -0,0 +1,39 @@
+import os
+from src.service.ingest.scheduler import SlotBudget
+
+PID = os.getpid()
+
+
+def test_repository_alone_takes_every_idle_slot():
+    budget = SlotBudget({"neo4j": 4})
+
+    assert all(budget.try_acquire("neo4j", "a", PID, 0, False) for _ in range(4))
+    assert not budget.try_acquire("neo4j", "a", PID, 0, False)
+
+
+def test_waiting_repository_gets_its_fair_share():
+    budget = SlotBudget({"neo4j": 4})
+    for _ in range(4):
+        budget.try_acquire("neo4j", "a", PID, 0, False)
+
+    assert not budget.try_acquire("neo4j", "b", PID, 0, False)
+    budget.release("neo4j", "a", PID)
+    # "a" is back at its share of 2 only after handing "b" the freed slots
+    assert not budget.try_acquire("neo4j", "a", PID, 0, False)
+    assert budget.try_acquire("neo4j", "b", PID, 0, True)
+    budget.release("neo4j", "a", PID)
+    budget.cancel_wait("neo4j", "a", PID)
+    assert budget.try_acquire("neo4j", "b", PID, 0, False)
+
+    stats = budget.stats()["neo4j"]
+    assert stats["held_by_repo"] == {"a": 2, "b": 2}
+    assert stats["waiting_by_repo"] == {}
+
+
+def test_slots_of_dead_processes_are_reclaimed(monkeypatch):
+    from src.service.ingest import scheduler
+    budget = SlotBudget({"neo4j": 1})
+    budget.try_acquire("neo4j", "a", 12345, 0, False)
+    monkeypatch.setattr(scheduler, "pid_alive", lambda pid: pid != 12345)
+
+    assert budget.try_acquire("neo4j", "b", PID, 0, False)